@@ -0,0 +1,106 @@
+# benchmarks/antispam_replay.py
+"""
+Replay-Benchmark für die Antispam-Regel-Engine (utils/spam_rules.py).
+
+Spielt einen aufgezeichneten Nachrichtenstrom durch die Engine und misst die Zeit
+pro Nachricht sowie, welche Regeln wie oft angeschlagen haben. Ohne Datei wird ein
+synthetischer Strom erzeugt (normaler Chat mit eingestreuten Spam-Ausbrüchen).
+
+Aufzeichnung: JSON Lines, eine Nachricht pro Zeile, zeitlich sortiert:
+    {"ts": 1718000000.12, "guild_id": "1", "user_id": 42, "channel_id": 7,
+     "message_id": 1001, "content": "hallo", "mentions": 0}
+
+Aufruf aus dem Projekt-Wurzelverzeichnis:
+    python -m benchmarks.antispam_replay [datei.jsonl] [--messages 200000]
+"""
+import argparse
+import json
+import random
+import time
+from collections import Counter
+from typing import Iterator, List, Tuple
+
+from utils.spam_rules import MessageEvent, SpamEngine, SpamRules, make_event
+
+Record = Tuple[str, int, MessageEvent]
+
+WORDS = ["hallo", "moin", "wie", "geht", "es", "euch", "heute", "python", "discord", "bot", "lol", "ja", "nein"]
+
+
+def load_recording(path: str) -> Iterator[Record]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            event = make_event(row["ts"], row["channel_id"], row["message_id"], row["content"], row.get("mentions", 0))
+            yield str(row["guild_id"]), int(row["user_id"]), event
+
+
+def synthetic_stream(count: int, guilds: int = 20, users: int = 2000, seed: int = 1) -> List[Record]:
+    """Normaler Chat (~50 Nachrichten/s) mit Spam-Ausbrüchen einzelner User."""
+    rng = random.Random(seed)
+    records: List[Record] = []
+    ts = 1_700_000_000.0
+    message_id = 0
+    while len(records) < count:
+        ts += rng.expovariate(50)
+        message_id += 1
+        guild = str(rng.randrange(guilds))
+        user = rng.randrange(users)
+        burst = rng.random() < 0.002
+        kind = rng.choice(["duplicate", "cross_channel", "mentions", "links", "rate"]) if burst else None
+
+        for i in range(6 if burst else 1):
+            channel = rng.randrange(5) if kind == "cross_channel" else user % 5
+            if kind in ("duplicate", "cross_channel"):
+                content = "FREE NITRO!!! klick hier"
+            elif kind == "links":
+                content = " ".join(rng.choice(WORDS) for _ in range(4)) + f" https://example.com/{rng.randrange(1000)}"
+            else:
+                content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+            mentions = rng.randint(3, 6) if kind == "mentions" else 0
+            records.append((guild, user, make_event(ts + i * 0.2, channel, message_id, content, mentions)))
+            message_id += 1
+    return records[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", nargs="?", help="JSON-Lines-Aufzeichnung; ohne Angabe synthetisch")
+    parser.add_argument("--messages", type=int, default=200_000, help="Länge des synthetischen Stroms")
+    parser.add_argument("--max-tracked", type=int, default=5000)
+    parser.add_argument("--idle-ttl", type=float, default=300)
+    args = parser.parse_args()
+
+    if args.recording:
+        records = list(load_recording(args.recording))
+        source = args.recording
+    else:
+        records = synthetic_stream(args.messages)
+        source = "synthetisch"
+
+    engine = SpamEngine(args.max_tracked, args.idle_ttl)
+    rules_by_guild = {}
+    verdicts: Counter = Counter()
+
+    started = time.perf_counter()
+    for guild_id, user_id, event in records:
+        rules = rules_by_guild.get(guild_id)
+        if rules is None:
+            rules = rules_by_guild[guild_id] = SpamRules(guild_id=guild_id)
+        verdict = engine.check(guild_id, user_id, event, rules)
+        if verdict is not None:
+            verdicts[verdict.rule] += 1
+            engine.reset(guild_id, user_id)
+    elapsed = time.perf_counter() - started
+
+    print(f"Quelle: {source}, Nachrichten: {len(records)}, Fenster im Speicher: {len(engine)}")
+    print(f"Gesamt: {elapsed * 1000:.1f} ms, pro Nachricht: {elapsed / max(1, len(records)) * 1e6:.2f} µs")
+    print("Treffer pro Regel:")
+    for rule, count in verdicts.most_common():
+        print(f"  {rule:<14} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/card_gradients.py
+"""
+Micro-Benchmark für die Fortschrittsbalken der Top5- und Bump-Karten.
+
+Vergleicht den früheren Zeichenweg (eine ImageDraw.line pro Pixelspalte) mit
+utils.cards.gradient_bar und misst die Renderzeit kompletter Karten.
+
+Aufruf aus dem Projekt-Wurzelverzeichnis:
+    python -m benchmarks.card_gradients [--rounds 200]
+"""
+import argparse
+import time
+from typing import Callable
+
+from PIL import Image, ImageDraw
+
+from utils import cards
+
+BAR_WIDTH = 750 - 80 - (130 + 90 + 30)   # Balkenbreite wie auf den Karten (width - 80 - name_x)
+PROGRESS = [1.0, 0.82, 0.61, 0.4, 0.17]  # fünf Zeilen mit unterschiedlicher Balkenlänge
+
+
+def legacy_gradient_bar(width: int, height: int, start: cards.RGB, end: cards.RGB) -> Image.Image:
+    """Der alte Weg: eine Linie pro Pixelspalte."""
+    gradient = Image.new("RGB", (width, height))
+    draw = ImageDraw.Draw(gradient)
+    for x in range(width):
+        color = tuple(int(start[c] + (end[c] - start[c]) * (x / width)) for c in range(3))
+        draw.line((x, 0, x, height), fill=color)
+    return gradient
+
+
+def cached_gradient_bar(width: int, height: int, start: cards.RGB, end: cards.RGB) -> Image.Image:
+    return cards.gradient_bar(width, height, start, end)
+
+
+def uncached_gradient_bar(width: int, height: int, start: cards.RGB, end: cards.RGB) -> Image.Image:
+    return cards.gradient_bar.__wrapped__(width, height, start, end)
+
+
+def bench(label: str, func: Callable[[], object], rounds: int) -> float:
+    func()  # Aufwärmen (Schriftarten, Caches)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    per_call_ms = (time.perf_counter() - started) * 1000 / rounds
+    print(f"{label:<36} {per_call_ms:8.3f} ms")
+    return per_call_ms
+
+
+def draw_card_bars(bar: Callable[..., Image.Image]) -> None:
+    """Zeichnet die fünf Balken einer Karte, wie render_top5_card es tut."""
+    for progress in PROGRESS:
+        bar(int(BAR_WIDTH * progress), 10, *cards.TOP5_BAR_GRADIENT)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    # Beide Wege müssen pixelgleiche Balken liefern
+    for progress in PROGRESS:
+        width = int(BAR_WIDTH * progress)
+        for gradient in (cards.TOP5_BAR_GRADIENT, cards.BUMP_BAR_GRADIENT):
+            old = legacy_gradient_bar(width, 10, *gradient)
+            new = uncached_gradient_bar(width, 10, *gradient)
+            assert old.tobytes() == new.tobytes(), f"Abweichung bei Breite {width}"
+
+    print(f"NumPy: {'ja' if cards.np is not None else 'nein (reines Python)'}, Runden: {args.rounds}")
+    print("\n-- Balken pro Karte (5 Zeilen) --")
+    before = bench("ImageDraw.line pro Spalte", lambda: draw_card_bars(legacy_gradient_bar), args.rounds)
+    bench("gradient_bar ohne Cache", lambda: draw_card_bars(uncached_gradient_bar), args.rounds)
+    after = bench("gradient_bar mit Cache", lambda: draw_card_bars(cached_gradient_bar), args.rounds)
+    print(f"Faktor: {before / after:.1f}x")
+
+    top5 = [(f"User {i}", None, 1000 - i * 100, 30 - i, p) for i, p in enumerate(PROGRESS)]
+    bumps = [(f"User {i}", None, 50 - i * 8) for i in range(5)]
+    total_bumps = sum(b for _, _, b in bumps)
+    print("\n-- Komplette Karten (ohne Avatare) --")
+    cached = cards.gradient_bar
+    try:
+        cards.gradient_bar = legacy_gradient_bar
+        bench("render_top5_card (vorher)", lambda: cards.render_top5_card(top5), args.rounds)
+        bench("render_bump_card (vorher)", lambda: cards.render_bump_card(bumps, total_bumps), args.rounds)
+    finally:
+        cards.gradient_bar = cached
+    bench("render_top5_card (nachher)", lambda: cards.render_top5_card(top5), args.rounds)
+    bench("render_bump_card (nachher)", lambda: cards.render_bump_card(bumps, total_bumps), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
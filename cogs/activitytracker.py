@@ -2,19 +2,65 @@
 import discord
 from discord.ext import commands, tasks
 from discord.ext.commands import Context
+from utils.database import run_db
 from utils.database import users as db_users, commands as db_commands, messages as db_messages 
+from utils.database.buffer import IncrementBuffer
+from utils.pipeline import STAGE_ACTIVITY, MessageContext, message_pipeline
 from typing import Optional
+import os
+
+# ------------------------------------------------------------
+# Konfiguration Aktivitäts-Puffer
+# ------------------------------------------------------------
+# Kanalaktivität und Command-Nutzung werden im Speicher zusammengefasst und
+# alle ACTIVITY_FLUSH_INTERVAL Sekunden bzw. nach ACTIVITY_BUFFER_MAX_EVENTS Ereignissen geschrieben.
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", 30))
+ACTIVITY_BUFFER_MAX_EVENTS = int(os.getenv("ACTIVITY_BUFFER_MAX_EVENTS", 1000))
 
 class ActivityTracker(commands.Cog):
     """Verfolgt die Aktivität der Nutzer auf dem Server"""
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
+        # (guild_id, channel_id, user_id) -> Anzahl Aktionen
+        self.activity_buffer = IncrementBuffer("channel_activity", db_messages.log_channel_activity_bulk, ACTIVITY_BUFFER_MAX_EVENTS)
+        # (guild_id, command) -> Anzahl Aufrufe
+        self.command_buffer = IncrementBuffer("command_usage", db_commands.log_command_usage_bulk, ACTIVITY_BUFFER_MAX_EVENTS)
         self.check_active_users.start() 
         self.check_total_members.start() 
+        self.flush_activity.start()
+
+    async def cog_load(self):
+        message_pipeline.register("activity", self.handle_message, STAGE_ACTIVITY)
 
-    def cog_unload(self):
+    async def cog_unload(self):
+        message_pipeline.unregister("activity")
         self.check_active_users.cancel()
         self.check_total_members.cancel()
+        self.flush_activity.cancel()
+        # Restliche Zähler schreiben, damit bei einem sauberen Neustart nichts verloren geht
+        await self.flush_buffers()
+
+    # ------------------------------------------------------------
+    # Aktivitäts-Puffer
+    # ------------------------------------------------------------
+    @tasks.loop(seconds=ACTIVITY_FLUSH_INTERVAL)
+    async def flush_activity(self):
+        await self.flush_buffers()
+
+    async def flush_buffers(self):
+        for buffer in (self.activity_buffer, self.command_buffer):
+            try:
+                await buffer.flush()
+            except Exception as e:
+                print(f"[ERROR] Puffer '{buffer.name}' konnte nicht geschrieben werden, neuer Versuch beim nächsten Flush: {e}")
+
+    def log_channel_activity(self, guild_id: str, channel_id: str, user_id: str):
+        if self.activity_buffer.add((guild_id, channel_id, user_id)):
+            self.activity_buffer.schedule_flush()
+
+    def log_command_usage(self, guild_id: str, command: str):
+        if self.command_buffer.add((guild_id, command)):
+            self.command_buffer.schedule_flush()
 
     # ------------------------------------------------------------
     # Aktive User Check (Alle 5 Minuten)
@@ -28,7 +74,7 @@ class ActivityTracker(commands.Cog):
             ]
             count = len(active_members)
             
-            db_users.set_max_active(str(guild.id), count) 
+            await run_db(db_users.set_max_active, str(guild.id), count) 
 
     @tasks.loop(minutes=5.0)
     async def check_total_members(self):
@@ -38,7 +84,7 @@ class ActivityTracker(commands.Cog):
                 continue
             
             total_count = guild.member_count 
-            db_users.set_max_members(str(guild.id), total_count)
+            await run_db(db_users.set_max_members, str(guild.id), total_count)
 
 
     @check_active_users.before_loop
@@ -47,18 +93,11 @@ class ActivityTracker(commands.Cog):
         await self.bot.wait_until_ready()
 
     # ============================================================
-    # Listener: Loggt Kanalaktivität
+    # Nachrichten-Stufe: Loggt Kanalaktivität
     # ============================================================
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
-        if message.author.bot or not message.guild:
-            return
-
-        guild_id = str(message.guild.id)
-        user_id = str(message.author.id)
-        channel_id = str(message.channel.id)
-
-        db_messages.log_channel_activity(channel_id, guild_id, user_id)
+    async def handle_message(self, ctx: MessageContext) -> None:
+        message = ctx.message
+        self.log_channel_activity(ctx.guild_id, str(message.channel.id), str(message.author.id))
 
 
 
@@ -72,7 +111,7 @@ class ActivityTracker(commands.Cog):
         
         guild_id = str(ctx.guild.id)
         
-        db_commands.log_command_usage(ctx.command.qualified_name, guild_id)
+        self.log_command_usage(guild_id, ctx.command.qualified_name)
 
 
     # ------------------------------------------------------------
@@ -89,13 +128,13 @@ class ActivityTracker(commands.Cog):
         
         guild_id = str(interaction.guild.id)
         
-        db_commands.log_command_usage(command.qualified_name, guild_id)
+        self.log_command_usage(guild_id, command.qualified_name)
         
         if interaction.channel and interaction.user:
             user_id = str(interaction.user.id)
             channel_id = str(interaction.channel.id)
 
-            db_messages.log_channel_activity(channel_id, guild_id, user_id)
+            self.log_channel_activity(guild_id, channel_id, user_id)
 
 
 # ------------------------------------------------------------
@@ -112,7 +151,8 @@ class ActivityTracker(commands.Cog):
               return
               
         guild_id = str(ctx.guild.id)
-        results = db_commands.get_top_commands(guild_id, limit)
+        await self.flush_buffers()
+        results = await run_db(db_commands.get_top_commands, guild_id, limit)
         
         if not results:
             await ctx.send("Keine Befehle wurden bisher genutzt.")
@@ -134,7 +174,7 @@ class ActivityTracker(commands.Cog):
               return
               
         guild_id = str(ctx.guild.id)
-        record = db_users.get_max_active(guild_id) 
+        record = await run_db(db_users.get_max_active, guild_id) 
         
         if record and record != "0": 
             await ctx.send(f"👥 Rekord der **aktiven** Mitglieder: **{record}**")
@@ -150,7 +190,7 @@ class ActivityTracker(commands.Cog):
               return await ctx.send("Dieser Befehl kann nur auf einem Server ausgeführt werden.")
               
         guild_id = str(ctx.guild.id)
-        record = db_users.get_max_members(guild_id) 
+        record = await run_db(db_users.get_max_members, guild_id) 
         
         if record and record != "0": 
               await ctx.send(f"📈 Rekord der **gesamten** Mitglieder: **{record}**")
@@ -167,7 +207,8 @@ class ActivityTracker(commands.Cog):
               return
               
         guild_id = str(ctx.guild.id)
-        results = db_messages.get_top_channels(guild_id, 5)
+        await self.flush_buffers()
+        results = await run_db(db_messages.get_top_channels, guild_id, 5)
         
         if not results:
             await ctx.send("📊 Es gibt noch keine Aktivität in den Channels.")
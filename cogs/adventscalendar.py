@@ -5,6 +5,7 @@ from discord.ext.commands import Context
 from datetime import datetime, date, time, timedelta
 from typing import Optional
 import pytz 
+from utils.database import run_db
 from utils.database import adventscalendar as db_adventscalendar
 import csv
 
@@ -55,7 +56,7 @@ class AdventsCalendar(commands.Cog):
             return
 
         door_number = today.day
-        surprise = db_adventscalendar.get_surprise_for_day(door_number)
+        surprise = await run_db(db_adventscalendar.get_surprise_for_day, door_number)
 
         if surprise is None:
             await ctx.send(f"❌ Für den {door_number}. Dezember wurde noch keine Überraschung festgelegt.", ephemeral=True)
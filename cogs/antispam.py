@@ -1,10 +1,23 @@
 import discord
 from discord.ext import commands
 from datetime import timedelta
-from collections import defaultdict, deque
-import time
+from typing import Dict, List
+import os
 
-from utils.database import guilds as db_guilds
+from utils.database import run_db
+from utils.database import antispam as db_antispam
+from utils.pipeline import STAGE_ANTISPAM, MessageContext, message_pipeline
+from utils.spam_rules import MessageEvent, SpamEngine, make_event
+
+# ------------------------------------------------------------
+# Konfiguration
+# ------------------------------------------------------------
+# Die Schwellen selbst stehen pro Guild in antispam_settings (/setup antispam).
+# Fenster inaktiver User verfallen nach ANTISPAM_IDLE_TTL Sekunden (mindestens dem
+# größten einstellbaren Zeitfenster), insgesamt werden höchstens ANTISPAM_MAX_TRACKED
+# Fenster gehalten (älteste zuerst verdrängt)
+ANTISPAM_IDLE_TTL = float(os.getenv("ANTISPAM_IDLE_TTL", 300))
+ANTISPAM_MAX_TRACKED = int(os.getenv("ANTISPAM_MAX_TRACKED", 5000))
 
 # ------------------------------------------------------------
 # Button View
@@ -38,77 +51,82 @@ class AntiSpam(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-        # user_id -> deque[(message_content, timestamp, message)]
-        self.message_cache = defaultdict(lambda: deque(maxlen=10))
-
-        self.mod_channels = {}
+        # (guild_id, user_id) -> gleitendes Fenster mit Hashes, Zeiten und IDs (keine Message-Objekte)
+        self.engine = SpamEngine(ANTISPAM_MAX_TRACKED, ANTISPAM_IDLE_TTL)
 
     async def cog_load(self):
-        for guild in self.bot.guilds:
-            channel_id = db_guilds.get_sanctions_channel(str(guild.id))
-            if channel_id:
-                self.mod_channels[guild.id] = int(channel_id)
+        # Die Gilden-Einstellungen liegen nach der Startphase (utils/hydration.py) bereits im Cache;
+        # die Regeln aller Gilden in einem Rutsch laden statt einer Abfrage pro Gilde
+        await run_db(db_antispam.get_antispam_rules_for_guilds, [str(g.id) for g in self.bot.guilds])
+        message_pipeline.register("antispam", self.handle_message, STAGE_ANTISPAM)
+
+    async def cog_unload(self):
+        message_pipeline.unregister("antispam")
 
-    # ------------------------------------------------------------
-    # Message Listener
-    # ------------------------------------------------------------
     @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if not message.guild or message.author.bot:
-            return
+    async def on_guild_settings_changed(self, guild_id: str):
+        db_antispam.invalidate_antispam_rules(guild_id)
+
+    async def delete_messages(self, guild: discord.Guild, events: List[MessageEvent]):
+        by_channel: Dict[int, List[discord.Object]] = {}
+        for event in events:
+            by_channel.setdefault(event.channel_id, []).append(discord.Object(id=event.message_id))
+
+        for channel_id, messages in by_channel.items():
+            channel = guild.get_channel_or_thread(channel_id)
+            if channel is None:
+                continue
+            try:
+                await channel.delete_messages(messages, reason="Spam erkannt (Antispam-System)")
+            except discord.HTTPException:
+                pass
 
+    # ------------------------------------------------------------
+    # Nachrichten-Stufe
+    # ------------------------------------------------------------
+    async def handle_message(self, ctx: MessageContext):
+        message = ctx.message
         member = message.author
 
         # Mods/Admins ignorieren
         if member.guild_permissions.administrator or member.guild_permissions.manage_guild:
             return
 
-        now = time.time()
-
-        cache = self.message_cache[member.id]
-        cache.append((message.content, now, message))
-
-        # Filter: nur gleiche Nachrichten in letzten 2 Sekunden
-        recent = [m for m in cache if now - m[1] <= 2]
-
-        if len(recent) < 3:
-            return
-
-        contents = [m[0] for m in recent]
-
-        # Prüfen ob alle identisch
-        if len(set(contents)) != 1:
+        rules = await db_antispam.fetch_antispam_rules(ctx.guild_id)
+        event = make_event(
+            message.created_at.timestamp(), message.channel.id, message.id,
+            message.content, len(message.raw_mentions) + len(message.raw_role_mentions) + int(message.mention_everyone)
+        )
+        verdict = self.engine.check(ctx.guild_id, member.id, event, rules)
+        if verdict is None:
             return
 
         # ------------------------------
         # SPAM ERKANNT
         # ------------------------------
+        # Spam erzeugt weder XP noch Statistik: folgende Stufen überspringen
+        ctx.stop()
         try:
-            # Nachrichten löschen
-            for _, _, msg in recent:
-                try:
-                    await msg.delete()
-                except:
-                    pass
+            # Nachrichten löschen: ein Bulk-Aufruf pro Channel
+            await self.delete_messages(message.guild, verdict.events)
 
-            # Timeout setzen (24h)
-            until = discord.utils.utcnow() + timedelta(hours=24)
-            await member.timeout(until, reason="Spam erkannt (3 gleiche Nachrichten)")
+            until = discord.utils.utcnow() + timedelta(minutes=rules.timeout_minutes)
+            await member.timeout(until, reason=f"Spam erkannt ({verdict.reason})")
 
         except discord.Forbidden:
             return
 
-        # Cache leeren, damit es nicht mehrfach triggert
-        self.message_cache[member.id].clear()
+        # Fenster leeren, damit es nicht mehrfach triggert
+        self.engine.reset(ctx.guild_id, member.id)
 
         # ------------------------------
         # Mod-Channel Nachricht
         # ------------------------------
-        mod_channel_id = self.mod_channels.get(message.guild.id)
+        mod_channel_id = ctx.settings.sanctions_channel_id if ctx.settings else None
         if not mod_channel_id:
             return
 
-        mod_channel = message.guild.get_channel(mod_channel_id)
+        mod_channel = message.guild.get_channel(int(mod_channel_id))
         if not mod_channel:
             return
 
@@ -116,9 +134,10 @@ class AntiSpam(commands.Cog):
             title="🚨 Spam erkannt",
             description=(
                 f"**User:** {member.mention}\n"
-                f"**ID:** {member.id}\n\n"
+                f"**ID:** {member.id}\n"
+                f"**Grund:** {verdict.reason}\n\n"
                 f"**Nachricht:**\n```{message.content}```\n\n"
-                f"➡️ User wurde für 24h in Timeout gesetzt."
+                f"➡️ User wurde für {format_duration(rules.timeout_minutes)} in Timeout gesetzt."
             ),
             color=discord.Color.red()
         )
@@ -130,6 +149,10 @@ class AntiSpam(commands.Cog):
         await mod_channel.send(embed=embed, view=view)
 
 
+def format_duration(minutes: int) -> str:
+    return f"{minutes // 60}h" if minutes % 60 == 0 else f"{minutes} Minuten"
+
+
 # ------------------------------------------------------------
 # Setup
 # ------------------------------------------------------------
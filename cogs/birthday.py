@@ -6,6 +6,7 @@ import pytz
 from typing import Optional
 
 # Annahme: Dein Datenbank-Modul ist so strukturiert
+from utils.database import run_db
 from utils.database import birthday as db_birthday 
 
 # Konfiguration der Zeitzone und Zeit
@@ -40,7 +41,7 @@ class Birthday(commands.Cog):
             await ctx.send("❌ Bitte verwende das Format **TT.MM.JJJJ** – Beispiel: `01.04.1998`", ephemeral=True)
             return
 
-        db_birthday.set_birthday(str(ctx.author.id), str(ctx.guild.id), parsed_date)
+        await run_db(db_birthday.set_birthday, str(ctx.author.id), str(ctx.guild.id), parsed_date)
         await ctx.send(f"🎂 Dein Geburtstag wurde gespeichert: **{parsed_date.strftime('%d.%m.%Y')}**", ephemeral=True)
 
     # ------------------------------------------------------------
@@ -55,7 +56,7 @@ class Birthday(commands.Cog):
         
         # Hole alle heutigen Geburtstagskinder aus der DB
         # Erwartet: Liste von Tuples (user_id, guild_id, birthday_date, last_congratulated)
-        birthdays = db_birthday.get_today_birthdays()
+        birthdays = await run_db(db_birthday.get_today_birthdays)
 
         for user_id, guild_id, birthday_date, last_congratulated in birthdays:
             # 1. Dubletten-Check: Wurde heute schon gratuliert?
@@ -68,7 +69,7 @@ class Birthday(commands.Cog):
                 continue
 
             # 3. Channel laden
-            channel_id = db_birthday.get_birthday_channel(guild_id)
+            channel_id = await run_db(db_birthday.get_birthday_channel, guild_id)
             if not channel_id:
                 continue
 
@@ -99,7 +100,7 @@ class Birthday(commands.Cog):
             try:
                 await channel.send(msg)
                 # In der DB markieren, dass gratuliert wurde
-                db_birthday.mark_congratulated(user_id, guild_id)
+                await run_db(db_birthday.mark_congratulated, user_id, guild_id)
             except discord.Forbidden:
                 print(f"WARNUNG: Keine Sendeberechtigung in Channel {channel.id} (Server: {guild.name})")
             except Exception as e:
@@ -120,7 +121,7 @@ class Birthday(commands.Cog):
             await ctx.send("❌ Dieser Befehl kann nur in einem Server verwendet werden.", ephemeral=True)
             return
              
-        db_birthday.remove_birthday(str(ctx.author.id), str(ctx.guild.id))
+        await run_db(db_birthday.remove_birthday, str(ctx.author.id), str(ctx.guild.id))
         await ctx.send("✅ Dein Geburtstag wurde entfernt.", ephemeral=True)
 
 # Setup-Funktion für den Bot
@@ -2,123 +2,108 @@ import discord
 from discord.ext import commands, tasks
 from discord.utils import utcnow
 from datetime import datetime, timedelta, timezone
-from typing import Union, Optional, List, Tuple
+from typing import Awaitable, Callable, Dict, Union, Optional, List, Tuple
+from utils.database import run_db
 from utils.database import bumps as db_bumps
 from utils.database import guilds as db_guilds
 
 from discord.ext.commands import Context
-from PIL import Image, ImageDraw, ImageFont
+from utils import avatar_cache, cards
+from utils.render_pool import RenderQueueFull, render
+from utils.pipeline import STAGE_BUMPS, MessageContext, message_pipeline
 import io
 import os
-import math
-import random
+import asyncio
+import heapq
+import time
 
 DISBOARD_ID: int = 302050872383242240
 BUMP_COOLDOWN: timedelta = timedelta(hours=2)
-
-def get_base_path(*paths: str) -> str:
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-    return os.path.join(base_dir, *paths)
-
-try:
-    FONT_PATH = get_base_path("assets", "fonts", "RobotoMono-VariableFont_wght.ttf")
-    font_main = ImageFont.truetype(FONT_PATH, 40)
-    font_small = ImageFont.truetype(FONT_PATH, 25) 
-    font_tiny = ImageFont.truetype(FONT_PATH, 20)
-    font_name = ImageFont.truetype(FONT_PATH, 30) 
-except Exception as e:
-    font_main = ImageFont.load_default()
-    font_small = ImageFont.load_default()
-    font_tiny = ImageFont.load_default()
-    font_name = ImageFont.load_default()
-
-async def create_bump_card(ctx, results: list, total_bumps: int) -> io.BytesIO:
-    width, height = 750, 80 + (len(results) * 130)
-
-    base = Image.new("RGB", (width, height), "#2B1A2E")
-    overlay = Image.new("RGB", (width, height), "#1A0C33")
-    img = Image.blend(base, overlay, alpha=0.35)
-    draw = ImageDraw.Draw(img)
-
-    fill_color = "#F0E6FF"
-    accent = "#FF007A"
-    accent2 = "#FF087B"
-
-    title_text = "🔥 TOP BUMPERS"
-    bbox_title = draw.textbbox((0, 0), title_text, font=font_main)
-    title_x = (width - (bbox_title[2] - bbox_title[0])) // 2
-    draw.text((title_x, 10), title_text, fill=accent, font=font_main)
-
-    start_y = 80
-    avatar_size = 90
-    medals = ["🔥", "⚡", "🚀", "✨", "💠"]
-
-    for i, (uid, bumps) in enumerate(results):
-        member = ctx.guild.get_member(int(uid))
-        if not member:
-            continue
-
-        y_pos = start_y + (i * 130)
-
-        card = Image.new("RGBA", (width - 40, 110), (60, 30, 80, 220))
-        mask = Image.new("L", (width - 40, 110), 0)
-        ImageDraw.Draw(mask).rounded_rectangle((0, 0, width - 40, 110), radius=22, fill=255)
-        img.paste(card, (20, y_pos), mask)
-
-        draw.rectangle([25, y_pos + 10, 30, y_pos + 100], fill=accent)
-
-        rank_text = medals[i] if i < len(medals) else f"#{i+1}"
-        draw.text((45, y_pos + 35), rank_text, fill=accent2, font=font_name)
-
-        try:
-            asset = member.display_avatar.with_format("png").with_size(128)
-            data = io.BytesIO(await asset.read())
-            avatar_img = Image.open(data).resize((avatar_size, avatar_size)).convert("RGBA")
-
-            mask = Image.new("L", (avatar_size, avatar_size), 0)
-            ImageDraw.Draw(mask).ellipse((0, 0, avatar_size, avatar_size), fill=255)
-
-            img.paste(avatar_img, (130, y_pos + 10), mask)
-
-        except Exception as e:
-            pass
-
-        name_x = 130 + avatar_size + 30
-        draw.text((name_x, y_pos + 20), member.display_name, fill=fill_color, font=font_name)
-        draw.text((name_x, y_pos + 60), f"Bumps: {bumps}", fill="#DDDDDD", font=font_small)
-
-        bar_x1, bar_x2 = name_x, width - 80
-        bar_y = y_pos + 90
-        progress = bumps / total_bumps if total_bumps > 0 else 0
-
-        draw.rounded_rectangle((bar_x1, bar_y, bar_x2, bar_y + 10), radius=5, fill=(80, 50, 100))
-
-        bar_width = int((bar_x2 - bar_x1) * progress)
-        if bar_width > 0:
-            gradient = Image.new("RGB", (bar_width, 10))
-            g = ImageDraw.Draw(gradient)
-            for x in range(bar_width):
-                r = int(255)
-                g_val = int(0 + (179 * (x / bar_width)))
-                b_val = int(122 - (122 * (x / bar_width)))
-                g.line((x, 0, x, 10), fill=(r, g_val, b_val))
-            img.paste(gradient, (bar_x1, bar_y))
-
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
-
+# Abgleich des Zeitplans mit der Datenbank (Änderungen außerhalb des Bots, z.B. Dashboard)
+BUMP_SCHEDULE_RESYNC_MINUTES = float(os.getenv("BUMP_SCHEDULE_RESYNC_MINUTES", 10))
+
+
+# ------------------------------------------------------------
+# Bump-Erinnerungen: Zeitplan
+# ------------------------------------------------------------
+class BumpReminderScheduler:
+    """
+    Hält die nächste Bump-Deadline pro Gilde in einem Min-Heap und weckt genau dann,
+    wenn die früheste Deadline abläuft. Neue Deadlines ersetzen alte (lazy deletion).
+    """
+
+    def __init__(self, callback: Callable[[str, datetime], Awaitable[None]]):
+        self._callback = callback
+        self._heap: List[Tuple[float, str]] = []
+        self._deadlines: Dict[str, float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __contains__(self, guild_id: str) -> bool:
+        return guild_id in self._deadlines
+
+    def schedule(self, guild_id: str, deadline: datetime) -> None:
+        """Plant (oder verschiebt) die Erinnerung einer Gilde auf deadline."""
+        ts = deadline.timestamp()
+        self._deadlines[guild_id] = ts
+        heapq.heappush(self._heap, (ts, guild_id))
+        self._wakeup.set()
+
+    def cancel(self, guild_id: str) -> None:
+        # Der Heap-Eintrag bleibt liegen und wird beim nächsten Durchlauf verworfen
+        self._deadlines.pop(guild_id, None)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            # Veraltete (verschobene oder abgebrochene) Einträge verwerfen
+            while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+
+            timeout = None
+            if self._heap:
+                ts, guild_id = self._heap[0]
+                timeout = ts - time.time()
+                if timeout <= 0:
+                    heapq.heappop(self._heap)
+                    del self._deadlines[guild_id]
+                    try:
+                        await self._callback(guild_id, datetime.fromtimestamp(ts, tz=timezone.utc))
+                    except Exception as e:
+                        print(f"[ERROR] Fehler bei der Bump-Erinnerung für {guild_id}: {e}")
+                    continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
 
 
 class Bumps(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        if not self.bump_reminder_check.is_running():
-            self.bump_reminder_check.start()
+        self.scheduler = BumpReminderScheduler(self.send_bump_reminder)
+
+    async def cog_load(self) -> None:
+        self.scheduler.start()
+        # Erster Durchlauf lädt den Zeitplan aller Gilden mit einer Abfrage
+        self.resync_bump_schedule.start()
+        # Disboard ist ein Bot, die Stufe muss daher auch Bot-Nachrichten sehen
+        message_pipeline.register("bumps", self.handle_message, STAGE_BUMPS, bots=True)
 
     def cog_unload(self) -> None:
-        self.bump_reminder_check.cancel()
+        message_pipeline.unregister("bumps")
+        self.resync_bump_schedule.cancel()
+        self.scheduler.stop()
 
     async def smart_send(self, ctx: commands.Context, /, **kwargs):
         if getattr(ctx, "_reply_sent", False):
@@ -137,66 +122,73 @@ class Bumps(commands.Cog):
         finally:
             setattr(ctx, "_reply_sent", True)
 
-    @tasks.loop(seconds=1)
-    async def bump_reminder_check(self) -> None:
+    # ------------------------------------------------------------
+    # Bump-Erinnerungen
+    # ------------------------------------------------------------
+    def schedule_bump_reminder(self, guild_id: str, last_bump_time: datetime) -> None:
+        """Plant die Erinnerung für den Ablauf des Cooldowns nach last_bump_time."""
+        self.scheduler.schedule(guild_id, last_bump_time + BUMP_COOLDOWN)
+
+    def cancel_bump_reminder(self, guild_id: str) -> None:
+        self.scheduler.cancel(guild_id)
+
+    @tasks.loop(minutes=BUMP_SCHEDULE_RESYNC_MINUTES)
+    async def resync_bump_schedule(self) -> None:
+        """
+        Baut den Zeitplan aus dem persistierten Zustand auf (last_bump_timestamp, reminder_sent).
+        Nach einem Absturz werden so fällige, noch nicht gesendete Erinnerungen nachgeholt.
+        """
         try:
-            guild_settings = db_bumps.get_all_guild_settings_with_roles()
+            schedule = await run_db(db_bumps.get_bump_schedule)
         except Exception as e:
-            print(f"[ERROR] Fehler beim Abrufen aller Guild-Einstellungen: {e}")
+            print(f"[ERROR] Fehler beim Laden des Bump-Zeitplans: {e}")
             return
 
-        now_utc = utcnow()
-
-        for guild_id_str, reminder_channel_id, bumper_role_id, reminder_status in guild_settings:
-            if not reminder_channel_id:
+        for guild_id_str, last_bump_time, reminder_sent in schedule:
+            if reminder_sent or guild_id_str in self.scheduler:
                 continue
+            self.schedule_bump_reminder(guild_id_str, last_bump_time)
 
-            last_bump_time: Optional[datetime] = db_bumps.get_last_bump_time(guild_id_str)
-            if last_bump_time is None:
-                continue
-
-            if last_bump_time.tzinfo is None:
-                last_bump_time = last_bump_time.replace(tzinfo=timezone.utc)
-
-            next_bump_time = last_bump_time + BUMP_COOLDOWN
-            if now_utc < next_bump_time:
-                continue
-
-            if reminder_status:
-                continue
+    @resync_bump_schedule.before_loop
+    async def before_resync_bump_schedule(self) -> None:
+        await self.bot.wait_until_ready()
 
-            channel = self.bot.get_channel(reminder_channel_id)
-            if not channel:
-                continue
+    async def send_bump_reminder(self, guild_id_str: str, next_bump_time: datetime) -> None:
+        settings = await db_guilds.fetch_guild_settings(guild_id_str)
+        if not settings.bump_reminder_channel_id:
+            return
+        reminder_channel_id = int(settings.bump_reminder_channel_id)
 
-            bumper_role_mention = ""
-            guild = self.bot.get_guild(int(guild_id_str))
-            
-            if guild and bumper_role_id:
-                role = guild.get_role(int(bumper_role_id))
-                if role:
-                    bumper_role_mention = role.mention
+        channel = self.bot.get_channel(reminder_channel_id)
+        if not channel:
+            return
 
-            try:
-                await channel.send(
-                    f"⏰ **Bump-Zeit!** Der 2-stündige Cooldown ist abgelaufen.\n"
-                    f"{bumper_role_mention} – jemand kann jetzt `/bump` nutzen! "
-                    f"<t:{int(next_bump_time.timestamp())}:R>"
-                )
-                db_bumps.set_reminder_status(guild_id_str, True)
-            except discord.Forbidden:
-                print(f"[ERROR] Keine Berechtigung, in Channel {reminder_channel_id} zu schreiben.")
-            except Exception as e:
-                print(f"[ERROR] Fehler beim Senden der Erinnerung: {e}")
+        bumper_role_mention = ""
+        guild = self.bot.get_guild(int(guild_id_str))
+        
+        if guild and settings.bumper_role_id:
+            role = guild.get_role(int(settings.bumper_role_id))
+            if role:
+                bumper_role_mention = role.mention
 
-    @bump_reminder_check.before_loop
-    async def before_bump_reminder_check(self) -> None:
-        await self.bot.wait_until_ready()
+        try:
+            await channel.send(
+                f"⏰ **Bump-Zeit!** Der 2-stündige Cooldown ist abgelaufen.\n"
+                f"{bumper_role_mention} – jemand kann jetzt `/bump` nutzen! "
+                f"<t:{int(next_bump_time.timestamp())}:R>"
+            )
+            # Nur als gesendet markieren, wenn währenddessen kein neuer Bump geplant wurde
+            if guild_id_str not in self.scheduler:
+                await run_db(db_bumps.set_reminder_status, guild_id_str, True)
+        except discord.Forbidden:
+            print(f"[ERROR] Keine Berechtigung, in Channel {reminder_channel_id} zu schreiben.")
+        except Exception as e:
+            print(f"[ERROR] Fehler beim Senden der Erinnerung: {e}")
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
+    async def handle_message(self, ctx: MessageContext) -> None:
+        message = ctx.message
         try:
-            if message.author.id != DISBOARD_ID or not message.guild:
+            if message.author.id != DISBOARD_ID:
                 return
             
             is_success_message = "Bump done" in message.content or "Bump erfolgreich" in message.content
@@ -218,16 +210,17 @@ class Bumps(commands.Cog):
                 return
 
             user_id = str(bumper.id)
-            guild_id = str(message.guild.id)
+            guild_id = ctx.guild_id
             current_time = utcnow()
 
             # Entfernt, da die Tabelle 'bump_logs' laut Fehlermeldung fehlt:
             # db_bumps.log_bump(user_id, guild_id, current_time)
             
-            db_bumps.increment_total_bumps(user_id, guild_id)
+            await run_db(db_bumps.increment_total_bumps, user_id, guild_id)
             
-            db_bumps.set_last_bump_time(guild_id, current_time)
-            db_bumps.set_reminder_status(guild_id, False) 
+            await run_db(db_bumps.set_last_bump_time, guild_id, current_time)
+            await run_db(db_bumps.set_reminder_status, guild_id, False) 
+            self.schedule_bump_reminder(guild_id, current_time)
         except Exception as e:
             print(f"[ERROR] Fehler beim Verarbeiten der Bump-Nachricht: {e}")
 
@@ -244,7 +237,7 @@ class Bumps(commands.Cog):
             await ctx.defer()
 
         guild_id = str(ctx.guild.id)
-        last_bump_time: Optional[datetime] = db_bumps.get_last_bump_time(guild_id)
+        last_bump_time: Optional[datetime] = await run_db(db_bumps.get_last_bump_time, guild_id)
 
         if last_bump_time is None:
             embed = discord.Embed(
@@ -298,10 +291,10 @@ class Bumps(commands.Cog):
 
         guild_id = str(ctx.guild.id)
         
-        top_users = db_bumps.get_bump_top(guild_id, days=None, limit=5)
+        top_users = await run_db(db_bumps.get_bump_top, guild_id, days=None, limit=5)
         
         try:
-            total_bumps = db_bumps.get_total_bumps_in_guild(guild_id)
+            total_bumps = await run_db(db_bumps.get_total_bumps_in_guild, guild_id)
         except Exception:
             total_bumps = 0
 
@@ -320,8 +313,19 @@ class Bumps(commands.Cog):
         if not active_top_users:
             return await self.smart_send(ctx, content="📊 Die Top-Bumper haben alle den Server verlassen oder konnten nicht gefunden werden.", ephemeral=True)
 
-        image_stream = await create_bump_card(ctx, active_top_users, total_bumps)
-        await self.smart_send(ctx, file=discord.File(image_stream, filename="top_bumper_leaderboard.png"))
+        # Nur Mitglieder des Servers kommen auf die Karte; Avatare parallel laden
+        members = [(ctx.guild.get_member(int(user_id)), count) for user_id, count in active_top_users]
+        members = [(member, count) for member, count in members if member]
+        if not members:
+            return await self.smart_send(ctx, content="📊 Die Top-Bumper haben alle den Server verlassen oder konnten nicht gefunden werden.", ephemeral=True)
+
+        avatars = await avatar_cache.get_avatars((member for member, _ in members), cards.LEADERBOARD_AVATAR_SIZE)
+        entries = [(member.display_name, avatar, count) for (member, count), avatar in zip(members, avatars)]
+        try:
+            png = await render(cards.render_bump_card, entries, total_bumps)
+        except RenderQueueFull:
+            return await self.smart_send(ctx, content="⏳ Gerade werden sehr viele Karten erstellt, bitte versuche es gleich noch einmal.", ephemeral=True)
+        await self.smart_send(ctx, file=discord.File(io.BytesIO(png), filename="top_bumper_leaderboard.png"))
 
     @commands.hybrid_command(
         name="topmb",
@@ -335,7 +339,7 @@ class Bumps(commands.Cog):
             await ctx.defer()
 
         guild_id = str(ctx.guild.id)
-        top_users = db_bumps.get_bump_top(guild_id, days=30, limit=3)
+        top_users = await run_db(db_bumps.get_bump_top, guild_id, days=30, limit=3)
 
         if not top_users:
             return await self.smart_send(ctx, content="📊 Es gibt noch keine Bumps in den letzten 30 Tagen.")
@@ -364,7 +368,7 @@ class Bumps(commands.Cog):
     async def getbumprole(self, ctx: commands.Context) -> None:
         if not ctx.guild: return
         guild_id = str(ctx.guild.id)
-        role_id = db_guilds.get_bumper_role(guild_id) 
+        role_id = await run_db(db_guilds.get_bumper_role, guild_id) 
         if not role_id:
             return await self.smart_send(ctx, content="❌ Keine Bumper-Rolle für diesen Server festgelegt.", ephemeral=True)
 
@@ -389,7 +393,7 @@ class Bumps(commands.Cog):
     async def delbumprole(self, ctx: commands.Context) -> None:
         if not ctx.guild: return
         guild_id = str(ctx.guild.id)
-        role_id = db_guilds.get_bumper_role(guild_id) 
+        role_id = await run_db(db_guilds.get_bumper_role, guild_id) 
         if not role_id:
             return await self.smart_send(ctx, content="❌ Keine Bumper-Rolle für diesen Server festgelegt.", ephemeral=True)
 
@@ -1,26 +1,84 @@
 # cogs/counter.py
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
+from utils.database import run_db
 from utils.database import counter as db_counter
+from utils.database.buffer import IncrementBuffer
+from utils.cache import TTLCache
+from utils.wordmatch import WordMatcher
+from utils.pipeline import STAGE_COUNTER, MessageContext, message_pipeline
+import os
+
+# ------------------------------------------------------------
+# Konfiguration
+# ------------------------------------------------------------
+# Treffer werden im Speicher gesammelt und alle COUNTER_FLUSH_INTERVAL Sekunden
+# bzw. nach COUNTER_FLUSH_MAX_EVENTS Treffern gebündelt geschrieben.
+COUNTER_FLUSH_INTERVAL = float(os.getenv("COUNTER_FLUSH_INTERVAL", 30))
+COUNTER_FLUSH_MAX_EVENTS = int(os.getenv("COUNTER_FLUSH_MAX_EVENTS", 500))
+# Kompilierte Wortlisten pro Guild; werden bei Änderungen über die Befehle sofort neu gebaut
+COUNTER_MATCHER_CACHE_SIZE = int(os.getenv("COUNTER_MATCHER_CACHE_SIZE", 10000))
+COUNTER_MATCHER_CACHE_TTL = float(os.getenv("COUNTER_MATCHER_CACHE_TTL", 3600))
 
 class Counter(commands.Cog):
     """Verwaltet und zeigt Wort-Statistiken für den Server an"""
     
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
+        # guild_id -> WordMatcher mit allen registrierten Wörtern
+        self.matchers = TTLCache(COUNTER_MATCHER_CACHE_SIZE, COUNTER_MATCHER_CACHE_TTL)
+        # (guild_id, wort) -> Anzahl Treffer seit dem letzten Flush
+        self.count_buffer = IncrementBuffer("word_counter", db_counter.flush_word_counts, COUNTER_FLUSH_MAX_EVENTS)
+        self.flush_counts.start()
+
+    async def cog_load(self):
+        message_pipeline.register("counter", self.handle_message, STAGE_COUNTER)
 
+    async def cog_unload(self):
+        message_pipeline.unregister("counter")
+        self.flush_counts.cancel()
+        # Restliche Treffer schreiben, damit bei einem sauberen Neustart nichts verloren geht
+        await self.flush_count_buffer()
+
+    # ------------------------------------------------------------
+    # Treffer-Puffer und Wort-Automat
     # ------------------------------------------------------------
-    # Listener: Überwacht jede Nachricht auf registrierte Wörter
+    @tasks.loop(seconds=COUNTER_FLUSH_INTERVAL)
+    async def flush_counts(self):
+        await self.flush_count_buffer()
+
+    async def flush_count_buffer(self):
+        try:
+            await self.count_buffer.flush()
+        except Exception as e:
+            print(f"[ERROR] Wort-Counter konnten nicht gespeichert werden, neuer Versuch beim nächsten Flush: {e}")
+
+    async def get_matcher(self, guild_id: str) -> WordMatcher:
+        """Gibt den Automaten der Guild zurück; beim ersten Zugriff werden die Wörter geladen."""
+        matcher = self.matchers.get(guild_id)
+        if matcher is None:
+            matcher = await run_db(
+                self.matchers.get_or_load, guild_id,
+                lambda: WordMatcher(db_counter.get_counter_words(guild_id))
+            )
+        return matcher
+
     # ------------------------------------------------------------
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        # Ignoriere Bots und Direktnachrichten
-        if message.author.bot or not message.guild:
+    # Nachrichten-Stufe: Überwacht jede Nachricht auf registrierte Wörter
+    # ------------------------------------------------------------
+    async def handle_message(self, ctx: MessageContext):
+        guild_id = ctx.guild_id
+        matcher = await self.get_matcher(guild_id)
+        if not matcher:
             return
-        
-        # Datenbank-Abgleich und Hochzählen
-        db_counter.increment_all_matches(str(message.guild.id), message.content)
+
+        # Ein Durchlauf über die Nachricht, egal wie viele Wörter gezählt werden
+        flush = False
+        for word in matcher.find(ctx.message.content):
+            flush = self.count_buffer.add((guild_id, word)) or flush
+        if flush:
+            self.count_buffer.schedule_flush()
 
     # ------------------------------------------------------------
     # Befehl: Wort zum Zähler hinzufügen
@@ -34,7 +92,8 @@ class Counter(commands.Cog):
         guild_id = str(interaction.guild_id)
         word_clean = wort.strip().lower()
 
-        if db_counter.add_new_counter(guild_id, word_clean):
+        if await run_db(db_counter.add_new_counter, guild_id, word_clean):
+            self.matchers.invalidate(guild_id)
             await interaction.response.send_message(
                 f"✅ Erfolg! Ich zähle ab sofort jedes Mal, wenn `{word_clean}` geschrieben wird.", 
                 ephemeral=True
@@ -53,7 +112,8 @@ class Counter(commands.Cog):
         description="Zeigt die Rangliste der gezählten Wörter auf diesem Server"
     )
     async def show_counters(self, interaction: discord.Interaction):
-        stats = db_counter.get_counter_stats(str(interaction.guild_id))
+        await self.flush_count_buffer()
+        stats = await run_db(db_counter.get_counter_stats, str(interaction.guild_id))
 
         if not stats:
             await interaction.response.send_message(
@@ -91,9 +151,11 @@ class Counter(commands.Cog):
     )
     @app_commands.checks.has_permissions(manage_guild=True)
     async def counter_remove(self, interaction: discord.Interaction, wort: str):
+        guild_id = str(interaction.guild_id)
         word_clean = wort.strip().lower()
         
-        if db_counter.delete_counter(str(interaction.guild_id), word_clean):
+        if await run_db(db_counter.delete_counter, guild_id, word_clean):
+            self.matchers.invalidate(guild_id)
             await interaction.response.send_message(
                 f"🗑️ Der Counter für `{word_clean}` wurde erfolgreich gelöscht.", 
                 ephemeral=True
@@ -113,9 +175,13 @@ class Counter(commands.Cog):
     )
     @app_commands.checks.has_permissions(manage_guild=True)
     async def counter_reset(self, interaction: discord.Interaction, wort: str):
+        guild_id = str(interaction.guild_id)
         word_clean = wort.strip().lower()
-        
-        if db_counter.reset_counter(str(interaction.guild_id), word_clean):
+
+        # Gepufferte Treffer zuerst schreiben, damit sie nach dem Zurücksetzen nicht wieder auftauchen
+        await self.flush_count_buffer()
+        if await run_db(db_counter.reset_counter, guild_id, word_clean):
+            self.matchers.invalidate(guild_id)
             await interaction.response.send_message(
                 f"🔄 Der Zähler für `{word_clean}` wurde auf 0 zurückgesetzt.", 
                 ephemeral=True
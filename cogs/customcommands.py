@@ -1,9 +1,36 @@
 import discord
 from discord.ext import commands
 from discord.ext.commands import Context
-from typing import Optional
+from typing import Callable, Dict, List, Optional
+from utils.database import run_db
 from utils.database import custom_commands as db_commands  # DB-Handler für dynamische Commands
-from utils.database import guilds as db_guilds
+from utils.pipeline import STAGE_CUSTOM_COMMANDS, MessageContext, message_pipeline
+import re
+
+
+# ------------------------------------------------------------
+# Antwort-Vorlagen
+# ------------------------------------------------------------
+# Platzhalter in Antworten und ihr Wert für eine Nachricht
+PLACEHOLDERS: Dict[str, Callable[[discord.Message], str]] = {
+    "user": lambda message: message.author.mention,
+}
+_PLACEHOLDER_RE = re.compile(r"\{(" + "|".join(map(re.escape, PLACEHOLDERS)) + r")\}")
+
+class ResponseTemplate:
+    """Einmal zerlegte Antwort: feste Textstücke und Platzhalter im Wechsel."""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, response: str):
+        # Gerade Indizes sind Text, ungerade die Namen der Platzhalter
+        self.parts: List[str] = _PLACEHOLDER_RE.split(response)
+
+    def render(self, message: discord.Message) -> str:
+        return "".join(
+            part if i % 2 == 0 else PLACEHOLDERS[part](message)
+            for i, part in enumerate(self.parts)
+        )
 
 
 class CustomCommands(commands.Cog):
@@ -11,6 +38,29 @@ class CustomCommands(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # guild_id -> {command_name: vorbereitete Antwort}; der Listener fragt nie die Datenbank
+        self.guild_commands: Dict[str, Dict[str, ResponseTemplate]] = {}
+
+    async def cog_load(self):
+        rows = await run_db(db_commands.get_all_guild_commands)
+        guild_commands: Dict[str, Dict[str, ResponseTemplate]] = {}
+        for guild_id, command_name, response in rows:
+            guild_commands.setdefault(guild_id, {})[command_name] = ResponseTemplate(response)
+        self.guild_commands = guild_commands
+        print(f"✅ {len(rows)} Custom Commands für {len(guild_commands)} Server geladen.")
+        message_pipeline.register("custom_commands", self.handle_message, STAGE_CUSTOM_COMMANDS)
+
+    async def cog_unload(self):
+        message_pipeline.unregister("custom_commands")
+
+    async def reload_guild_commands(self, guild_id: str):
+        """Lädt die Commands einer Gilde neu, z.B. nach Änderungen im Dashboard."""
+        rows = await run_db(db_commands.get_all_commands, guild_id)
+        self.guild_commands[guild_id] = {row["name"]: ResponseTemplate(row["response"]) for row in rows}
+
+    @commands.Cog.listener()
+    async def on_guild_settings_changed(self, guild_id: str):
+        await self.reload_guild_commands(guild_id)
 
     # ------------------------------------------------------------
     # Command: Eigenen Custom Command hinzufügen
@@ -34,7 +84,8 @@ class CustomCommands(commands.Cog):
             await ctx.send("❌ Der Command darf nur aus Buchstaben und Zahlen bestehen.", ephemeral=True)
             return
         
-        db_commands.add_command(str(ctx.guild.id), command_name.lower(), response)
+        await run_db(db_commands.add_command, str(ctx.guild.id), command_name.lower(), response)
+        self.guild_commands.setdefault(str(ctx.guild.id), {})[command_name.lower()] = ResponseTemplate(response)
         await ctx.send(f"✅ Custom Command `{command_name}` wurde hinzugefügt!", ephemeral=True)
 
     # ------------------------------------------------------------
@@ -54,33 +105,35 @@ class CustomCommands(commands.Cog):
             await ctx.send("❌ Nur Admins können Commands entfernen.", ephemeral=True)
             return
         
-        removed = db_commands.remove_command(str(ctx.guild.id), command_name.lower())
+        removed = await run_db(db_commands.remove_command, str(ctx.guild.id), command_name.lower())
+        self.guild_commands.get(str(ctx.guild.id), {}).pop(command_name.lower(), None)
         if removed:
             await ctx.send(f"✅ Custom Command `!{command_name}` wurde entfernt!", ephemeral=True)
         else:
             await ctx.send(f"❌ Custom Command `!{command_name}` existiert nicht.", ephemeral=True)
 
     # ------------------------------------------------------------
-    # Message Listener: Dynamische Commands ausführen
+    # Nachrichten-Stufe: Dynamische Commands ausführen
     # ------------------------------------------------------------
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or message.guild is None:
+    async def handle_message(self, ctx: MessageContext):
+        guild_commands = self.guild_commands.get(ctx.guild_id)
+        if not guild_commands:
             return
 
-        guild_id = str(message.guild.id)
-        prefix = db_guilds.get_prefix(guild_id) or "!"  # Fallback
+        message = ctx.message
+        prefix = ctx.prefix
 
         content = message.content.strip()
         if not content.startswith(prefix):
             return
 
-        cmd_name = content[len(prefix):].split()[0].lower()
+        parts = content[len(prefix):].split(maxsplit=1)
+        if not parts:
+            return
 
-        cmd_data = db_commands.get_command(guild_id, cmd_name)
-        if cmd_data:
-            response = cmd_data["response"].replace("{user}", message.author.mention)
-            await message.channel.send(response)
+        template = guild_commands.get(parts[0].lower())
+        if template:
+            await message.channel.send(template.render(message))
 
 
 
@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
+from utils.database import run_db
 from utils.database import guilds as db_guilds
+from utils.hydration import get_startup_data
 
 class DynamicVoice(commands.Cog):
     """Erstellt dynamische Voice Channels beim Beitritt in einen speziellen 'Join to Create' Kanal."""
@@ -21,7 +23,7 @@ class DynamicVoice(commands.Cog):
             position=0
         )
         
-        db_guilds.set_dynamic_voice_channel(str(guild.id), str(new_channel.id))
+        await run_db(db_guilds.set_dynamic_voice_channel, str(guild.id), str(new_channel.id))
         print(f"✅ Neuer Starter-Channel erstellt: {new_channel.name} ({new_channel.id}) in {guild.name}")
         return new_channel
 
@@ -29,33 +31,44 @@ class DynamicVoice(commands.Cog):
     # ------------------------------------------------------------------
     # Bot-Start-Check
     # ------------------------------------------------------------------
-    @commands.Cog.listener()
-    async def on_ready(self):
+    async def cog_load(self):
         """Überprüft beim Start, ob der Starter-Channel für jeden Server existiert und gültig ist."""
-        await self.bot.wait_until_ready()
-        
+        settings = (await get_startup_data(self.bot)).settings
+
         for guild in self.bot.guilds:
-            guild_id = str(guild.id)
-            starter_channel_id_str = db_guilds.get_dynamic_voice_channel(guild_id)
-            
-            if starter_channel_id_str:
-                try:
-                    starter_channel_id = int(starter_channel_id_str)
-                    current_channel = self.bot.get_channel(starter_channel_id)
-                except ValueError:
-                    current_channel = None
-                
-                if not current_channel or not isinstance(current_channel, discord.VoiceChannel):
-                    print(f"WARNUNG: Starter-Channel für '{guild.name}' (ID {starter_channel_id_str}) fehlt oder ist ungültig. Setze auf None.")
-                    db_guilds.set_dynamic_voice_channel(guild_id, None)
-                    print(f"HINWEIS: Bitte setzen Sie den Dynamic Voice Channel für '{guild.name}' neu mit /setup channel voice.")
+            # Während des Ladens beigetretene Gilden fehlen in den Startdaten
+            guild_settings = settings.get(str(guild.id)) or await db_guilds.fetch_guild_settings(str(guild.id))
+            await self._check_starter_channel(guild, guild_settings.dynamic_voice_channel_id)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        """Beim Start übersprungene (nicht verfügbare) Gilden prüfen, sobald sie verfügbar sind."""
+        settings = await db_guilds.fetch_guild_settings(str(guild.id))
+        await self._check_starter_channel(guild, settings.dynamic_voice_channel_id)
+
+    async def _check_starter_channel(self, guild: discord.Guild, starter_channel_id_str):
+        # Nicht verfügbare Gilden (z.B. Discord-Störung) haben keine Channels im Cache;
+        # ihr Starter-Channel würde sonst fälschlich als gelöscht gelten
+        if guild.unavailable or not starter_channel_id_str:
+            return
+
+        try:
+            current_channel = guild.get_channel(int(starter_channel_id_str))
+        except ValueError:
+            current_channel = None
+
+        if not current_channel or not isinstance(current_channel, discord.VoiceChannel):
+            print(f"WARNUNG: Starter-Channel für '{guild.name}' (ID {starter_channel_id_str}) fehlt oder ist ungültig. Setze auf None.")
+            await run_db(db_guilds.set_dynamic_voice_channel, str(guild.id), None)
+            print(f"HINWEIS: Bitte setzen Sie den Dynamic Voice Channel für '{guild.name}' neu mit /setup channel voice.")
 
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
         guild_id = str(member.guild.id)
         
-        starter_channel_id_str = db_guilds.get_dynamic_voice_channel(guild_id)
+        settings = await db_guilds.fetch_guild_settings(guild_id)
+        starter_channel_id_str = settings.dynamic_voice_channel_id
         
         if not starter_channel_id_str:
             return
@@ -4,7 +4,8 @@ from discord.ext import commands
 from discord.ext.commands import Context
 from typing import Optional
 from datetime import datetime
-from utils import database as db
+from utils.database import run_db
+from utils.database import leveling as db_leveling
 
 class Info(commands.Cog):
     """Bietet Informationen über Benutzer"""
@@ -61,14 +62,9 @@ class Info(commands.Cog):
 
         guild_id = str(ctx.guild.id)
         user_id = str(user.id)
-        conn = db.get_connection()
         
         try:
-            cursor = conn.cursor()
-            query = "SELECT counter, level FROM user WHERE id = %s AND guild_id = %s"
-            cursor.execute(query, (user_id, guild_id)) 
-            result = cursor.fetchone()
-            cursor.close()
+            result = await run_db(db_leveling.get_user_stats, user_id, guild_id)
 
             if result:
                 counter, level = result
@@ -77,8 +73,6 @@ class Info(commands.Cog):
                 
         except Exception as e:
             print(f"Fehler bei Datenbankabfrage für Level-Info: {e}")
-        finally:
-            conn.close()
 
         await ctx.send(embed=embed)
 
@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
+from utils.database import run_db
 from utils.database import joinleft as db_joinleft
+from utils.hydration import get_startup_data
 
 
 class WelcomeLeave(commands.Cog):
@@ -10,15 +12,11 @@ class WelcomeLeave(commands.Cog):
         self.invites = {}
 
     # ------------------------------------------------------------
-    # Bot ist bereit
+    # Cog wird geladen
     # ------------------------------------------------------------
-    @commands.Cog.listener()
-    async def on_ready(self):
-        for guild in self.bot.guilds:
-            try:
-                self.invites[guild.id] = await guild.invites()
-            except discord.Forbidden:
-                self.invites[guild.id] = []
+    async def cog_load(self):
+        # Einladungen aller Gilden kommen aus der Startphase (parallel statt nacheinander geladen)
+        self.invites = dict((await get_startup_data(self.bot, invites=True)).invites)
         print("✅ WelcomeLeave Cog bereit!")
 
     # ------------------------------------------------------------
@@ -27,7 +25,7 @@ class WelcomeLeave(commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         guild = member.guild
-        channel_id = db_joinleft.get_welcome_channel(str(guild.id))
+        channel_id = await run_db(db_joinleft.get_welcome_channel, str(guild.id))
 
         if not channel_id:
             return  # Kein Channel in DB gespeichert
@@ -75,7 +73,7 @@ class WelcomeLeave(commands.Cog):
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         guild = member.guild
-        channel_id = db_joinleft.get_welcome_channel(str(guild.id))
+        channel_id = await run_db(db_joinleft.get_welcome_channel, str(guild.id))
 
         if not channel_id:
             return  # Kein Channel gespeichert
@@ -1,39 +1,26 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ext.commands import Context
-from typing import Union, Optional
-from utils.database import connection as db 
-from utils.database import messages as db_messages
-import random
-from PIL import Image, ImageDraw, ImageFont
+from typing import Dict, List, Tuple, Union, Optional
+from utils.database import run_db
+from utils.database import leveling as db_leveling
+from utils.database.buffer import IncrementBuffer
+from utils.cache import TTLCache
+from utils.ranking import GuildRanking
+from utils.pipeline import STAGE_LEVELING, MessageContext, message_pipeline
+from utils import avatar_cache, cards
+from utils.render_pool import RenderQueueFull, render
 import io
 import os
 import math
 
 # ------------------------------------------------------------
-# Hilfsfunktionen
+# Konfiguration XP-Puffer
 # ------------------------------------------------------------
-def get_base_path(*paths: str) -> str:
-    """Erstellt einen sicheren Pfad relativ zum Projekt-Wurzelverzeichnis."""
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-    return os.path.join(base_dir, *paths)
-
-# ------------------------------------------------------------
-# Schriftarten laden
-# ------------------------------------------------------------
-try:
-    FONT_PATH = get_base_path("assets", "fonts", "RobotoMono-VariableFont_wght.ttf")
-    font_main = ImageFont.truetype(FONT_PATH, 40)
-    font_small = ImageFont.truetype(FONT_PATH, 25) 
-    font_tiny = ImageFont.truetype(FONT_PATH, 20)
-    # NEUE SCHRIFTART für den Namen
-    font_name = ImageFont.truetype(FONT_PATH, 30) 
-except Exception as e:
-    print(f"⚠️ Fehler beim Laden der Schriftart: {e}")
-    font_main = ImageFont.load_default()
-    font_small = ImageFont.load_default()
-    font_tiny = ImageFont.load_default()
-    font_name = ImageFont.load_default()
+# Gepufferte XP werden spätestens nach XP_FLUSH_INTERVAL Sekunden
+# oder nach XP_FLUSH_MAX_EVENTS Nachrichten in die Datenbank geschrieben.
+XP_FLUSH_INTERVAL = float(os.getenv("XP_FLUSH_INTERVAL", 10))
+XP_FLUSH_MAX_EVENTS = int(os.getenv("XP_FLUSH_MAX_EVENTS", 500))
 
 # ------------------------------------------------------------
 # Levelberechnung
@@ -61,261 +48,9 @@ def berechne_fortschritt(counter: int, level: int):
     return progress_percent, xp_in_level, xp_needed
 
 
-# ------------------------------------------------------------
-# Rank Card erstellen 
-# ------------------------------------------------------------
-async def create_rank_card(member: discord.User, counter: int, level: int, rank: int, progress_percent: float, xp_current_in_level: int, xp_needed_for_level_up: int) -> io.BytesIO:
-    """Erstellt das Rank-Bild mit Benutzername, weißer Schrift/Balken und leichtem Overlay."""
-    width, height = 800, 200
-    fallback_color = (30, 30, 30, 255) 
-    
-    img = Image.new("RGBA", (width, height), fallback_color) 
-    
-    # 🎨 Farbeinstellungen: IMMER WEISS
-    fill_color = "#FFFFFF" 
-    progress_color = (255, 255, 255, 255) 
-    
-    # ------------------------------------------------------------
-    # Hintergrundbild laden
-    # ------------------------------------------------------------
-    try:
-        images_dir = get_base_path("images") 
-        valid_extensions = [".png", ".jpg", ".jpeg"]
-        image_number = random.randint(1, 10)
-        
-        found_path = None
-        for ext in valid_extensions:
-            temp_path = os.path.join(images_dir, f"background{image_number}{ext}")
-            if os.path.exists(temp_path):
-                found_path = temp_path
-                break
-        
-        if found_path:
-            bg_img = Image.open(found_path).resize((width, height)).convert("RGBA")
-            img = Image.alpha_composite(img, bg_img)
-
-    except Exception:
-        pass 
-        
-    draw = ImageDraw.Draw(img) 
-
-    # ------------------------------------------------------------
-    # 🌑 KONTRAST-OVERLAY HINZUFÜGEN (Alpha 100/255) 🌑
-    # ------------------------------------------------------------
-    overlay = Image.new('RGBA', (width, height), (0, 0, 0, 100))
-    img = Image.alpha_composite(img, overlay)
-    
-    draw = ImageDraw.Draw(img) 
-    
-    # ------------------------------------------------------------
-    # Avatar rund einfügen
-    # ------------------------------------------------------------
-    try:
-        avatar_size = (150, 150)
-        asset = member.display_avatar.with_format("png").with_size(256)
-        data = io.BytesIO(await asset.read())
-        avatar_img = Image.open(data).resize(avatar_size).convert("RGBA")
-
-        mask = Image.new("L", avatar_size, 0)
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.ellipse((0, 0, avatar_size[0], avatar_size[1]), fill=255)
-        img.paste(avatar_img, (25, 25), mask)
-        
-        draw.ellipse((20, 20, 175, 175), outline=(255, 255, 255, 255), width=5)
-
-    except Exception as e:
-        print(f"⚠️ Avatar konnte nicht geladen werden: {e}")
-
-    # ------------------------------------------------------------
-    # BENUTZERNAME HINZUFÜGEN
-    # ------------------------------------------------------------
-    name_text = member.display_name
-    
-    # Text-Bounding Box ermitteln, um es rechtsbündig zur rechten Kante zu zentrieren
-    # (200 ist die Start-X-Koordinate nach dem Avatar)
-    name_x_start = 200
-    name_x_end = width - 10 # 790
-    
-    # Berechnung der Textbreite
-    bbox_name = draw.textbbox((0, 0), name_text, font=font_name)
-    text_w_name = bbox_name[2] - bbox_name[0]
-    
-    # Text zentrieren im rechten Bereich
-    name_x = name_x_start + ((name_x_end - name_x_start) - text_w_name) // 2
-    
-    # Platzierung des Namens
-    name_y = 5 
-    draw.text((name_x, name_y), name_text, fill=fill_color, font=font_name)
-    
-    # ------------------------------------------------------------
-    # Text und Fortschrittsbalken (Koordinaten angepasst)
-    # ------------------------------------------------------------
-    
-    # Level und Rank Positionierung (y-Koordinate von 20 auf 35 verschoben)
-    draw.text((200, 35), f"Level: {level}", fill=fill_color, font=font_main)
-    draw.text((480, 35), f"Rank: {rank}", fill=fill_color, font=font_main)
-    
-    # ------------------------------------------------------------
-    # Fortschrittsbalken (y-Koordinate von 90 auf 105 verschoben)
-    # ------------------------------------------------------------
-    bar_x, bar_y = 200, 105
-    bar_width = 580 
-    bar_height = 25
-    
-    draw.rectangle([bar_x, bar_y, bar_x + bar_width, bar_y + bar_height], fill=(51, 51, 51, 255))
-    draw.rectangle([bar_x, bar_y, bar_x + int(bar_width * progress_percent), bar_y + bar_height], fill=progress_color)
-
-    for i in range(0, bar_width, 15):
-        draw.line([(bar_x + i, bar_y), (bar_x + i, bar_y + bar_height)], fill=(17, 17, 17, 255), width=1)
-
-    # ------------------------------------------------------------
-    # XP-Text (UNTER DEM BALKEN) (y-Koordinate angepasst)
-    # ------------------------------------------------------------
-    xp_text_total = f"XP: {counter}"
-    xp_text_progress = f"{xp_current_in_level}/{xp_needed_for_level_up} XP bis Level {level + 1}"
-    
-    # 1. Text: Gesamt-XP (linksbündig)
-    draw.text((bar_x, bar_y + bar_height + 15), xp_text_total, fill=fill_color, font=font_small)
-
-    # 2. Text: Fortschritt-XP (rechts daneben)
-    bbox_total = draw.textbbox((0, 0), xp_text_total, font=font_small)
-    text_w_total = bbox_total[2] - bbox_total[0]
-    
-    start_x_progress = bar_x + text_w_total + 20 
-
-    draw.text((start_x_progress, bar_y + bar_height + 15), xp_text_progress, fill=progress_color, font=font_small)
-    
-    # ------------------------------------------------------------
-    # Ausgabe vorbereiten
-    # ------------------------------------------------------------
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
-
-
-# ------------------------------------------------------------
-# Top 5 Rank Card erstellen
-# ------------------------------------------------------------
-
-async def create_top5_card(ctx: Context[commands.Bot], results: list) -> io.BytesIO:
-    """Erstellt ein futuristisches Discord-Ranking-Bild mit korrektem Fortschrittsbalken."""
-    width, height = 750, 80 + (len(results) * 130)
-
-    # 🎨 Hintergrund mit leichtem Farbverlauf
-    base = Image.new("RGB", (width, height), "#1E1E2E")
-    overlay = Image.new("RGB", (width, height), "#2A1A40")
-    img = Image.blend(base, overlay, alpha=0.3)
-    draw = ImageDraw.Draw(img)
-
-    # Farben und Fonts
-    fill_color = "#E0E0E0"
-    accent = "#00FFFF" # Neon-Cyan
-    neon_violet = "#9D00FF"
-    rank_color = (255, 215, 0, 255) # Gold
-
-
-    # 🏆 Titel mit Glow-Effekt
-    title_text = "🏆 TOP 5 USER"
-    bbox_title = draw.textbbox((0, 0), title_text, font=font_main)
-    title_x = (width - (bbox_title[2] - bbox_title[0])) // 2
-    draw.text((title_x + 2, 12 + 2), title_text, fill=neon_violet, font=font_main)
-    draw.text((title_x, 10), title_text, fill=accent, font=font_main)
-
-    start_y = 80
-    avatar_size = 90
-    medals = ["🥇", "🥈", "🥉", "🏅", "🎖️"]
-
-    # 🔁 Einträge durchlaufen
-    for i, (uid, counter, level) in enumerate(results):
-        # Wir wissen, dass 'results' bereits gefiltert ist, also muss das Mitglied existieren.
-        # Wir verwenden hier get_member(), da fetch_member() im Befehl top5 bereits verwendet wurde, 
-        # um die Ergebnisse zu filtern. get_member() ist ausreichend, da es im Cache sein sollte.
-        member = ctx.guild.get_member(int(uid)) 
-
-        # Dies sollte nicht passieren, da wir in top5 filtern, aber zur Sicherheit:
-        if member is None:
-            continue
-
-        y_pos = start_y + (i * 130)
-        box_y1, box_y2 = y_pos, y_pos + 110
-
-        # 🔳 Box-Hintergrund mit abgerundeten Ecken
-        box = Image.new("RGBA", (width - 40, 110), (40, 40, 60, 220))
-        mask = Image.new("L", (width - 40, 110), 0)
-        ImageDraw.Draw(mask).rounded_rectangle((0, 0, width - 40, 110), radius=20, fill=255)
-        img.paste(box, (20, y_pos), mask)
-
-        # 💡 Leichte Neonlinie links
-        draw.rectangle([25, y_pos + 10, 30, box_y2 - 10], fill=accent)
-
-        # 🏅 Rang
-        rank_text = medals[i] if i < len(medals) else f"#{i+1}"
-        draw.text((45, y_pos + 35), rank_text, fill=rank_color, font=font_name)
-
-        # 👤 Avatar mit Glow
-        try:
-            asset = member.display_avatar.with_format("png").with_size(128)
-            data = io.BytesIO(await asset.read())
-            avatar_img = Image.open(data).resize((avatar_size, avatar_size)).convert("RGBA")
-
-            # Glow-Effekt
-            glow = Image.new("RGBA", (avatar_size + 20, avatar_size + 20), (0, 0, 0, 0))
-            glow_draw = ImageDraw.Draw(glow)
-            glow_draw.ellipse((0, 0, avatar_size + 20, avatar_size + 20), fill=(0, 255, 255, 80))
-            img.paste(glow, (130 - 10, y_pos), glow)
-
-            # Runde Maske
-            mask = Image.new("L", (avatar_size, avatar_size), 0)
-            ImageDraw.Draw(mask).ellipse((0, 0, avatar_size, avatar_size), fill=255)
-            img.paste(avatar_img, (130, y_pos + 10), mask)
-
-        except Exception as e:
-            print(f"⚠️ Avatar konnte nicht geladen werden für {member.name}: {e}")
-
-        # 📜 Name & Level
-        name_x = 130 + avatar_size + 30
-        draw.text((name_x, y_pos + 20), member.display_name, fill=fill_color, font=font_name)
-        draw.text((name_x, y_pos + 60), f"Level {level} • XP {counter}", fill="#AAAAAA", font=font_small)
-
-        # 📈 Fortschrittsbalken mit richtiger Berechnung
-        bar_x1, bar_x2 = name_x, width - 80
-        bar_y = y_pos + 90
-
-        # Fortschritt korrekt berechnen
-        progress, xp_current, xp_needed = berechne_fortschritt(counter, level)
-        progress = max(0.0, min(1.0, progress)) # Clamp auf 0–1
-
-        # Hintergrund des Balkens
-        draw.rounded_rectangle((bar_x1, bar_y, bar_x2, bar_y + 10), radius=5, fill=(70, 70, 90))
-
-        # Fortschritt (Cyan → Violett Verlauf)
-        bar_width = int((bar_x2 - bar_x1) * progress)
-        if bar_width > 0:
-            gradient = Image.new("RGB", (bar_width, 10), "#000000")
-            grad_draw = ImageDraw.Draw(gradient)
-            for x in range(bar_width):
-                # Schönerer Übergang: von #00FFFF nach #9D00FF
-                r = int(0 + (157 - 0) * (x / bar_width))
-                g = int(255 - (255 - 0) * (x / bar_width))
-                b = 255
-                grad_draw.line((x, 0, x, 10), fill=(r, g, b))
-            img.paste(gradient, (bar_x1, bar_y))
-
-        # Glühender Punkt am Ende
-        if bar_width > 0:
-            glow_radius = 8
-            glow = Image.new("RGBA", (glow_radius * 2, glow_radius * 2), (0, 0, 0, 0))
-            glow_draw = ImageDraw.Draw(glow)
-            glow_draw.ellipse((0, 0, glow_radius * 2, glow_radius * 2), fill=(157, 0, 255, 180))
-            img.paste(glow, (bar_x1 + bar_width - glow_radius, bar_y - 4), glow)
-
-    # 📦 Ausgabe
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
-
+# Gerenderte Karten (PNG-Bytes) werden für wiederholte /rank-Aufrufe zwischengespeichert
+RANK_CARD_CACHE_SIZE = int(os.getenv("RANK_CARD_CACHE_SIZE", 256))
+RANK_CARD_CACHE_TTL = float(os.getenv("RANK_CARD_CACHE_TTL", 900))
 
 # ------------------------------------------------------------
 # Cog-Klasse für das Levelsystem 
@@ -325,53 +60,89 @@ class Leveling(commands.Cog):
     """Levelsystem für Nachrichten-Zählung und Rangkarten"""
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # Noch nicht geschriebene XP pro (guild_id, user_id)
+        self.xp_buffer = IncrementBuffer("xp", db_leveling.flush_message_xp, XP_FLUSH_MAX_EVENTS)
+        # Rangliste pro Gilde mit dem aktuellen Zählerstand inkl. gepufferter XP
+        # (Level-Up-Erkennung, /rank und /top5 ohne Datenbankabfrage)
+        self.rankings: Dict[str, GuildRanking] = {}
+        # (guild_id, user_id, counter, rank, name, avatar, hintergrund) -> PNG-Bytes
+        self.rank_card_cache = TTLCache(RANK_CARD_CACHE_SIZE, RANK_CARD_CACHE_TTL)
+        # Zuletzt gewählter Hintergrund pro (guild_id, user_id) und Zählerstand, damit
+        # unveränderte Profile dieselbe (gecachte) Karte bekommen
+        self.rank_backgrounds = TTLCache(RANK_CARD_CACHE_SIZE, RANK_CARD_CACHE_TTL)
+        self.flush_xp.start()
+
+    async def cog_load(self):
+        # Ranglisten einmalig aus der Datenbank aufbauen; danach hält handle_message sie aktuell
+        rows = await run_db(db_leveling.get_all_counters)
+        per_guild: Dict[str, List[Tuple[str, int]]] = {}
+        for guild_id, uid, counter in rows:
+            per_guild.setdefault(guild_id, []).append((uid, counter))
+        self.rankings = {guild_id: GuildRanking(entries) for guild_id, entries in per_guild.items()}
+        print(f"✅ Ranglisten für {len(self.rankings)} Server geladen ({len(rows)} User).")
+        message_pipeline.register("leveling", self.handle_message, STAGE_LEVELING)
+
+    async def cog_unload(self):
+        message_pipeline.unregister("leveling")
+        self.flush_xp.cancel()
+        # Restliche XP schreiben, damit bei einem sauberen Neustart nichts verloren geht
+        await self.flush_xp_buffer()
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
+    # ------------------------------------------------------------
+    # XP-Puffer
+    # ------------------------------------------------------------
+    @tasks.loop(seconds=XP_FLUSH_INTERVAL)
+    async def flush_xp(self):
+        await self.flush_xp_buffer()
 
-        ctx = await self.bot.get_context(message)
-        if ctx.valid: 
+    async def flush_xp_buffer(self):
+        try:
+            await self.xp_buffer.flush()
+        except Exception as e:
+            print(f"[ERROR] XP konnten nicht gespeichert werden, neuer Versuch beim nächsten Flush: {e}")
+
+    def get_ranking(self, guild_id: str) -> GuildRanking:
+        ranking = self.rankings.get(guild_id)
+        if ranking is None:
+            ranking = self.rankings[guild_id] = GuildRanking()
+        return ranking
+
+    async def get_total(self, guild_id: str, uid: str) -> int:
+        """
+        Gibt den aktuellen Zählerstand zurück. User, die nicht in der Rangliste stehen
+        (neu oder als ausgetreten markiert), werden in der Datenbank nachgeschlagen.
+        """
+        ranking = self.get_ranking(guild_id)
+        total = ranking.get(uid)
+        if total is None:
+            stats = await run_db(db_leveling.get_user_stats, uid, guild_id)
+            # Während des Ladens kann eine parallele Nachricht den Stand bereits gesetzt haben
+            total = ranking.get(uid)
+            if total is None:
+                total = stats[0] if stats else 0
+                if stats:
+                    ranking.update(uid, total)
+        return total
+
+    async def handle_message(self, ctx: MessageContext):
+        """Stufe der Nachrichten-Pipeline: XP für jede Nachricht, die kein Befehl ist."""
+        if ctx.is_command:
             return
 
+        message = ctx.message
         uid = str(message.author.id)
         uname = message.author.name
-        guild_id = str(message.guild.id) # 🚩 Neu: Guild ID holen
-        channel_id = str(message.channel.id)
-
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        # 🚩 Angepasst: SELECT benötigt guild_id
-        cursor.execute("SELECT counter, level FROM user WHERE id=%s AND guild_id=%s", (uid, guild_id))
-        result = cursor.fetchone()
-
-        old_level = 0
-        if result is None:
-            counter = 1
-        else:
-            counter = result[0] + 1
-            old_level = result[1]
+        guild_id = ctx.guild_id
 
-        new_level = berechne_level(counter)
-
-        if result is None:
-            # 🚩 Angepasst: INSERT mit guild_id
-            cursor.execute(
-                "INSERT INTO user (guild_id, id, name, counter, level) VALUES (%s, %s, %s, %s, %s)",
-                (guild_id, uid, uname, counter, new_level),
-            )
-        else:
-            # 🚩 Angepasst: UPDATE benötigt guild_id im WHERE-Teil und aktualisiert den Namen
-            cursor.execute(
-                "UPDATE user SET counter=%s, level=%s, name=%s WHERE id=%s AND guild_id=%s",
-                (counter, new_level, uname, uid, guild_id),
-            )
+        # XP sofort im Speicher anrechnen, in die Datenbank wird gebündelt geschrieben
+        key = (guild_id, uid)
+        counter = await self.get_total(guild_id, uid) + 1
+        self.get_ranking(guild_id).update(uid, counter)
+        if self.xp_buffer.add(key, 1, uname):
+            self.xp_buffer.schedule_flush()
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+        old_level = berechne_level(counter - 1)
+        new_level = berechne_level(counter)
 
         if new_level > old_level:
             try:
@@ -382,6 +153,68 @@ class Leveling(commands.Cog):
             except Exception as e:
                 print(f"⚠️ Konnte Reaktion nicht hinzufügen: {e}")
                 
+    # ------------------------------------------------------------
+    # Mitgliedschaft für Bestenlisten
+    # ------------------------------------------------------------
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        guild_id = str(member.guild.id)
+        self.get_ranking(guild_id).remove(str(member.id))
+        await run_db(db_leveling.set_users_departed, guild_id, [str(member.id)], True)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        guild_id, uid = str(member.guild.id), str(member.id)
+        await run_db(db_leveling.set_users_departed, guild_id, [uid], False)
+        # Früheren Zählerstand wieder in die Rangliste aufnehmen
+        await self.get_total(guild_id, uid)
+
+    async def resolve_leaderboard(self, guild: discord.Guild, rows: List[Tuple[str, int]], limit: int) -> List[Tuple[discord.Member, int]]:
+        """
+        Ordnet Bestenlisten-Zeilen (id, counter) den aktuellen Mitgliedern zu
+        und gibt die ersten limit Treffer als (member, counter) zurück.
+
+        Zuerst wird der Member-Cache des Gateways gefragt; nur die Lücken vor dem
+        limit-ten Treffer werden in einer einzigen Chunk-Anfrage nachgeladen.
+        Wer dabei nicht gefunden wird, hat den Server verlassen und wird in der
+        Datenbank markiert und aus der Rangliste genommen.
+        """
+        missing: List[int] = []
+        found = 0
+        for uid, _ in rows:
+            if found >= limit:
+                break
+            if guild.get_member(int(uid)):
+                found += 1
+            else:
+                missing.append(int(uid))
+
+        if missing:
+            fetched: List[discord.Member] = []
+            if not guild.chunked:
+                try:
+                    fetched = await guild.query_members(user_ids=missing, limit=len(missing), cache=True)
+                except Exception as e:
+                    # Ohne Antwort lässt sich nicht sagen, wer ausgetreten ist: nichts markieren
+                    print(f"⚠️ Mitglieder für die Bestenliste konnten nicht geladen werden: {e}")
+                    missing = []
+            fetched_ids = {member.id for member in fetched}
+            departed = [str(uid) for uid in missing if uid not in fetched_ids]
+            if departed:
+                ranking = self.get_ranking(str(guild.id))
+                for uid in departed:
+                    ranking.remove(uid)
+                await run_db(db_leveling.set_users_departed, str(guild.id), departed, True)
+
+        results = []
+        for uid, counter in rows:
+            member = guild.get_member(int(uid))
+            if member is not None:
+                results.append((member, counter))
+                if len(results) >= limit:
+                    break
+        return results
+
     # ------------------------------------------------------------
     # Rank Befehl
     # ------------------------------------------------------------
@@ -393,36 +226,45 @@ class Leveling(commands.Cog):
         uid = str(user.id)
         guild_id = str(ctx.guild.id) # 🚩 Neu: Guild ID holen
 
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        # 🚩 Angepasst: SELECT benötigt guild_id
-        cursor.execute("SELECT counter FROM user WHERE id=%s AND guild_id=%s", (uid, guild_id))
-        result = cursor.fetchone()
+        # Die Rangliste enthält bereits die gepufferten XP, ein Flush ist nicht nötig
+        counter = await self.get_total(guild_id, uid)
 
-        if not result:
+        if not counter:
             await ctx.send(embed=discord.Embed(
                 title=f"{user.display_name} hat noch keine Nachrichten geschrieben.",
                 color=discord.Color.red()
             ))
-            cursor.close()
-            conn.close()
             return
 
-        counter = result[0]
         level = berechne_level(counter)
         progress_percent, xp_current_in_level, xp_needed_for_level_up = berechne_fortschritt(counter, level)
 
-        # 🚩 Angepasst: Rang muss auf guild_id eingeschränkt werden
-        cursor.execute("SELECT COUNT(*) + 1 FROM user WHERE counter > %s AND guild_id=%s", (counter, guild_id))
-        rank_res = cursor.fetchone()
-        rank = rank_res[0] if rank_res else 1
+        rank = self.get_ranking(guild_id).rank(uid)
 
-        cursor.close()
-        conn.close()
+        # Neuer Zufallshintergrund nur, wenn sich der Zählerstand geändert hat
+        bg_key = (guild_id, uid)
+        last_bg = self.rank_backgrounds.get(bg_key)
+        if last_bg and last_bg[0] == counter:
+            background = last_bg[1]
+        else:
+            background = cards.pick_rank_background()
+            self.rank_backgrounds.set(bg_key, (counter, background))
+
+        cache_key = (guild_id, uid, counter, rank, user.display_name, user.display_avatar.key, background)
+        png = self.rank_card_cache.get(cache_key)
+        if png is None:
+            avatar = await avatar_cache.get_avatar(user, cards.RANK_AVATAR_SIZE[0])
+            try:
+                png = await render(
+                    cards.render_rank_card, user.display_name, avatar, counter, level, rank,
+                    progress_percent, xp_current_in_level, xp_needed_for_level_up, background
+                )
+            except RenderQueueFull:
+                await ctx.send("⏳ Gerade werden sehr viele Karten erstellt, bitte versuche es gleich noch einmal.")
+                return
+            self.rank_card_cache.set(cache_key, png)
 
-        image_stream = await create_rank_card(user, counter, level, rank, progress_percent, xp_current_in_level, xp_needed_for_level_up)
-        await ctx.send(file=discord.File(image_stream, filename=f"rank_card_{user.name}.png"))
+        await ctx.send(file=discord.File(io.BytesIO(png), filename=f"rank_card_{user.name}.png"))
 
 
     # ------------------------------------------------------------
@@ -435,43 +277,11 @@ class Leveling(commands.Cog):
         await ctx.defer()
         guild_id = str(ctx.guild.id) # 🚩 Neu: Guild ID holen
 
-        conn = db.get_connection()
-        cursor = conn.cursor()
-
-        # 1. Datenbankabfrage mit Puffer (Wir holen mehr Einträge, um sicherzustellen, dass wir 5 aktive Mitglieder finden.)
-        cursor.execute("""
-            SELECT id, counter, level 
-            FROM user 
-            WHERE guild_id = %s
-            ORDER BY counter DESC 
-            LIMIT 15 
-        """, (guild_id,)) # guild_id als Tupel übergeben
-        db_results = cursor.fetchall()
-
-        cursor.close()
-        conn.close()
-        
-        # 2. Ergebnisse in Python auf aktive Server-Mitglieder filtern
-        active_results = []
-        for uid, counter, level in db_results:
-            member = None
-            try:
-                # fetch_member ist robuster als get_member
-                member = await ctx.guild.fetch_member(int(uid)) 
-            except discord.NotFound:
-                # Benutzer hat den Server verlassen
-                continue 
-            except Exception:
-                # Andere Fehler beim Abrufen
-                continue
-
-            if member is not None:
-                active_results.append((uid, counter, level))
-            
-            # Stoppen, sobald wir die Top 5 aktiven Mitglieder gefunden haben
-            if len(active_results) >= 5:
-                break 
+        # 1. Aus der Rangliste mit Puffer (Wir holen mehr Einträge, um sicherzustellen, dass wir 5 aktive Mitglieder finden.)
+        top_users = self.get_ranking(guild_id).top(15)
 
+        # 2. Auf aktuelle Server-Mitglieder abbilden (Cache zuerst, Lücken gebündelt nachladen)
+        active_results = await self.resolve_leaderboard(ctx.guild, top_users, 5)
 
         if not active_results: 
             await ctx.send(embed=discord.Embed(
@@ -482,9 +292,18 @@ class Leveling(commands.Cog):
             return
 
         # 🖼️ BILD ERSTELLEN
-        # Wir übergeben die gefilterte Liste mit maximal 5 aktiven Usern
-        image_stream = await create_top5_card(ctx, active_results)
-        await ctx.send(file=discord.File(image_stream, filename="top5_leaderboard.png"))
+        # Avatare parallel laden, gerendert wird im Render-Worker mit reinen Daten
+        avatars = await avatar_cache.get_avatars((member for member, _ in active_results), cards.LEADERBOARD_AVATAR_SIZE)
+        entries = []
+        for (member, counter), avatar in zip(active_results, avatars):
+            level = berechne_level(counter)
+            entries.append((member.display_name, avatar, counter, level, berechne_fortschritt(counter, level)[0]))
+        try:
+            png = await render(cards.render_top5_card, entries)
+        except RenderQueueFull:
+            await ctx.send("⏳ Gerade werden sehr viele Karten erstellt, bitte versuche es gleich noch einmal.")
+            return
+        await ctx.send(file=discord.File(io.BytesIO(png), filename="top5_leaderboard.png"))
 
 
 # ------------------------------------------------------------
@@ -2,8 +2,10 @@ import discord
 from discord.ext import commands
 from discord.ext.commands import Context
 from datetime import timedelta, datetime
+from utils.database import run_db
 from utils.database import moderation as db_mod
 from utils.database import guilds as db_guilds
+from utils.hydration import get_startup_data
 from typing import Optional, Dict, Tuple, List, Union
 
 class Moderation(commands.Cog):
@@ -15,8 +17,11 @@ class Moderation(commands.Cog):
 
     async def cog_load(self) -> None:
         """Beim Laden die Sanctions-Channel-ID aus der DB holen"""
+        settings = (await get_startup_data(self.bot)).settings
         for guild in self.bot.guilds:
-            channel_id_str = db_guilds.get_sanctions_channel(str(guild.id))
+            # Während des Ladens beigetretene Gilden fehlen in den Startdaten
+            guild_settings = settings.get(str(guild.id)) or await db_guilds.fetch_guild_settings(str(guild.id))
+            channel_id_str = guild_settings.sanctions_channel_id
             if channel_id_str:
                 channel_id_int = int(channel_id_str)
                 self.sanction_channels[guild.id] = channel_id_int 
@@ -83,7 +88,7 @@ class Moderation(commands.Cog):
         try:
             until = discord.utils.utcnow() + timedelta(minutes=minuten)
             await member.timeout(until, reason=reason)
-            db_mod.add_timeout(str(member.id), str(guild.id), minuten, reason)
+            await run_db(db_mod.add_timeout, str(member.id), str(guild.id), minuten, reason)
             await ctx.send(f"🔇 {member.mention} wurde für {minuten} Minuten gemutet.\nGrund: {reason}")
         except discord.Forbidden:
             await ctx.send("❌ Ich habe keine Berechtigung, diesen User zu muten.", ephemeral=True)
@@ -99,8 +104,8 @@ class Moderation(commands.Cog):
             await ctx.send("❌ Du kannst keine Moderatoren/Admins verwarnen.", ephemeral=True)
             return
 
-        db_mod.add_warn(str(member.id), str(ctx.guild.id), reason)
-        warns = db_mod.get_warns(str(member.id), str(ctx.guild.id), within_hours=24) 
+        await run_db(db_mod.add_warn, str(member.id), str(ctx.guild.id), reason)
+        warns = await run_db(db_mod.get_warns, str(member.id), str(ctx.guild.id), within_hours=24) 
 
         await ctx.send(
             f"⚠️ {member.mention} wurde verwarnt.\nGrund: {reason}\n👉 Warnungen in 24h: **{len(warns)}**"
@@ -110,7 +115,7 @@ class Moderation(commands.Cog):
             try:
                 until = discord.utils.utcnow() + timedelta(hours=24)
                 await member.timeout(until, reason="Automatischer Timeout nach 2 Warnungen")
-                db_mod.add_timeout(str(member.id), str(ctx.guild.id), 1440, "Automatischer Timeout nach 2 Warnungen")
+                await run_db(db_mod.add_timeout, str(member.id), str(ctx.guild.id), 1440, "Automatischer Timeout nach 2 Warnungen")
                 await ctx.send(f"🔇 {member.mention} wurde automatisch für 24 Stunden gemutet.")
             except discord.Forbidden:
                 await ctx.send("❌ Keine Berechtigung für automatischen Timeout.", ephemeral=True)
@@ -129,7 +134,7 @@ class Moderation(commands.Cog):
 
         try:
             await member.ban(reason=reason)
-            db_mod.add_ban(str(member.id), str(ctx.guild.id), reason)
+            await run_db(db_mod.add_ban, str(member.id), str(ctx.guild.id), reason)
             await ctx.send(f"🔨 {member.mention} wurde vom Server gebannt.\nGrund: {reason}")
         except discord.Forbidden:
             await ctx.send("❌ Ich habe keine Berechtigung, diesen User zu bannen.", ephemeral=True)
@@ -155,9 +160,9 @@ class Moderation(commands.Cog):
         guild_id = str(ctx.guild.id)
         member_id = str(member.id)
         
-        warns = db_mod.get_warns(member_id, guild_id, within_hours=24) 
-        timeouts = db_mod.get_timeouts(member_id, guild_id)
-        bans = db_mod.get_bans(member_id, guild_id)
+        warns = await run_db(db_mod.get_warns, member_id, guild_id, within_hours=24) 
+        timeouts = await run_db(db_mod.get_timeouts, member_id, guild_id)
+        bans = await run_db(db_mod.get_bans, member_id, guild_id)
         
         all_sanctions = []
 
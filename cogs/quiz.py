@@ -6,6 +6,7 @@ import discord
 from discord.ext import commands
 from discord.ui import View, Button
 from discord import app_commands
+from utils.database import run_db
 from utils.database import quiz as db_quiz
 from utils.database import guilds as db_guilds
 
@@ -139,7 +140,7 @@ class Quiz(commands.Cog):
 
             await msg.edit(view=None)
 
-        db_quiz.save_quiz_result(str(ctx.author.id), str(ctx.guild.id) if ctx.guild else "0", score)
+        await run_db(db_quiz.save_quiz_result, str(ctx.author.id), str(ctx.guild.id) if ctx.guild else "0", score)
 
 
         # ------------------------------------------------------------
@@ -148,7 +149,7 @@ class Quiz(commands.Cog):
         result_text = f"Du hast **{score}/{total_questions}** Fragen richtig beantwortet!" 
 
         if score >= 8 and ctx.guild:
-            role_id_str = db_guilds.get_quiz_reward_role(str(ctx.guild.id))
+            role_id_str = await run_db(db_guilds.get_quiz_reward_role, str(ctx.guild.id))
             role = None
 
             if role_id_str:
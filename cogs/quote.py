@@ -2,6 +2,7 @@
 import discord
 from discord.ext import commands
 from typing import Optional
+from utils.pipeline import STAGE_QUOTE, MessageContext, message_pipeline
 
 class Quote(commands.Cog):
     """Cog für das Zitieren von Nachrichten, wenn der Bot in einer Antwort erwähnt wird."""
@@ -9,11 +10,14 @@ class Quote(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
-        if message.author.bot:
-            return
+    async def cog_load(self) -> None:
+        message_pipeline.register("quote", self.handle_message, STAGE_QUOTE, dms=True)
 
+    async def cog_unload(self) -> None:
+        message_pipeline.unregister("quote")
+
+    async def handle_message(self, ctx: MessageContext) -> None:
+        message = ctx.message
         if message.reference and self.bot.user in message.mentions:
             referenced_raw = message.reference.resolved
             if not isinstance(referenced_raw, discord.Message):
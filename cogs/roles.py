@@ -2,6 +2,7 @@
 import discord
 from discord.ext import commands
 from discord.ext.commands import Context
+from utils.database import run_db
 from utils import database as db
 from typing import Optional
 
@@ -32,7 +33,7 @@ class Roles(commands.Cog):
 
         # Die Datenbankfunktion db.set_bumper_role übernimmt die Speicherung
         # der guild_id und der optionalen role_id.
-        db.set_bumper_role(guild_id, role_id)
+        await run_db(db.set_bumper_role, guild_id, role_id)
 
         if role:
             await ctx.send(f"✅ Die Bumper-Rolle wurde auf {role.mention} gesetzt.")
@@ -1,7 +1,8 @@
 # cogs/selfinfo.py
 import discord
 from discord.ext import commands
-from utils.database import connection as db
+from utils.database import run_db
+from utils.database import users as db_users
 from datetime import datetime
 
 class SelfInfo(commands.Cog):
@@ -22,64 +23,18 @@ class SelfInfo(commands.Cog):
         user_id = str(ctx.author.id)
         guild_id = str(ctx.guild.id)
 
-        conn = db.get_connection()
-        level_data = None
-        birthday_data = None
-        warn_data = None
-        quiz_data = None
-        
         try:
-            cursor = conn.cursor(dictionary=True)
-
-            # ------------------------------------------------------------
-            # 🚩 KORREKTUR: LEVELDATEN MÜSSEN PRO GILDE ABGEFRAGT WERDEN
-            # ------------------------------------------------------------
-            cursor.execute("""
-                SELECT level, counter 
-                FROM user 
-                WHERE id = %s AND guild_id = %s
-            """, (user_id, guild_id))
-            level_data = cursor.fetchone()
-
-            # ------------------------------------------------------------
-            # GEBURTSTAG
-            # ------------------------------------------------------------
-            cursor.execute("""
-                SELECT birthday 
-                FROM birthdays 
-                WHERE user_id = %s AND guild_id = %s
-            """, (user_id, guild_id))
-            birthday_data = cursor.fetchone()
-
-            # ------------------------------------------------------------
-            # VERWARNUNGEN (bereits korrekte Abfrage)
-            # ------------------------------------------------------------
-            cursor.execute("""
-                SELECT COUNT(*) AS count 
-                FROM warns 
-                WHERE user_id = %s AND guild_id = %s
-            """, (user_id, guild_id))
-            warn_data = cursor.fetchone()
-
-            # ------------------------------------------------------------
-            # QUIZ (bereits korrekte Abfrage)
-            # ------------------------------------------------------------
-            cursor.execute("""
-                SELECT score, date_played 
-                FROM quiz_results 
-                WHERE user_id = %s AND guild_id = %s
-            """, (user_id, guild_id))
-            quiz_data = cursor.fetchone()
-
-            cursor.close()
+            # Level, Geburtstag, Verwarnungen und Quiz in einem DB-Aufruf abseits des Event-Loops
+            data = await run_db(db_users.get_selfinfo_data, user_id, guild_id)
+            level_data = data["level"]
+            birthday_data = data["birthday"]
+            warn_data = data["warns"]
+            quiz_data = data["quiz"]
             
         except Exception as e:
             print(f"Datenbankfehler in selfinfo: {e}")
             await ctx.send("Beim Abrufen deiner Daten ist ein Fehler aufgetreten.", ephemeral=True)
             return # Fehlerfall beenden
-            
-        finally:
-            conn.close() 
 
         # ------------------------------------------------------------
         # EMBED
@@ -2,12 +2,15 @@
 import discord
 from discord.ext import commands
 from discord.ext.commands import Context
-from typing import Optional
+from typing import Literal, Optional
+from utils.database import run_db
 from utils.database import birthday as birthday_db
 from utils.database import moderation as mod_db
 from utils.database import roles as roles_db
 from utils.database import bumps as db_bumps
 from utils.database import guilds as db_guilds
+from utils.database import antispam as db_antispam
+from utils.spam_rules import SPAM_MAX_MESSAGE_THRESHOLD, SPAM_MAX_WINDOW_SECONDS, SPAM_MESSAGE_THRESHOLD_FIELDS, SPAM_RULE_FIELDS
 from datetime import datetime, timezone
 
 
@@ -52,6 +55,7 @@ class Setup(commands.Cog):
                     "Bitte verwende einen Unterbefehl:\n\n"
                     "• `/setup channel` - Channels (Birthday, Sanctions, Posts)\n"
                     "• `/setup role` - Spezielle Rollen (Bumper-Rolle)\n"
+                    "• `/setup antispam` - Schwellen des Antispam-Systems\n"
                     "• `/setup serversettings` - Serverweite Einstellungen"
                 ),
                 color=discord.Color.gold()
@@ -79,7 +83,7 @@ class Setup(commands.Cog):
             await ctx.send("❌ Der Prefix darf höchstens 5 Zeichen lang sein.", ephemeral=True)
             return
         try:
-            db_guilds.set_prefix(guild_id, prefix)
+            await run_db(db_guilds.set_prefix, guild_id, prefix)
             await ctx.send(f"✅ Prefix wurde auf `{prefix}` geändert!", ephemeral=True)
         except Exception as e:
             await ctx.send(f"❌ Fehler beim Speichern des Prefix: {e}", ephemeral=True)
@@ -106,10 +110,10 @@ class Setup(commands.Cog):
     async def channel_birthday(self, ctx: Context, channel: Optional[discord.TextChannel] = None) -> None:
         guild_id = str(ctx.guild.id)
         if channel is None:
-            db_guilds.set_birthday_channel(guild_id, None)
+            await run_db(db_guilds.set_birthday_channel, guild_id, None)
             await ctx.send("✅ Der Geburtstags-Channel wurde entfernt.", ephemeral=True)
         else:
-            db_guilds.set_birthday_channel(guild_id, str(channel.id))
+            await run_db(db_guilds.set_birthday_channel, guild_id, str(channel.id))
             await ctx.send(f"✅ Geburtstags-Channel gesetzt auf {channel.mention}", ephemeral=True)
 
     # Sanctions-Channel
@@ -120,10 +124,10 @@ class Setup(commands.Cog):
     async def channel_sanctions(self, ctx: Context, channel: Optional[discord.TextChannel] = None) -> None:
         guild_id = str(ctx.guild.id)
         if channel is None:
-            db_guilds.set_sanctions_channel(guild_id, None)
+            await run_db(db_guilds.set_sanctions_channel, guild_id, None)
             await ctx.send("✅ Der Sanctions-Channel wurde entfernt.", ephemeral=True)
         else:
-            db_guilds.set_sanctions_channel(guild_id, str(channel.id))
+            await run_db(db_guilds.set_sanctions_channel, guild_id, str(channel.id))
             await ctx.send(f"✅ Sanctions-Channel gesetzt auf {channel.mention}", ephemeral=True)
 
     # Bump-Reminder-Channel
@@ -134,11 +138,20 @@ class Setup(commands.Cog):
     async def channel_reminder(self, ctx: Context, channel: Optional[discord.TextChannel] = None) -> None:
         guild_id = str(ctx.guild.id)
         if channel is None:
-            db_bumps.set_reminder_channel(guild_id, None)
+            await run_db(db_bumps.set_reminder_channel, guild_id, None)
+            bumps_cog = self.bot.get_cog("Bumps")
+            if bumps_cog:
+                bumps_cog.cancel_bump_reminder(guild_id)
             await ctx.send("✅ Bump-Reminder-Channel entfernt.", ephemeral=True)
         else:
-            db_bumps.set_reminder_channel(guild_id, str(channel.id))
-            db_bumps.set_last_bump_time(guild_id, datetime.utcnow())
+            now = discord.utils.utcnow()
+            await run_db(db_bumps.set_reminder_channel, guild_id, str(channel.id))
+            await run_db(db_bumps.set_last_bump_time, guild_id, now)
+            await run_db(db_bumps.set_reminder_status, guild_id, False)
+            # Bumps-Cog über die neue Deadline informieren, statt auf den nächsten Abgleich zu warten
+            bumps_cog = self.bot.get_cog("Bumps")
+            if bumps_cog:
+                bumps_cog.schedule_bump_reminder(guild_id, now)
             await ctx.send(f"✅ Bump-Reminder-Channel gesetzt auf {channel.mention}", ephemeral=True)
 
     # Join/Leave-Channel
@@ -150,10 +163,10 @@ class Setup(commands.Cog):
         from utils.database import joinleft as db_joinleft
         guild_id = str(ctx.guild.id)
         if channel is None:
-            db_joinleft.set_welcome_channel(guild_id, None)
+            await run_db(db_joinleft.set_welcome_channel, guild_id, None)
             await ctx.send("✅ Der Join/Leave-Channel wurde entfernt.", ephemeral=True)
         else:
-            db_joinleft.set_welcome_channel(guild_id, str(channel.id))
+            await run_db(db_joinleft.set_welcome_channel, guild_id, str(channel.id))
             await ctx.send(f"✅ Join/Leave-Channel gesetzt auf {channel.mention}", ephemeral=True)
 
     # Voice-Channel
@@ -164,10 +177,10 @@ class Setup(commands.Cog):
     async def channel_voice(self, ctx: Context, channel: Optional[discord.VoiceChannel] = None) -> None:
         guild_id = str(ctx.guild.id)
         if channel is None:
-            db_guilds.set_dynamic_voice_channel(guild_id, None)
+            await run_db(db_guilds.set_dynamic_voice_channel, guild_id, None)
             await ctx.send("✅ 'Join-to-Create' Starter-Channel wurde entfernt.", ephemeral=True)
         else:
-            db_guilds.set_dynamic_voice_channel(guild_id, str(channel.id))
+            await run_db(db_guilds.set_dynamic_voice_channel, guild_id, str(channel.id))
             await ctx.send(f"✅ 'Join-to-Create' Starter-Channel gesetzt auf {channel.mention}.", ephemeral=True)
 
     # Post-System Channels
@@ -178,10 +191,10 @@ class Setup(commands.Cog):
     async def channel_checkpost(self, ctx: Context, channel: Optional[discord.TextChannel] = None) -> None:
         guild_id = str(ctx.guild.id)
         if channel is None:
-            db_guilds.set_checkpost_channel(guild_id, None)
+            await run_db(db_guilds.set_checkpost_channel, guild_id, None)
             await ctx.send("✅ Checkpost-Channel wurde entfernt.", ephemeral=True)
         else:
-            db_guilds.set_checkpost_channel(guild_id, str(channel.id))
+            await run_db(db_guilds.set_checkpost_channel, guild_id, str(channel.id))
             await ctx.send(f"✅ Checkpost-Channel gesetzt auf {channel.mention}", ephemeral=True)
 
     @setup_channel.command(
@@ -191,10 +204,10 @@ class Setup(commands.Cog):
     async def channel_post(self, ctx: Context, channel: Optional[discord.TextChannel] = None) -> None:
         guild_id = str(ctx.guild.id)
         if channel is None:
-            db_guilds.set_post_channel(guild_id, None)
+            await run_db(db_guilds.set_post_channel, guild_id, None)
             await ctx.send("✅ Post-Channel wurde entfernt.", ephemeral=True)
         else:
-            db_guilds.set_post_channel(guild_id, str(channel.id))
+            await run_db(db_guilds.set_post_channel, guild_id, str(channel.id))
             await ctx.send(f"✅ Post-Channel gesetzt auf {channel.mention}", ephemeral=True)
 
     # ------------------------------------------------------------
@@ -215,12 +228,66 @@ class Setup(commands.Cog):
     async def role_bumper(self, ctx: Context, role: Optional[discord.Role] = None) -> None:
         guild_id = str(ctx.guild.id)
         if role is None:
-            db_guilds.set_bumper_role(guild_id, None)
+            await run_db(db_guilds.set_bumper_role, guild_id, None)
             await ctx.send("✅ Bumper-Rolle entfernt.", ephemeral=True)
         else:
-            db_guilds.set_bumper_role(guild_id, str(role.id))
+            await run_db(db_guilds.set_bumper_role, guild_id, str(role.id))
             await ctx.send(f"✅ Bumper-Rolle gesetzt auf {role.mention}", ephemeral=True)
 
+    # ------------------------------------------------------------
+    # Antispam
+    # ------------------------------------------------------------
+    @setup.group(
+        name="antispam",
+        description="Schwellen des Antispam-Systems anzeigen und ändern."
+    )
+    async def setup_antispam(self, ctx: Context) -> None:
+        if ctx.invoked_subcommand is None:
+            await ctx.send("Bitte verwende `/setup antispam <show/set>`", ephemeral=True)
+
+    @setup_antispam.command(
+        name="show",
+        description="Zeigt die aktuellen Antispam-Schwellen dieses Servers."
+    )
+    async def antispam_show(self, ctx: Context) -> None:
+        rules = await run_db(db_antispam.get_antispam_rules, str(ctx.guild.id))
+        lines = [f"• `{field}`: {getattr(rules, field)}" for field in SPAM_RULE_FIELDS]
+        embed = discord.Embed(
+            title="🛡️ Antispam-Schwellen",
+            description="\n".join(lines) + "\n\nDie `max_*`-Werte sind erlaubt, eine Regel greift erst darüber; 0 schaltet sie ab. `window_seconds` ist das Zeitfenster aller Regeln.",
+            color=discord.Color.gold()
+        )
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @setup_antispam.command(
+        name="set",
+        description="Setzt eine Antispam-Schwelle (0 schaltet die Regel ab)."
+    )
+    async def antispam_set(
+        self, ctx: Context,
+        regel: Literal["enabled", "window_seconds", "max_messages", "max_duplicates", "max_channels",
+                       "max_mentions", "max_links", "timeout_minutes"],
+        wert: int
+    ) -> None:
+        if wert < 0:
+            await ctx.send("❌ Der Wert darf nicht negativ sein.", ephemeral=True)
+            return
+        if regel == "window_seconds" and not 1 <= wert <= SPAM_MAX_WINDOW_SECONDS:
+            await ctx.send(f"❌ Das Zeitfenster muss zwischen 1 und {SPAM_MAX_WINDOW_SECONDS} Sekunden liegen.", ephemeral=True)
+            return
+        if regel in SPAM_MESSAGE_THRESHOLD_FIELDS and wert > SPAM_MAX_MESSAGE_THRESHOLD:
+            await ctx.send(f"❌ `{regel}` darf höchstens {SPAM_MAX_MESSAGE_THRESHOLD} sein.", ephemeral=True)
+            return
+        # Discord erlaubt Timeouts von höchstens 28 Tagen
+        if regel == "timeout_minutes" and not 1 <= wert <= 28 * 24 * 60:
+            await ctx.send("❌ Der Timeout muss zwischen 1 Minute und 28 Tagen liegen.", ephemeral=True)
+            return
+        if regel == "enabled":
+            wert = 1 if wert else 0
+
+        await run_db(db_antispam.set_antispam_rule, str(ctx.guild.id), regel, wert)
+        await ctx.send(f"✅ Antispam-Regel `{regel}` auf `{wert}` gesetzt.", ephemeral=True)
+
 
 async def setup(bot: commands.Bot) -> None:
     await bot.add_cog(Setup(bot))
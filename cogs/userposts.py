@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import ui, Interaction
+from utils.database import run_db
 from utils.database import posts as db_posts
 import logging
 
@@ -19,7 +20,7 @@ class PostCog(commands.Cog):
             await ctx.send("❌ Dieser Command funktioniert nur als Slash Command.", ephemeral=True)
             return
 
-        check_channel_id = db_posts.get_check_channel(str(ctx.guild.id))
+        check_channel_id = await run_db(db_posts.get_check_channel, str(ctx.guild.id))
         if not check_channel_id:
             await interaction.response.send_message(
                 "❌ Kein Checkpost-Channel gesetzt. Admin muss dies über die Setup-Befehle tun.",
@@ -52,7 +53,8 @@ class ReminderModal(ui.Modal, title="Erstelle deinen Post"):
     async def on_submit(self, interaction: Interaction):
         try:
             # Post in DB speichern
-            post_id = db_posts.add_post(
+            post_id = await run_db(
+                db_posts.add_post,
                 guild_id=str(interaction.guild.id),
                 name=self.name.value.strip(),
                 content=self.content.value.strip(),
@@ -91,12 +93,12 @@ class PostCheckButtons(ui.View):
 
     @ui.button(label="Genehmigen", style=discord.ButtonStyle.green)
     async def approve(self, interaction: Interaction, button: ui.Button):
-        post = db_posts.get_post(self.post_id)
+        post = await run_db(db_posts.get_post, self.post_id)
         if not post:
             await interaction.response.send_message("❌ Post nicht gefunden.", ephemeral=True)
             return
 
-        post_channel_id = db_posts.get_post_channel(str(interaction.guild.id))
+        post_channel_id = await run_db(db_posts.get_post_channel, str(interaction.guild.id))
         if not post_channel_id:
             await interaction.response.send_message("❌ Kein Post-Channel gesetzt.", ephemeral=True)
             return
@@ -113,13 +115,13 @@ class PostCheckButtons(ui.View):
             embed.set_footer(text=f"Eingereicht von {author}", icon_url=author.display_avatar.url)
 
         await channel.send(embed=embed)
-        db_posts.set_post_status(self.post_id, "approved")
+        await run_db(db_posts.set_post_status, self.post_id, "approved")
         await interaction.message.delete()
         await interaction.response.send_message("✅ Post genehmigt!", ephemeral=True)
 
     @ui.button(label="Verwerfen", style=discord.ButtonStyle.red)
     async def deny(self, interaction: Interaction, button: ui.Button):
-        db_posts.set_post_status(self.post_id, "denied")
+        await run_db(db_posts.set_post_status, self.post_id, "denied")
         await interaction.message.delete()
         await interaction.response.send_message("❌ Post verworfen.", ephemeral=True)
 
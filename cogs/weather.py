@@ -3,18 +3,49 @@ import httpx
 import discord
 from discord.ext import commands
 from discord.ext.commands import Context
-from typing import Optional
+from typing import Any, Dict, Optional
+from utils.cache import ResponseCache
+from utils.http_clients import get_client, register_client
 
-BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
+register_client("openweathermap", "https://api.openweathermap.org", timeout=10.0)
+WEATHER_PATH = "/data/2.5/weather"
+WEATHER_LANG = "de"
+
+# Antworten pro (Ort, Sprache): so lange frisch, bei Ausfall der API bis WEATHER_STALE_TTL weiter ausgeliefert
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", 600))
+WEATHER_STALE_TTL = float(os.getenv("WEATHER_STALE_TTL", 6 * 3600))
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", 1000))
+
+def normalize_city(city: str) -> str:
+    """Cache-Schlüssel für einen Ort: "  Berlin " und "berlin" sind dieselbe Anfrage."""
+    return " ".join(city.split()).casefold()
 
 class Weather(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.api_key = os.getenv("WEATHER_API_KEY")
+        self.cache = ResponseCache(WEATHER_CACHE_SIZE, WEATHER_CACHE_TTL, WEATHER_STALE_TTL)
 
         if not self.api_key:
             print("WARNUNG: API_Key nicht gefunden. Wetterbefehle werden nicht funktionieren.")
 
+    async def fetch_weather(self, city: str, lang: str) -> Optional[Dict[str, Any]]:
+        """
+        Fragt OpenWeatherMap ab. Gibt None zurück, wenn der Ort unbekannt ist (wird ebenfalls
+        gecacht); andere Fehlercodes lösen httpx.HTTPStatusError aus.
+        """
+        params = {
+            "q": city,
+            "appid": self.api_key,
+            "units": "metric",
+            "lang": lang
+        }
+        response = await get_client("openweathermap").get(WEATHER_PATH, params=params)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
     @commands.hybrid_command(
         name="weather",
         description="Zeigt Infos über das Wetter eines Ortes"
@@ -26,67 +57,60 @@ class Weather(commands.Cog):
             await ctx.send("Der Wetterdienst ist momentan nicht konfiguriert.", ephemeral=True)
             return
 
-        params = {
-            "q": city,
-            "appid": self.api_key,
-            "units": "metric",
-            "lang": "de"
-        }
+        query = normalize_city(city)
+        try:
+            data = await self.cache.get((query, WEATHER_LANG), lambda: self.fetch_weather(query, WEATHER_LANG))
+        except httpx.HTTPStatusError as e:
+            await ctx.send(f"Fehler beim Abrufen der Wetterdaten (Code: {e.response.status_code}).", ephemeral=True)
+            return
+        except httpx.HTTPError:
+            await ctx.send("Ein Netzwerkfehler ist aufgetreten. Der Wetterdienst ist nicht erreichbar.", ephemeral=True)
+            return
+        except Exception as e:
+            print(f"Unerwarteter Fehler im Wetter-Befehl: {e}")
+            await ctx.send("Ein unerwarteter Fehler ist aufgetreten.", ephemeral=True)
+            return
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(BASE_URL, params=params, timeout=10.0)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    main_data = data.get("main", {})
-                    weather_desc = data["weather"][0]["description"].capitalize()
-                    icon_code = data["weather"][0]["icon"]
-                    
-                    temp = main_data.get("temp")
-                    feels_like = main_data.get("feels_like")
-                    humidity = main_data.get("humidity")
-                    temp_max = main_data.get("temp_max") 
-                    temp_min = main_data.get("temp_min") 
-                    pressure = main_data.get("pressure") 
-                    
-                    wind_speed_ms = data.get("wind", {}).get("speed", 0)
-                    wind_speed_kmh = wind_speed_ms * 3.6
-                    
-                    embed = discord.Embed(
-                        title=f"Das aktuelle Wetter in {data['name']}, {data['sys']['country']}!",
-                        description=f"**{weather_desc}**",
-                        color=0x008CB8 
-                    )
-                    
-                    embed.set_thumbnail(url=f"https://openweathermap.org/img/wn/{icon_code}@2x.png")
+        if data is None:
+            await ctx.send(f"Ort '{city}' konnte nicht gefunden werden. Bitte versuchen Sie es erneut.", ephemeral=True)
+            return
 
-                    if temp is not None:
-                        embed.add_field(name="Aktuell", value=f"{temp:.1f}°C", inline=True)
-                    if feels_like is not None:
-                        embed.add_field(name="Gefühlt", value=f"{feels_like:.1f}°C", inline=True)
-                    if humidity is not None:
-                        embed.add_field(name="Luftfeuchtigkeit", value=f"{humidity}%", inline=True)
-                    if pressure is not None:
-                        embed.add_field(name="Luftdruck", value=f"{pressure} mBar", inline=True)
-                        
-                    embed.add_field(name="Wind", value=f"{wind_speed_kmh:.1f} km/h", inline=False) 
+        main_data = data.get("main", {})
+        weather_desc = data["weather"][0]["description"].capitalize()
+        icon_code = data["weather"][0]["icon"]
+        
+        temp = main_data.get("temp")
+        feels_like = main_data.get("feels_like")
+        humidity = main_data.get("humidity")
+        temp_max = main_data.get("temp_max") 
+        temp_min = main_data.get("temp_min") 
+        pressure = main_data.get("pressure") 
+        
+        wind_speed_ms = data.get("wind", {}).get("speed", 0)
+        wind_speed_kmh = wind_speed_ms * 3.6
+        
+        embed = discord.Embed(
+            title=f"Das aktuelle Wetter in {data['name']}, {data['sys']['country']}!",
+            description=f"**{weather_desc}**",
+            color=0x008CB8 
+        )
+        
+        embed.set_thumbnail(url=f"https://openweathermap.org/img/wn/{icon_code}@2x.png")
 
-                    embed.set_footer(text="Daten von OpenWeatherMap")
-                    
-                    await ctx.send(embed=embed)
-                    
-                elif response.status_code == 404:
-                    await ctx.send(f"Ort '{city}' konnte nicht gefunden werden. Bitte versuchen Sie es erneut.", ephemeral=True)
-                else:
-                    await ctx.send(f"Fehler beim Abrufen der Wetterdaten (Code: {response.status_code}).", ephemeral=True)
+        if temp is not None:
+            embed.add_field(name="Aktuell", value=f"{temp:.1f}°C", inline=True)
+        if feels_like is not None:
+            embed.add_field(name="Gefühlt", value=f"{feels_like:.1f}°C", inline=True)
+        if humidity is not None:
+            embed.add_field(name="Luftfeuchtigkeit", value=f"{humidity}%", inline=True)
+        if pressure is not None:
+            embed.add_field(name="Luftdruck", value=f"{pressure} mBar", inline=True)
+            
+        embed.add_field(name="Wind", value=f"{wind_speed_kmh:.1f} km/h", inline=False) 
 
-            except httpx.HTTPError:
-                await ctx.send("Ein Netzwerkfehler ist aufgetreten. Der Wetterdienst ist nicht erreichbar.", ephemeral=True)
-            except Exception as e:
-                print(f"Unerwarteter Fehler im Wetter-Befehl: {e}")
-                await ctx.send("Ein unerwarteter Fehler ist aufgetreten.", ephemeral=True)
+        embed.set_footer(text="Daten von OpenWeatherMap")
+        
+        await ctx.send(embed=embed)
 
 
 async def setup(bot: commands.Bot):
@@ -2,8 +2,10 @@ import os
 import jwt
 import datetime
 import httpx
-import asyncio
 import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 from fastapi import FastAPI, Form, Request, HTTPException
 from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
@@ -14,8 +16,12 @@ from starlette.middleware.sessions import SessionMiddleware
 # ------------------------------------------------------------
 # Datenbank-Module
 # ------------------------------------------------------------
+from utils.database import run_db
 from utils.database import guilds as db_guilds, joinleft as db_joinleft
 from utils.database import custom_commands as db_custom, commands as db_commands
+from utils.http_clients import close_http_clients, get_client, open_http_clients, register_client
+from utils.guild_state import GuildStateSnapshot
+from utils.cache import TTLCache
 
 # ------------------------------------------------------------
 # Logging
@@ -33,6 +39,16 @@ JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_MINUTES = 60
 BOT_API_URL = os.getenv("BOT_API_URL", "http://kirribot:8001")
 
+# Ein Verbindungspool für alle Anfragen an die interne Bot-API (Timeouts pro Anfrage)
+register_client("bot_api", BOT_API_URL)
+
+# Lokale Kopie der Bot-Gilden (Channels, Rollen), per Long-Poll im Hintergrund aktuell gehalten
+bot_state = GuildStateSnapshot("bot_api")
+
+# Admin-Gilden pro User: Discord limitiert users/@me/guilds stark, daher serverseitig gecacht
+USER_GUILDS_CACHE_TTL = float(os.getenv("USER_GUILDS_CACHE_TTL", 300))
+USER_GUILDS_CACHE_SIZE = int(os.getenv("USER_GUILDS_CACHE_SIZE", 1000))
+
 # ------------------------------------------------------------
 # JWT Hilfsfunktionen
 # ------------------------------------------------------------
@@ -49,11 +65,77 @@ def verify_jwt_token(token: str):
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         return None
 
+# ------------------------------------------------------------
+# Bot über geänderte Einstellungen informieren
+# ------------------------------------------------------------
+async def notify_bot_settings_changed(guild_id: str):
+    """
+    Lässt den Bot seine Caches für die Gilde verwerfen (Einstellungen, Custom Commands),
+    damit Änderungen sofort greifen.
+    """
+    try:
+        response = await get_client("bot_api").post(f"/api/guild/{guild_id}/invalidate", timeout=3.0)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        # Ohne Benachrichtigung greift die Änderung spätestens nach Ablauf der Cache-TTL
+        logger.warning(f"Bot-Cache für Gilde {guild_id} konnte nicht invalidiert werden: {e}")
+
+# ------------------------------------------------------------
+# Admin-Gilden pro User (Cache)
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class AdminGuilds:
+    # guild_id -> Anzeige-Daten für index.html; nur Gilden mit Administrator-Recht
+    servers: Dict[str, Dict[str, Any]]
+    # Schnittmenge mit den Bot-Gilden und der Stand von bot_state, zu dem sie berechnet wurde
+    visible: List[Dict[str, Any]] = field(default_factory=list)
+    bot_revision: Optional[int] = None
+
+_admin_guilds_cache = TTLCache(USER_GUILDS_CACHE_SIZE, USER_GUILDS_CACHE_TTL)
+
+def filter_admin_guilds(user_guilds: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Behält aus users/@me/guilds nur die Gilden, in denen der User Administrator ist."""
+    admin_servers = {}
+    for ug in user_guilds:
+        try:
+            permissions = int(ug.get('permissions', 0))
+            if (permissions & ADMINISTRATOR_PERMISSION) == ADMINISTRATOR_PERMISSION:
+                icon_hash = ug.get('icon')
+                icon_url = f"https://cdn.discordapp.com/icons/{ug['id']}/{icon_hash}.png?size=64" if icon_hash else None
+                admin_servers[ug['id']] = {"id": ug['id'], "name": ug['name'], "icon_url": icon_url}
+        except Exception as e:
+            logger.warning(f"Fehler bei Gildenverarbeitung (ID: {ug.get('id', 'N/A')}): {e}", exc_info=True)
+            continue
+    return admin_servers
+
+def visible_servers(admin_guilds: AdminGuilds) -> List[Dict[str, Any]]:
+    """Admin-Gilden, in denen auch der Bot ist; nur neu berechnet, wenn sich die Bot-Gilden geändert haben."""
+    if admin_guilds.bot_revision != bot_state.revision:
+        bot_guild_ids = bot_state.guild_ids()
+        admin_guilds.visible = [s for guild_id, s in admin_guilds.servers.items() if guild_id in bot_guild_ids]
+        admin_guilds.bot_revision = bot_state.revision
+    return admin_guilds.visible
+
+def invalidate_admin_guilds(user_id: Optional[str]) -> None:
+    if user_id:
+        _admin_guilds_cache.invalidate(user_id)
+
 # ------------------------------------------------------------
 # Dashboard-App
 # ------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """HTTP-Clients und den Abgleich des Bot-Zustands beim Start öffnen, beim Beenden schließen."""
+    open_http_clients()
+    bot_state.start()
+    try:
+        yield
+    finally:
+        await bot_state.stop()
+        await close_http_clients()
+
 def create_dashboard(bot=None) -> FastAPI:
-    app = FastAPI(title="Bot Dashboard")
+    app = FastAPI(title="Bot Dashboard", lifespan=lifespan)
 
     # Session Middleware
     app.add_middleware(
@@ -101,6 +183,8 @@ def create_dashboard(bot=None) -> FastAPI:
         if not user_id:
             raise HTTPException(status_code=400, detail="Discord-User konnte nicht ermittelt werden.")
 
+        # Nach einem neuen Login die Serverliste frisch von Discord holen
+        invalidate_admin_guilds(user_id)
         jwt_token = create_jwt_token(user_id)
         request.session["discord_token"] = token
         response = RedirectResponse(url="/")
@@ -110,6 +194,7 @@ def create_dashboard(bot=None) -> FastAPI:
 
     @app.get("/logout")
     async def logout(request: Request):
+        invalidate_admin_guilds(request.cookies.get("discord_user"))
         request.session.pop("discord_token", None)
         response = RedirectResponse(url="/")
         response.delete_cookie(key="discord_user")
@@ -138,54 +223,38 @@ def create_dashboard(bot=None) -> FastAPI:
         if not user_data:
             return templates.TemplateResponse("login.html", {"request": request})
 
-        # Bot-Gilden abrufen
-        bot_guild_ids = set()
-        max_retries = 10
-        retry_delay = 5
-        for attempt in range(max_retries):
-            try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    response = await client.get(f"{BOT_API_URL}/api/guilds")
-                    response.raise_for_status()
-                    bot_guild_ids = set(response.json().get("guild_ids", []))
-                    break
-            except httpx.RequestError as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"Bot-API nicht erreichbar (Versuch {attempt+1}/{max_retries}). Warte {retry_delay}s. Fehler: {e}")
-                    await asyncio.sleep(retry_delay)
-                else:
-                    logger.error(f"Konnte Bot-Gildenliste nicht abrufen. Fehler: {e}", exc_info=True)
-            except httpx.HTTPError as e:
-                logger.error(f"HTTP-Fehler beim Abrufen der Bot-Gildenliste: {e}", exc_info=True)
-                break
-
-        # Discord-Gilden des Users abrufen
-        try:
-            resp = await oauth.discord.get('users/@me/guilds', token=user_data['token'])
-            resp.raise_for_status()
-            user_guilds = resp.json()
-        except Exception as e:
-            logger.error(f"Fehler beim Abrufen der Gilden von Discord: {e}", exc_info=True)
-            request.session.pop("discord_token", None)
-            return RedirectResponse(url="/login")
+        # Bot-Gilden kommen aus der lokalen Kopie (wartet nie auf den Bot)
+        if not bot_state.loaded:
+            logger.warning("Bot-Zustand noch nicht geladen, Serverliste ist vorerst leer.")
 
-        admin_servers = []
-        for ug in user_guilds:
+        # Admin-Gilden des Users: aus dem Cache oder einmal von Discord
+        admin_guilds = _admin_guilds_cache.get(user_data['id'])
+        if admin_guilds is None:
             try:
-                permissions = int(ug.get('permissions', 0))
-                is_admin = (permissions & ADMINISTRATOR_PERMISSION) == ADMINISTRATOR_PERMISSION
-                is_bot_present = ug['id'] in bot_guild_ids
-                if is_admin and is_bot_present:
-                    icon_hash = ug.get('icon')
-                    icon_url = f"https://cdn.discordapp.com/icons/{ug['id']}/{icon_hash}.png?size=64" if icon_hash else None
-                    admin_servers.append({"id": ug['id'], "name": ug['name'], "icon_url": icon_url})
+                resp = await oauth.discord.get('users/@me/guilds', token=user_data['token'])
+                resp.raise_for_status()
+                user_guilds = resp.json()
             except Exception as e:
-                logger.warning(f"Fehler bei Gildenverarbeitung (ID: {ug.get('id', 'N/A')}): {e}", exc_info=True)
-                continue
+                logger.error(f"Fehler beim Abrufen der Gilden von Discord: {e}", exc_info=True)
+                request.session.pop("discord_token", None)
+                return RedirectResponse(url="/login")
+
+            admin_guilds = AdminGuilds(filter_admin_guilds(user_guilds))
+            _admin_guilds_cache.set(user_data['id'], admin_guilds)
+
+        admin_servers = visible_servers(admin_guilds)
 
         logger.info(f"Dashboard: {len(admin_servers)} Server für Nutzer {user_data['id']} verfügbar.")
         return templates.TemplateResponse("index.html", {"request": request, "servers": admin_servers, "user": user_data['id']})
 
+    @app.get("/refresh")
+    async def refresh_servers(request: Request):
+        """Verwirft die gecachte Serverliste, z.B. nachdem der User neue Rechte bekommen hat."""
+        user_data = get_current_user_data(request)
+        if user_data:
+            invalidate_admin_guilds(user_data['id'])
+        return RedirectResponse(url="/")
+
     # ------------------------------------------------------------
     # Server Dashboard
     # ------------------------------------------------------------
@@ -195,41 +264,27 @@ def create_dashboard(bot=None) -> FastAPI:
         if not user_data:
             return RedirectResponse(url="/login")
 
-        # Bot-Gilden-Details abrufen
-        max_retries = 5
-        retry_delay = 3
-        guild_details = {}
-        for attempt in range(max_retries):
-            try:
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    response = await client.get(f"{BOT_API_URL}/api/guild/{guild_id}")
-                    response.raise_for_status()
-                    guild_details = response.json()
-                    break
-            except httpx.RequestError as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"Bot-API nicht erreichbar (Versuch {attempt+1}/{max_retries}). Warte {retry_delay}s. Fehler: {e}")
-                    await asyncio.sleep(retry_delay)
-                else:
-                    logger.error(f"Konnte Gilden-Details nicht abrufen. Fehler: {e}", exc_info=True)
-                    return HTMLResponse("Fehler beim Verbinden mit dem Bot-Service. Bitte später versuchen.", status_code=500)
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP-Fehler beim Abrufen der Gilden-Details: {e}", exc_info=True)
-                return HTMLResponse("Fehler beim Bot-Service.", status_code=e.response.status_code)
-
-        # Einstellungen aus DB
+        # Bot-Gilden-Details aus der lokalen Kopie
+        guild_details = bot_state.get_guild(guild_id)
+        if guild_details is None:
+            if not bot_state.loaded:
+                return HTMLResponse("Die Daten des Bots werden gerade geladen. Bitte in ein paar Sekunden erneut versuchen.", status_code=503)
+            return HTMLResponse("Gilde nicht gefunden", status_code=404)
+
+        # Einstellungen aus DB (eine Abfrage, am Cache vorbei, damit Änderungen aus dem Bot sofort sichtbar sind)
+        settings = await run_db(db_guilds.load_guild_settings, guild_id)
         channel_settings = {
-            "birthday_channel": str(db_guilds.get_birthday_channel(guild_id) or ""),
-            "sanctions_channel": str(db_guilds.get_sanctions_channel(guild_id) or ""),
-            "joinleft_channel": str(db_joinleft.get_welcome_channel(guild_id) or ""),
-            "bump_channel": str(db_guilds.get_bump_reminder_channel(guild_id) or ""),
-            "voice_channel": str(db_guilds.get_dynamic_voice_channel(guild_id) or ""),
-            "bumper_role": str(db_guilds.get_bumper_role(guild_id) or "")
+            "birthday_channel": str(settings.birthday_channel_id or ""),
+            "sanctions_channel": str(settings.sanctions_channel_id or ""),
+            "joinleft_channel": str(settings.welcome_channel_id or ""),
+            "bump_channel": str(settings.bump_reminder_channel_id or ""),
+            "voice_channel": str(settings.dynamic_voice_channel_id or ""),
+            "bumper_role": str(settings.bumper_role_id or "")
         }
-        prefix = db_guilds.get_prefix(guild_id) or "!"
+        prefix = settings.prefix or "!"
 
         # Custom Commands
-        raw_custom_commands = db_custom.get_all_commands(guild_id) or {}
+        raw_custom_commands = await run_db(db_custom.get_all_commands, guild_id) or {}
         custom_commands = {}
         if isinstance(raw_custom_commands, list):
             for cmd in raw_custom_commands:
@@ -243,7 +298,7 @@ def create_dashboard(bot=None) -> FastAPI:
         # ------------------------------------------------------------
         # Command Usage aus DB
         # ------------------------------------------------------------
-        command_usage = {cmd: uses for cmd, uses in db_commands.get_top_commands(guild_id, 100)}
+        command_usage = {cmd: uses for cmd, uses in await run_db(db_commands.get_top_commands, guild_id, 100)}
 
         return templates.TemplateResponse(
             "server_dashboard.html",
@@ -282,13 +337,14 @@ def create_dashboard(bot=None) -> FastAPI:
             return RedirectResponse(url="/login")
 
         # bisheriger Code für Update
-        db_guilds.set_prefix(guild_id, prefix)
-        db_guilds.set_birthday_channel(guild_id, birthday_channel or None)
-        db_guilds.set_sanctions_channel(guild_id, sanctions_channel or None)
-        db_guilds.set_bump_reminder_channel(guild_id, bump_channel or None)
-        db_guilds.set_dynamic_voice_channel(guild_id, voice_channel or None)
-        db_joinleft.set_welcome_channel(guild_id, joinleft_channel or None)
-        db_guilds.set_bumper_role(guild_id, bumper_role or None)
+        await run_db(db_guilds.set_prefix, guild_id, prefix)
+        await run_db(db_guilds.set_birthday_channel, guild_id, birthday_channel or None)
+        await run_db(db_guilds.set_sanctions_channel, guild_id, sanctions_channel or None)
+        await run_db(db_guilds.set_bump_reminder_channel, guild_id, bump_channel or None)
+        await run_db(db_guilds.set_dynamic_voice_channel, guild_id, voice_channel or None)
+        await run_db(db_joinleft.set_welcome_channel, guild_id, joinleft_channel or None)
+        await run_db(db_guilds.set_bumper_role, guild_id, bumper_role or None)
+        await notify_bot_settings_changed(guild_id)
 
         return RedirectResponse(f"/server/{guild_id}", status_code=303)
 
@@ -301,7 +357,8 @@ def create_dashboard(bot=None) -> FastAPI:
         if not user_data:
             return RedirectResponse(url="/login")
 
-        db_custom.add_command(guild_id, command_name.lower(), response)
+        await run_db(db_custom.add_command, guild_id, command_name.lower(), response)
+        await notify_bot_settings_changed(guild_id)
         return RedirectResponse(f"/server/{guild_id}", status_code=303)
 
     @app.post("/server/{guild_id}/commands/remove")
@@ -310,9 +367,11 @@ def create_dashboard(bot=None) -> FastAPI:
         if not user_data:
             return RedirectResponse(url="/login")
 
-        removed = db_custom.remove_command(guild_id, command_name.lower())
+        removed = await run_db(db_custom.remove_command, guild_id, command_name.lower())
         if not removed:
             logger.warning(f"Command '{command_name}' konnte nicht gelöscht werden oder existierte nicht.")
+        else:
+            await notify_bot_settings_changed(guild_id)
 
         return RedirectResponse(f"/server/{guild_id}", status_code=303)
 
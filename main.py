@@ -4,6 +4,13 @@ import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 from utils.database import setup_database, guilds as db_guilds
+from utils.database.connection import close_pool
+from utils.database.executor import shutdown_executor
+from utils.render_pool import get_render_stats, shutdown_render_pool
+from utils.http_clients import close_http_clients, get_http_stats, open_http_clients
+from utils.pipeline import message_pipeline
+from utils.hydration import hydrate
+from utils.guild_state import GUILD_STATE_POLL_TIMEOUT, GuildStateFeed, guild_details
 import mysql.connector
 import logging
 import uvicorn
@@ -33,14 +40,14 @@ BOT_API_PORT = int(os.getenv("BOT_API_PORT", 8001))
 # ------------------------------------------------------------
 async def get_prefix(bot: commands.Bot, message: discord.Message) -> List[str]:
     """Holt den Gilden-spezifischen Präfix oder nutzt den Standard."""
-    default_prefix = "!"
+    default_prefix = db_guilds.DEFAULT_PREFIX
     if not message.guild:
         return [default_prefix]
     
-    # Annahme: db_guilds.get_prefix kann None zurückgeben
+    # Einstellungen kommen aus dem Gilden-Cache, die Datenbank wird nur bei einem Cache-Fehlschlag gefragt
     try:
-        prefix = db_guilds.get_prefix(str(message.guild.id))
-        return [prefix, default_prefix] if prefix else [default_prefix]
+        settings = await db_guilds.fetch_guild_settings(str(message.guild.id))
+        return settings.command_prefixes()
     except Exception as e:
         logger.error(f"Fehler beim Abrufen des Präfixes: {e}")
         return [default_prefix]
@@ -49,6 +56,47 @@ async def get_prefix(bot: commands.Bot, message: discord.Message) -> List[str]:
 intents = discord.Intents.all()
 bot = commands.Bot(command_prefix=get_prefix, intents=intents, help_command=None)
 
+@bot.event
+async def on_message(message: discord.Message):
+    """
+    Gibt jede Nachricht einmal an die Stufen der Cogs weiter (utils/pipeline.py).
+    Befehle werden nur geparst, wenn die Pipeline die Nachricht als Befehl erkannt hat.
+    """
+    ctx = await message_pipeline.process(bot, message)
+    if ctx.is_command:
+        await bot.process_commands(message)
+
+# ------------------------------------------------------------
+# Gilden-Zustand für das Dashboard (Long-Poll unter /api/state)
+# ------------------------------------------------------------
+guild_state = GuildStateFeed()
+
+# on_ready feuert auch nach jedem Reconnect; Startdaten, Cogs und Sync nur beim ersten Mal
+startup_done = False
+
+@bot.listen("on_guild_join")
+@bot.listen("on_guild_remove")
+@bot.listen("on_guild_available")
+@bot.listen("on_guild_unavailable")
+async def on_guild_state_changed(guild: discord.Guild):
+    guild_state.touch(guild.id)
+
+@bot.listen("on_guild_update")
+async def on_guild_details_changed(before: discord.Guild, after: discord.Guild):
+    guild_state.touch(after.id)
+
+@bot.listen("on_guild_channel_create")
+@bot.listen("on_guild_channel_delete")
+@bot.listen("on_guild_role_create")
+@bot.listen("on_guild_role_delete")
+async def on_guild_item_changed(item):
+    guild_state.touch(item.guild.id)
+
+@bot.listen("on_guild_channel_update")
+@bot.listen("on_guild_role_update")
+async def on_guild_item_updated(before, after):
+    guild_state.touch(after.guild.id)
+
 # Definiert die Liste aller Cogs
 COGS = [
     "cogs.leveling", "cogs.info", "cogs.moderation", "cogs.birthday", "cogs.setup", 
@@ -81,16 +129,38 @@ async def get_bot_guild_details(guild_id: str):
     if not guild:
         raise HTTPException(status_code=404, detail="Gilde nicht gefunden")
 
+    return guild_details(guild)
+
+@internal_api.get("/api/state")
+async def get_guild_state(since: int = 0, instance: str = "", timeout: float = GUILD_STATE_POLL_TIMEOUT):
+    """
+    Long-Poll für das Dashboard (utils/guild_state.py): wartet bis zu timeout Sekunden auf
+    Änderungen nach Version since und liefert dann die geänderten Gilden. Ohne passenden
+    Stand (since=0, anderer Bot-Prozess) kommen sofort alle Gilden.
+    """
+    if instance == guild_state.instance and since > 0:
+        await guild_state.wait(since, max(0.0, min(timeout, GUILD_STATE_POLL_TIMEOUT)))
+    return guild_state.changes(bot, since, instance)
+
+@internal_api.post("/api/guild/{guild_id}/invalidate")
+async def invalidate_guild_cache(guild_id: str):
+    """Verwirft die gecachten Einstellungen einer Gilde, z.B. nach einer Änderung im Dashboard."""
+    db_guilds.invalidate_guild_settings(guild_id)
+    # Cogs mit eigenen Caches können darauf reagieren (on_guild_settings_changed)
+    bot.dispatch("guild_settings_changed", guild_id)
+    return {"status": "ok"}
+
+@internal_api.get("/api/metrics")
+async def get_metrics():
+    """Laufzeit-Kennzahlen des Bots: Render-Latenzen der Bildkarten, Dauer der Nachrichten-Stufen, HTTP-Clients und API-Caches."""
+    weather = bot.get_cog("Weather")
+    music = bot.get_cog("MusicConverter")
     return {
-        "id": str(guild.id),
-        "name": guild.name,
-        "icon": str(guild.icon.url) if guild.icon else None,
-        "owner_id": str(guild.owner_id),
-        # Filtern für Text- und Voice-Channels ist hier optional, aber beibehalten
-        "text_channels": [{"id": str(c.id), "name": c.name} for c in guild.text_channels],
-        "voice_channels": [{"id": str(c.id), "name": c.name} for c in guild.voice_channels],
-        # Rollen-Filterung beibehalten
-        "roles": [{"id": str(r.id), "name": r.name} for r in guild.roles if not r.managed and r.name != "@everyone"],
+        "render": get_render_stats(),
+        "message_pipeline": message_pipeline.stats(),
+        "http": get_http_stats(),
+        "weather_cache": weather.cache.stats() if weather else {},
+        "songlink_cache": music.resolver.stats() if music else {},
     }
 
 async def start_internal_api_background():
@@ -140,8 +210,27 @@ def wait_for_mysql():
 # ------------------------------------------------------------
 @bot.event
 async def on_ready():
-    """Wird einmalig ausgelöst, wenn der Bot vollständig initialisiert wurde."""
+    """Wird ausgelöst, wenn der Bot vollständig initialisiert wurde (auch nach einem Reconnect)."""
+    global startup_done
     logger.info(f"Bot online als {bot.user} ({bot.user.id})")
+    # Wartende Dashboard-Abfragen bekommen jetzt den vollständigen Stand
+    guild_state.touch()
+
+    if startup_done:
+        logger.info("Verbindung wiederhergestellt, Cogs sind bereits geladen.")
+        return
+    startup_done = True
+
+    # Startdaten (Gilden-Einstellungen, Einladungen) einmal gebündelt laden;
+    # die Cogs lesen sie in cog_load über utils.hydration.get_startup_data()
+    try:
+        bot.startup_data = await hydrate(bot)
+        logger.info(
+            f"Startdaten für {len(bot.guilds)} Gilden geladen ({bot.startup_data.duration_ms:.0f} ms)"
+        )
+    except Exception as e:
+        logger.error(f"Fehler beim Laden der Startdaten: {e}")
+        bot.startup_data = None
 
     # Cogs laden
     for cog in COGS:
@@ -153,6 +242,12 @@ async def on_ready():
             # loggen wir den Fehler direkt.
             logger.error(f"Fehler beim Laden: {cog}: {e}") 
 
+    # Nur für die Startphase; später geladene Cogs holen sich frische Daten
+    bot.startup_data = None
+
+    # Die Cogs haben ihre HTTP-Clients beim Import registriert: jetzt einmal öffnen
+    open_http_clients()
+
     # ------------------------------------------------------------
     # ✅ Slash Command Synchronisation (EINMALIGER Aufruf)
     # ------------------------------------------------------------
@@ -184,9 +279,17 @@ async def start_bot_and_api():
     try:
         await bot.start(TOKEN)
     finally:
+        # Bot sauber schließen, damit Cogs entladen werden, solange die Datenbank noch erreichbar ist
+        if not bot.is_closed():
+            await bot.close()
+        await close_http_clients()
         # Stellt sicher, dass der API-Task abbricht, wenn der Bot stoppt
         api_task.cancel()
         logger.info("Interne API gestoppt.")
+        shutdown_render_pool()
+        # Laufende Datenbankaufrufe abwarten, dann gepoolte Verbindungen sauber schließen
+        shutdown_executor()
+        close_pool()
 
 # ------------------------------------------------------------
 # Main
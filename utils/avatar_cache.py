@@ -0,0 +1,98 @@
+# utils/avatar_cache.py
+"""
+Cache für vorbereitete Avatare der Bildkarten (Rank, Top5, Bump).
+
+Gespeichert wird die Ausgabe von cards.prepare_avatar: bereits dekodiert, auf die
+Kartengröße skaliert und rund ausgeschnitten. Schlüssel ist (Avatar-Hash, Größe);
+ändert ein Nutzer seinen Avatar, ändert sich der Hash und der alte Eintrag verfällt.
+
+Stufen: LRU im Speicher, optional ein Verzeichnis auf der Platte (AVATAR_DISK_CACHE_DIR),
+erst dann HTTP zu Discord. Das Verzeichnis darf jederzeit geleert werden.
+"""
+import asyncio
+import os
+from typing import Iterable, List, Optional, Tuple, Union
+
+import discord
+
+from utils import cards
+from utils.cache import TTLCache
+from utils.render_pool import render
+
+AVATAR_CACHE_SIZE = int(os.getenv("AVATAR_CACHE_SIZE", 512))
+AVATAR_CACHE_TTL = float(os.getenv("AVATAR_CACHE_TTL", 86400))
+# Leer = keine Plattenstufe
+AVATAR_DISK_CACHE_DIR = os.getenv("AVATAR_DISK_CACHE_DIR", "")
+
+_memory = TTLCache(AVATAR_CACHE_SIZE, AVATAR_CACHE_TTL)
+
+# ------------------------------------------------------------
+# Plattenstufe
+# ------------------------------------------------------------
+def _disk_path(key: Tuple[str, int]) -> str:
+    avatar_key, size = key
+    return os.path.join(AVATAR_DISK_CACHE_DIR, f"{avatar_key}_{size}.rgba")
+
+def _read_disk(key: Tuple[str, int]) -> Optional[bytes]:
+    try:
+        with open(_disk_path(key), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # Abgebrochene Schreibvorgänge o.ä. nicht verwenden
+    return data if len(data) == key[1] * key[1] * 4 else None
+
+def _write_disk(key: Tuple[str, int], data: bytes) -> None:
+    try:
+        os.makedirs(AVATAR_DISK_CACHE_DIR, exist_ok=True)
+        path = _disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Avatar konnte nicht auf der Platte gespeichert werden: {e}")
+
+# ------------------------------------------------------------
+# Abruf
+# ------------------------------------------------------------
+def _fetch_size(size: int) -> int:
+    """Kleinste von Discord unterstützte Größe (Zweierpotenz), die für size reicht."""
+    fetch = 16
+    while fetch < size and fetch < 4096:
+        fetch *= 2
+    return fetch
+
+async def get_avatar(user: Union[discord.User, discord.Member], size: int) -> Optional[bytes]:
+    """
+    Gibt den vorbereiteten Avatar (RGBA-Bytes, size×size, rund) für die Karten zurück,
+    oder None, wenn er nicht geladen werden konnte.
+    """
+    asset = user.display_avatar
+    key = (asset.key, size)
+
+    data = _memory.get(key)
+    if data is not None:
+        return data
+
+    loop = asyncio.get_running_loop()
+    if AVATAR_DISK_CACHE_DIR:
+        data = await loop.run_in_executor(None, _read_disk, key)
+
+    if data is None:
+        try:
+            raw = await asset.with_format("png").with_size(_fetch_size(size)).read()
+            # Dekodieren und Ausschneiden ist CPU-Arbeit und läuft im Render-Pool
+            data = await render(cards.prepare_avatar, raw, size)
+        except Exception as e:
+            print(f"⚠️ Avatar konnte nicht geladen werden für {user.name}: {e}")
+            return None
+        if AVATAR_DISK_CACHE_DIR:
+            loop.run_in_executor(None, _write_disk, key, data)
+
+    _memory.set(key, data)
+    return data
+
+async def get_avatars(users: Iterable[Union[discord.User, discord.Member]], size: int) -> List[Optional[bytes]]:
+    """Lädt die Avatare mehrerer Nutzer gleichzeitig (z.B. für eine Bestenliste)."""
+    return list(await asyncio.gather(*(get_avatar(user, size) for user in users)))
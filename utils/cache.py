@@ -0,0 +1,196 @@
+# utils/cache.py
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+_MISSING = object()
+
+# ------------------------------------------------------------
+# TTL/LRU-Cache
+# ------------------------------------------------------------
+class TTLCache:
+    """
+    Threadsicherer In-Memory-Cache mit Ablaufzeit (ttl in Sekunden) und LRU-Verdrängung.
+    Wird sowohl vom Event-Loop als auch aus dem DB-Thread-Pool heraus benutzt.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Wird bei jeder Invalidierung erhöht, damit ein laufender Ladevorgang keinen veralteten Wert einträgt
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def _set_locked(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Gibt den gecachten Wert zurück oder lädt ihn über loader() und speichert ihn."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            generation = self._generation
+        value = loader()
+        with self._lock:
+            # Nur eintragen, wenn während des Ladens nichts invalidiert wurde
+            if self._generation == generation:
+                self._set_locked(key, value, None)
+        return value
+
+    def get_or_load_many(self, keys: Iterable[Hashable], loader: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """
+        Wie get_or_load für mehrere Schlüssel: loader() wird einmal mit allen
+        fehlenden Schlüsseln aufgerufen und muss ein Dictionary zurückgeben.
+        """
+        result: Dict[Hashable, Any] = {}
+        missing: List[Hashable] = []
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                result[key] = value
+        if not missing:
+            return result
+
+        with self._lock:
+            generation = self._generation
+        loaded = loader(missing)
+        with self._lock:
+            if self._generation == generation:
+                for key, value in loaded.items():
+                    self._set_locked(key, value, None)
+        result.update(loaded)
+        return result
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+
+# ------------------------------------------------------------
+# Gleichzeitige Ladevorgänge bündeln
+# ------------------------------------------------------------
+class SingleFlight:
+    """
+    Bündelt gleichzeitige asynchrone Ladevorgänge pro Schlüssel: nur der erste Aufruf
+    lädt, alle weiteren warten auf dasselbe Ergebnis (bzw. dieselbe Exception).
+    Wird ein Wartender abgebrochen, läuft der Ladevorgang für die übrigen weiter.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        self._inflight.pop(key, None)
+        # Exception abholen, auch wenn alle Wartenden abgebrochen wurden
+        # (sonst meldet asyncio "Task exception was never retrieved")
+        if not task.cancelled():
+            task.exception()
+
+# ------------------------------------------------------------
+# Antwort-Cache für externe Dienste
+# ------------------------------------------------------------
+class ResponseCache:
+    """
+    Async-Cache für Antworten externer APIs. Einträge gelten ttl Sekunden als frisch;
+    gleichzeitige Anfragen für denselben Schlüssel teilen sich einen Aufruf (SingleFlight).
+    Schlägt der Aufruf fehl, wird ein abgelaufener Eintrag bis zu stale_ttl Sekunden
+    nach dem Laden weiter ausgeliefert.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float):
+        self.ttl = ttl
+        # Einträge: (geladen_um, wert); sie bleiben bis zum Ende der Stale-Frist im Cache
+        self._entries = TTLCache(maxsize, max(ttl, stale_ttl))
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.errors = 0
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        try:
+            return await self._flight.do(key, lambda: self._load(key, loader))
+        except Exception:
+            if entry is None:
+                raise
+            return entry[1]
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await loader()
+        except Exception:
+            # Einmal pro fehlgeschlagenem Aufruf zählen, nicht pro wartendem Aufrufer
+            self.errors += 1
+            if self._entries.get(key) is not None:
+                self.stale += 1
+            raise
+        self._entries.set(key, (time.monotonic(), value))
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.invalidate(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self._flight.coalesced,
+            "stale": self.stale,
+            "errors": self.errors,
+        }
@@ -0,0 +1,406 @@
+# utils/cards.py
+"""
+Reines Bild-Rendering für Rank-, Top5- und Bump-Karten.
+
+Die Funktionen bekommen nur einfache Daten (Strings, Zahlen, Avatar-Bytes) und geben
+PNG-Bytes zurück. Das Modul importiert bewusst kein discord, damit es in den
+Worker-Prozessen des Render-Pools (utils/render_pool.py) schlank geladen werden kann.
+"""
+import io
+import os
+import random
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+try:
+    import numpy as np
+except ImportError:  # optional: ohne NumPy wird die Verlaufszeile in reinem Python berechnet
+    np = None
+
+# ------------------------------------------------------------
+# Hilfsfunktionen
+# ------------------------------------------------------------
+def get_base_path(*paths: str) -> str:
+    """Erstellt einen sicheren Pfad relativ zum Projekt-Wurzelverzeichnis."""
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+    return os.path.join(base_dir, *paths)
+
+# ------------------------------------------------------------
+# Schriftarten laden
+# ------------------------------------------------------------
+try:
+    FONT_PATH = get_base_path("assets", "fonts", "RobotoMono-VariableFont_wght.ttf")
+    font_main = ImageFont.truetype(FONT_PATH, 40)
+    font_small = ImageFont.truetype(FONT_PATH, 25)
+    font_tiny = ImageFont.truetype(FONT_PATH, 20)
+    font_name = ImageFont.truetype(FONT_PATH, 30)
+except Exception as e:
+    print(f"⚠️ Fehler beim Laden der Schriftart: {e}")
+    font_main = ImageFont.load_default()
+    font_small = ImageFont.load_default()
+    font_tiny = ImageFont.load_default()
+    font_name = ImageFont.load_default()
+
+def _to_png(img: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+# ------------------------------------------------------------
+# Farbverläufe für Fortschrittsbalken
+# ------------------------------------------------------------
+RGB = Tuple[int, int, int]
+
+# Farbverläufe der Leaderboard-Balken (Start- und Endfarbe)
+TOP5_BAR_GRADIENT: Tuple[RGB, RGB] = ((0, 255, 255), (157, 0, 255))   # Cyan → Violett
+BUMP_BAR_GRADIENT: Tuple[RGB, RGB] = ((255, 0, 122), (255, 179, 0))   # Pink → Orange
+
+def _gradient_row(width: int, start: RGB, end: RGB) -> bytes:
+    """Eine Pixelzeile als RGB-Bytes; Spalte x hat die Farbe start + (end - start) * x / width."""
+    if np is not None:
+        t = np.arange(width, dtype=np.float64) / width
+        row = np.empty((width, 3), dtype=np.uint8)
+        for c in range(3):
+            row[:, c] = (start[c] + (end[c] - start[c]) * t).astype(np.uint8)
+        return row.tobytes()
+    return bytes(
+        int(start[c] + (end[c] - start[c]) * (x / width))
+        for x in range(width) for c in range(3)
+    )
+
+@lru_cache(maxsize=2048)
+def gradient_bar(width: int, height: int, start: RGB, end: RGB) -> Image.Image:
+    """
+    Gibt einen horizontalen Farbverlauf der Größe width×height zurück.
+    Es wird nur eine Zeile berechnet und auf die Höhe gestreckt; fertige Balken
+    werden pro Breite gecacht (der Wert darf daher nicht verändert werden).
+    """
+    row = Image.frombytes("RGB", (width, 1), _gradient_row(width, start, end))
+    return row.resize((width, height), Image.NEAREST)
+
+# ------------------------------------------------------------
+# Avatare
+# ------------------------------------------------------------
+# Avatargröße auf den Top5- und Bump-Karten
+LEADERBOARD_AVATAR_SIZE = 90
+
+@lru_cache(maxsize=8)
+def _circle_mask(size: int) -> Image.Image:
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
+    return mask
+
+def prepare_avatar(raw: bytes, size: int) -> bytes:
+    """
+    Dekodiert ein Avatar-Bild, skaliert es auf size×size und schneidet es rund aus.
+    Gibt rohe RGBA-Bytes zurück, die utils/avatar_cache.py speichert und load_avatar
+    ohne erneutes Dekodieren wieder zu einem Bild macht.
+    """
+    with Image.open(io.BytesIO(raw)) as src:
+        avatar = src.resize((size, size)).convert("RGBA")
+    alpha = ImageChops.multiply(avatar.getchannel("A"), _circle_mask(size))
+    avatar.putalpha(alpha)
+    return avatar.tobytes()
+
+def load_avatar(data: bytes, size: int) -> Image.Image:
+    """Macht aus den Bytes von prepare_avatar wieder ein RGBA-Bild (Alpha = runde Maske)."""
+    return Image.frombytes("RGBA", (size, size), data)
+
+# ------------------------------------------------------------
+# Rank Card: vorberechnete Ebenen
+# ------------------------------------------------------------
+RANK_CARD_SIZE = (800, 200)
+RANK_BACKGROUND_COUNT = 10
+RANK_AVATAR_SIZE = (150, 150)
+# Fortschrittsbalken: Position, Breite, Höhe und Abstand der Trennlinien
+RANK_BAR_X, RANK_BAR_Y = 200, 105
+RANK_BAR_WIDTH, RANK_BAR_HEIGHT = 580, 25
+RANK_BAR_TICK_SPACING = 15
+
+_rank_templates: Dict[int, Image.Image] = {}
+_rank_bar_fill: Optional[Image.Image] = None
+_rank_avatar_ring: Optional[Image.Image] = None
+
+def _load_rank_background(image_number: int) -> Image.Image:
+    """Hintergrund + Fallback-Farbe + dunkles Overlay + Balken-Spur, einmalig zusammengesetzt."""
+    width, height = RANK_CARD_SIZE
+    img = Image.new("RGBA", (width, height), (30, 30, 30, 255))
+
+    try:
+        images_dir = get_base_path("images")
+        for ext in (".png", ".jpg", ".jpeg"):
+            temp_path = os.path.join(images_dir, f"background{image_number}{ext}")
+            if os.path.exists(temp_path):
+                with Image.open(temp_path) as bg_file:
+                    bg_img = bg_file.resize((width, height)).convert("RGBA")
+                img = Image.alpha_composite(img, bg_img)
+                break
+    except Exception:
+        pass
+
+    # 🌑 KONTRAST-OVERLAY (Alpha 100/255)
+    overlay = Image.new("RGBA", (width, height), (0, 0, 0, 100))
+    img = Image.alpha_composite(img, overlay)
+
+    # Statische Balken-Spur inkl. Trennlinien
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([RANK_BAR_X, RANK_BAR_Y, RANK_BAR_X + RANK_BAR_WIDTH, RANK_BAR_Y + RANK_BAR_HEIGHT], fill=(51, 51, 51, 255))
+    for i in range(0, RANK_BAR_WIDTH, RANK_BAR_TICK_SPACING):
+        draw.line([(RANK_BAR_X + i, RANK_BAR_Y), (RANK_BAR_X + i, RANK_BAR_Y + RANK_BAR_HEIGHT)], fill=(17, 17, 17, 255), width=1)
+    return img
+
+def load_rank_card_templates() -> None:
+    """Dekodiert und komponiert alle Hintergründe und statischen Ebenen einmalig (blockierend)."""
+    global _rank_bar_fill, _rank_avatar_ring
+
+    for image_number in range(1, RANK_BACKGROUND_COUNT + 1):
+        _rank_templates[image_number] = _load_rank_background(image_number)
+
+    # Voller weißer Balken inkl. Trennlinien; pro Karte wird nur auf die Fortschrittsbreite zugeschnitten
+    bar = Image.new("RGBA", (RANK_BAR_WIDTH + 1, RANK_BAR_HEIGHT + 1), (255, 255, 255, 255))
+    bar_draw = ImageDraw.Draw(bar)
+    for i in range(0, RANK_BAR_WIDTH, RANK_BAR_TICK_SPACING):
+        bar_draw.line([(i, 0), (i, RANK_BAR_HEIGHT)], fill=(17, 17, 17, 255), width=1)
+    _rank_bar_fill = bar
+
+    # Weißer Ring um den Avatar (20,20)-(175,175), wird nach dem Avatar aufgelegt
+    ring = Image.new("RGBA", (156, 156), (0, 0, 0, 0))
+    ImageDraw.Draw(ring).ellipse((0, 0, 155, 155), outline=(255, 255, 255, 255), width=5)
+    _rank_avatar_ring = ring
+
+def _get_rank_template(image_number: int) -> Image.Image:
+    if not _rank_templates:
+        load_rank_card_templates()
+    template = _rank_templates.get(image_number)
+    return template if template is not None else _rank_templates[1]
+
+def pick_rank_background() -> int:
+    return random.randint(1, RANK_BACKGROUND_COUNT)
+
+def init_worker() -> None:
+    """Initializer für Render-Worker: Templates einmal pro Prozess vorbereiten."""
+    load_rank_card_templates()
+
+# ------------------------------------------------------------
+# Rank Card
+# ------------------------------------------------------------
+def render_rank_card(display_name: str, avatar: Optional[bytes], counter: int, level: int, rank: int,
+                     progress_percent: float, xp_current_in_level: int, xp_needed_for_level_up: int,
+                     background: int) -> bytes:
+    """
+    Erstellt das Rank-Bild mit Benutzername, weißer Schrift/Balken und leichtem Overlay.
+    avatar: Ausgabe von prepare_avatar in RANK_AVATAR_SIZE (oder None).
+    """
+    width, height = RANK_CARD_SIZE
+
+    # 🎨 Farbeinstellungen: IMMER WEISS
+    fill_color = "#FFFFFF"
+    progress_color = (255, 255, 255, 255)
+
+    # Vorkomponierten Hintergrund (inkl. Overlay und Balken-Spur) kopieren
+    img = _get_rank_template(background).copy()
+    draw = ImageDraw.Draw(img)
+
+    # ------------------------------------------------------------
+    # Avatar rund einfügen
+    # ------------------------------------------------------------
+    if avatar:
+        try:
+            avatar_img = load_avatar(avatar, RANK_AVATAR_SIZE[0])
+            img.paste(avatar_img, (25, 25), avatar_img)
+            img.alpha_composite(_rank_avatar_ring, dest=(20, 20))
+        except Exception as e:
+            print(f"⚠️ Avatar konnte nicht verarbeitet werden: {e}")
+
+    # ------------------------------------------------------------
+    # Benutzername, im Bereich rechts vom Avatar (200 bis 790) zentriert
+    # ------------------------------------------------------------
+    name_x_start = 200
+    name_x_end = width - 10
+
+    bbox_name = draw.textbbox((0, 0), display_name, font=font_name)
+    text_w_name = bbox_name[2] - bbox_name[0]
+    name_x = name_x_start + ((name_x_end - name_x_start) - text_w_name) // 2
+    draw.text((name_x, 5), display_name, fill=fill_color, font=font_name)
+
+    # Level und Rank
+    draw.text((200, 35), f"Level: {level}", fill=fill_color, font=font_main)
+    draw.text((480, 35), f"Rank: {rank}", fill=fill_color, font=font_main)
+
+    # ------------------------------------------------------------
+    # Fortschrittsbalken: nur die Füllung, Spur und Trennlinien stecken im Template
+    # ------------------------------------------------------------
+    bar_x, bar_y = RANK_BAR_X, RANK_BAR_Y
+    bar_height = RANK_BAR_HEIGHT
+    fill_width = int(RANK_BAR_WIDTH * progress_percent)
+    img.paste(_rank_bar_fill.crop((0, 0, fill_width + 1, bar_height + 1)), (bar_x, bar_y))
+
+    # ------------------------------------------------------------
+    # XP-Text unter dem Balken
+    # ------------------------------------------------------------
+    xp_text_total = f"XP: {counter}"
+    xp_text_progress = f"{xp_current_in_level}/{xp_needed_for_level_up} XP bis Level {level + 1}"
+
+    draw.text((bar_x, bar_y + bar_height + 15), xp_text_total, fill=fill_color, font=font_small)
+
+    bbox_total = draw.textbbox((0, 0), xp_text_total, font=font_small)
+    text_w_total = bbox_total[2] - bbox_total[0]
+    start_x_progress = bar_x + text_w_total + 20
+    draw.text((start_x_progress, bar_y + bar_height + 15), xp_text_progress, fill=progress_color, font=font_small)
+
+    return _to_png(img)
+
+# ------------------------------------------------------------
+# Top 5 Card
+# ------------------------------------------------------------
+def render_top5_card(entries: List[Tuple[str, Optional[bytes], int, int, float]]) -> bytes:
+    """
+    Erstellt ein futuristisches Ranking-Bild.
+    entries: Liste aus (anzeigename, avatar (prepare_avatar, LEADERBOARD_AVATAR_SIZE), counter, level, fortschritt 0–1).
+    """
+    width, height = 750, 80 + (len(entries) * 130)
+    avatar_size = LEADERBOARD_AVATAR_SIZE
+
+    # 🎨 Hintergrund mit leichtem Farbverlauf
+    base = Image.new("RGB", (width, height), "#1E1E2E")
+    overlay = Image.new("RGB", (width, height), "#2A1A40")
+    img = Image.blend(base, overlay, alpha=0.3)
+    draw = ImageDraw.Draw(img)
+
+    # Farben
+    fill_color = "#E0E0E0"
+    accent = "#00FFFF" # Neon-Cyan
+    neon_violet = "#9D00FF"
+    rank_color = (255, 215, 0, 255) # Gold
+
+    # 🏆 Titel mit Glow-Effekt
+    title_text = "🏆 TOP 5 USER"
+    bbox_title = draw.textbbox((0, 0), title_text, font=font_main)
+    title_x = (width - (bbox_title[2] - bbox_title[0])) // 2
+    draw.text((title_x + 2, 12 + 2), title_text, fill=neon_violet, font=font_main)
+    draw.text((title_x, 10), title_text, fill=accent, font=font_main)
+
+    start_y = 80
+    medals = ["🥇", "🥈", "🥉", "🏅", "🎖️"]
+
+    for i, (display_name, avatar, counter, level, progress) in enumerate(entries):
+        y_pos = start_y + (i * 130)
+        box_y2 = y_pos + 110
+
+        # 🔳 Box-Hintergrund mit abgerundeten Ecken
+        box = Image.new("RGBA", (width - 40, 110), (40, 40, 60, 220))
+        mask = Image.new("L", (width - 40, 110), 0)
+        ImageDraw.Draw(mask).rounded_rectangle((0, 0, width - 40, 110), radius=20, fill=255)
+        img.paste(box, (20, y_pos), mask)
+
+        # 💡 Leichte Neonlinie links
+        draw.rectangle([25, y_pos + 10, 30, box_y2 - 10], fill=accent)
+
+        # 🏅 Rang
+        rank_text = medals[i] if i < len(medals) else f"#{i+1}"
+        draw.text((45, y_pos + 35), rank_text, fill=rank_color, font=font_name)
+
+        # 👤 Avatar mit Glow
+        if avatar:
+            try:
+                avatar_img = load_avatar(avatar, avatar_size)
+
+                glow = Image.new("RGBA", (avatar_size + 20, avatar_size + 20), (0, 0, 0, 0))
+                glow_draw = ImageDraw.Draw(glow)
+                glow_draw.ellipse((0, 0, avatar_size + 20, avatar_size + 20), fill=(0, 255, 255, 80))
+                img.paste(glow, (130 - 10, y_pos), glow)
+                img.paste(avatar_img, (130, y_pos + 10), avatar_img)
+            except Exception as e:
+                print(f"⚠️ Avatar konnte nicht verarbeitet werden für {display_name}: {e}")
+
+        # 📜 Name & Level
+        name_x = 130 + avatar_size + 30
+        draw.text((name_x, y_pos + 20), display_name, fill=fill_color, font=font_name)
+        draw.text((name_x, y_pos + 60), f"Level {level} • XP {counter}", fill="#AAAAAA", font=font_small)
+
+        # 📈 Fortschrittsbalken
+        bar_x1, bar_x2 = name_x, width - 80
+        bar_y = y_pos + 90
+        progress = max(0.0, min(1.0, progress)) # Clamp auf 0–1
+
+        draw.rounded_rectangle((bar_x1, bar_y, bar_x2, bar_y + 10), radius=5, fill=(70, 70, 90))
+
+        # Fortschritt (Cyan → Violett Verlauf)
+        bar_width = int((bar_x2 - bar_x1) * progress)
+        if bar_width > 0:
+            img.paste(gradient_bar(bar_width, 10, *TOP5_BAR_GRADIENT), (bar_x1, bar_y))
+
+            # Glühender Punkt am Ende
+            glow_radius = 8
+            glow = Image.new("RGBA", (glow_radius * 2, glow_radius * 2), (0, 0, 0, 0))
+            glow_draw = ImageDraw.Draw(glow)
+            glow_draw.ellipse((0, 0, glow_radius * 2, glow_radius * 2), fill=(157, 0, 255, 180))
+            img.paste(glow, (bar_x1 + bar_width - glow_radius, bar_y - 4), glow)
+
+    return _to_png(img)
+
+# ------------------------------------------------------------
+# Bump Card
+# ------------------------------------------------------------
+def render_bump_card(entries: List[Tuple[str, Optional[bytes], int]], total_bumps: int) -> bytes:
+    """
+    Erstellt das Bump-Ranking-Bild.
+    entries: Liste aus (anzeigename, avatar (prepare_avatar, LEADERBOARD_AVATAR_SIZE), bumps).
+    """
+    width, height = 750, 80 + (len(entries) * 130)
+    avatar_size = LEADERBOARD_AVATAR_SIZE
+
+    base = Image.new("RGB", (width, height), "#2B1A2E")
+    overlay = Image.new("RGB", (width, height), "#1A0C33")
+    img = Image.blend(base, overlay, alpha=0.35)
+    draw = ImageDraw.Draw(img)
+
+    fill_color = "#F0E6FF"
+    accent = "#FF007A"
+    accent2 = "#FF087B"
+
+    title_text = "🔥 TOP BUMPERS"
+    bbox_title = draw.textbbox((0, 0), title_text, font=font_main)
+    title_x = (width - (bbox_title[2] - bbox_title[0])) // 2
+    draw.text((title_x, 10), title_text, fill=accent, font=font_main)
+
+    start_y = 80
+    medals = ["🔥", "⚡", "🚀", "✨", "💠"]
+
+    for i, (display_name, avatar, bumps) in enumerate(entries):
+        y_pos = start_y + (i * 130)
+
+        card = Image.new("RGBA", (width - 40, 110), (60, 30, 80, 220))
+        mask = Image.new("L", (width - 40, 110), 0)
+        ImageDraw.Draw(mask).rounded_rectangle((0, 0, width - 40, 110), radius=22, fill=255)
+        img.paste(card, (20, y_pos), mask)
+
+        draw.rectangle([25, y_pos + 10, 30, y_pos + 100], fill=accent)
+
+        rank_text = medals[i] if i < len(medals) else f"#{i+1}"
+        draw.text((45, y_pos + 35), rank_text, fill=accent2, font=font_name)
+
+        if avatar:
+            try:
+                avatar_img = load_avatar(avatar, avatar_size)
+                img.paste(avatar_img, (130, y_pos + 10), avatar_img)
+            except Exception:
+                pass
+
+        name_x = 130 + avatar_size + 30
+        draw.text((name_x, y_pos + 20), display_name, fill=fill_color, font=font_name)
+        draw.text((name_x, y_pos + 60), f"Bumps: {bumps}", fill="#DDDDDD", font=font_small)
+
+        bar_x1, bar_x2 = name_x, width - 80
+        bar_y = y_pos + 90
+        progress = bumps / total_bumps if total_bumps > 0 else 0
+
+        draw.rounded_rectangle((bar_x1, bar_y, bar_x2, bar_y + 10), radius=5, fill=(80, 50, 100))
+
+        bar_width = int((bar_x2 - bar_x1) * progress)
+        if bar_width > 0:
+            img.paste(gradient_bar(bar_width, 10, *BUMP_BAR_GRADIENT), (bar_x1, bar_y))
+
+    return _to_png(img)
@@ -1,4 +1,5 @@
 from .connection import setup_database
+from .executor import run_db
 from .users import *
 from .commands import *
 from .messages import *
@@ -7,4 +8,4 @@ from .bumps import *
 from .moderation import *
 from .birthday import *
 from .roles import *
-from .guilds import *
\ No newline at end of file
+from .guilds import *
@@ -0,0 +1,83 @@
+# utils/database/antispam.py
+import os
+from typing import Dict, Iterable, List
+
+from utils.cache import TTLCache
+from utils.spam_rules import SPAM_RULE_FIELDS, SpamRules
+from .connection import get_connection
+from .executor import run_db
+
+# Schwellen ändern sich selten; set_antispam_rule invalidiert den Cache sofort
+ANTISPAM_RULES_CACHE_TTL = float(os.getenv("ANTISPAM_RULES_CACHE_TTL", 600))
+ANTISPAM_RULES_CACHE_SIZE = int(os.getenv("ANTISPAM_RULES_CACHE_SIZE", 10000))
+
+_rules_cache = TTLCache(ANTISPAM_RULES_CACHE_SIZE, ANTISPAM_RULES_CACHE_TTL)
+
+# Maximale Anzahl Guilds pro Abfrage beim Bulk-Laden
+ANTISPAM_RULES_CHUNK_SIZE = 500
+
+_COLUMNS = ", ".join(SPAM_RULE_FIELDS)
+
+# ------------------------------------------------------------
+# Antispam-Regeln pro Guild (gecacht)
+# ------------------------------------------------------------
+def _load_rules(guild_ids: List[str]) -> Dict[str, SpamRules]:
+    """Lädt die Regeln mehrerer Guilds; Guilds ohne Eintrag bekommen die Standardwerte."""
+    rules = {guild_id: SpamRules(guild_id=guild_id) for guild_id in guild_ids}
+    if not guild_ids:
+        return rules
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(guild_ids), ANTISPAM_RULES_CHUNK_SIZE):
+            chunk = guild_ids[start:start + ANTISPAM_RULES_CHUNK_SIZE]
+            ids = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"SELECT guild_id, {_COLUMNS} FROM antispam_settings WHERE guild_id IN ({ids})", tuple(chunk))
+            for row in cursor.fetchall():
+                guild_id = str(row[0])
+                values = dict(zip(SPAM_RULE_FIELDS, row[1:]))
+                values["enabled"] = bool(values["enabled"])
+                rules[guild_id] = SpamRules(guild_id=guild_id, **values)
+    finally:
+        cursor.close()
+        conn.close()
+    return rules
+
+def get_antispam_rules(guild_id: str) -> SpamRules:
+    guild_id = str(guild_id)
+    return _rules_cache.get_or_load(guild_id, lambda: _load_rules([guild_id])[guild_id])
+
+async def fetch_antispam_rules(guild_id: str) -> SpamRules:
+    """Async-Variante für den Nachrichten-Pfad: ein Cache-Treffer fragt die Datenbank nicht."""
+    rules = _rules_cache.get(str(guild_id))
+    if rules is not None:
+        return rules
+    return await run_db(get_antispam_rules, guild_id)
+
+def get_antispam_rules_for_guilds(guild_ids: Iterable[str]) -> Dict[str, SpamRules]:
+    """Lädt die Regeln mehrerer Guilds gebündelt in den Cache (z.B. in cog_load)."""
+    return _rules_cache.get_or_load_many([str(g) for g in guild_ids], _load_rules)
+
+def set_antispam_rule(guild_id: str, field: str, value: int) -> None:
+    """Setzt eine einzelne Schwelle (Feldname aus SPAM_RULE_FIELDS)."""
+    if field not in SPAM_RULE_FIELDS:
+        raise ValueError(f"Unbekannte Antispam-Regel: {field}")
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # Feldname ist gegen SPAM_RULE_FIELDS geprüft und damit sicher für das SQL
+        cursor.execute(f"""
+            INSERT INTO antispam_settings (guild_id, {field})
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE {field} = VALUES({field})
+        """, (guild_id, value))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    invalidate_antispam_rules(guild_id)
+
+def invalidate_antispam_rules(guild_id: str) -> None:
+    _rules_cache.invalidate(str(guild_id))
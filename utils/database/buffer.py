@@ -0,0 +1,91 @@
+# utils/database/buffer.py
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .executor import run_db
+
+# ------------------------------------------------------------
+# Write-Behind-Puffer für Zähler
+# ------------------------------------------------------------
+class IncrementBuffer:
+    """
+    Sammelt Zähler-Inkremente im Speicher und schreibt sie gebündelt in die Datenbank.
+
+    Jeder Eintrag wird über einen Schlüssel-Tupel (z.B. (guild_id, user_id)) identifiziert.
+    Beim Flush erhält flush_func eine Liste von Zeilen der Form
+    schlüssel + (menge,) + zusatzwerte und läuft im DB-Thread-Pool.
+    Schlägt der Flush fehl, wird der Batch wieder in den Puffer übernommen.
+    """
+
+    def __init__(self, name: str, flush_func: Callable[[List[Tuple]], Any], max_events: int):
+        self.name = name
+        self._flush_func = flush_func
+        self.max_events = max(1, max_events)
+        self._pending: Dict[Tuple, List[Any]] = {}
+        self._events = 0
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, key: Tuple, amount: int = 1, *extra: Any) -> bool:
+        """
+        Addiert amount auf den Schlüssel. Zusatzwerte (z.B. der Username) werden
+        mit dem jeweils neuesten Wert überschrieben.
+        Gibt True zurück, sobald genug Ereignisse für einen Flush gesammelt wurden.
+        """
+        entry = self._pending.get(key)
+        if entry is None:
+            self._pending[key] = [amount, *extra]
+        else:
+            entry[0] += amount
+            if extra:
+                entry[1:] = extra
+        self._events += 1
+        return self._events >= self.max_events
+
+    def pending(self, key: Tuple) -> int:
+        """Gibt die noch nicht geschriebene Menge für einen Schlüssel zurück."""
+        entry = self._pending.get(key)
+        return entry[0] if entry else 0
+
+    def schedule_flush(self) -> None:
+        """Startet einen Flush im Hintergrund, falls nicht bereits einer läuft."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_logged())
+
+    async def _flush_logged(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"[ERROR] Flush des Puffers '{self.name}' fehlgeschlagen: {e}")
+
+    async def flush(self) -> int:
+        """Schreibt alle gesammelten Inkremente in die Datenbank und gibt die Anzahl der Zeilen zurück."""
+        # shield: wird der Aufrufer (z.B. ein tasks.loop) abgebrochen, läuft der Batch trotzdem zu Ende
+        return await asyncio.shield(self._flush())
+
+    async def _flush(self) -> int:
+        async with self._lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            events, self._events = self._events, 0
+            rows = [key + tuple(entry) for key, entry in batch.items()]
+
+            try:
+                await run_db(self._flush_func, rows)
+            except Exception:
+                # Nichts verlieren: Batch mit den inzwischen neu gesammelten Werten zusammenführen
+                for key, entry in batch.items():
+                    current = self._pending.get(key)
+                    if current is None:
+                        self._pending[key] = entry
+                    else:
+                        current[0] += entry[0]
+                self._events += events
+                raise
+
+            return len(rows)
@@ -1,4 +1,5 @@
 from .connection import get_connection
+from .guilds import invalidate_guild_settings
 from datetime import datetime, timezone
 from typing import Optional, List, Tuple
 
@@ -62,6 +63,7 @@ def set_reminder_channel(guild_id: str, channel_id: str | None) -> None:
     finally:
         cur.close()
         conn.close()
+    invalidate_guild_settings(guild_id)
 
 
 def get_reminder_channel(guild_id: str) -> Optional[int]:
@@ -185,6 +187,31 @@ def get_all_guild_settings_with_roles() -> List[Tuple[str, Optional[int], Option
     return results
 
 
+def get_bump_schedule() -> List[Tuple[str, datetime, bool]]:
+    """
+    Lädt mit einer Abfrage den Erinnerungs-Zustand aller Server mit Bump-Reminder-Channel:
+    (guild_id, letzter Bump als UTC-datetime, reminder_sent).
+    Server ohne bisherigen Bump werden übersprungen.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    results: List[Tuple[str, datetime, bool]] = []
+    try:
+        cur.execute("""
+            SELECT guild_id, last_bump_timestamp, reminder_sent
+            FROM guild_settings
+            WHERE bump_reminder_channel_id IS NOT NULL AND bump_reminder_channel_id != ''
+              AND last_bump_timestamp IS NOT NULL
+        """)
+        for guild_id_str, ts, status_int in cur.fetchall():
+            last_bump = datetime.fromtimestamp(ts, tz=timezone.utc)
+            results.append((str(guild_id_str), last_bump, bool(status_int)))
+    finally:
+        cur.close()
+        conn.close()
+    return results
+
+
 # ------------------------------------------------------------
 # Top Bumper abrufen
 # ------------------------------------------------------------
@@ -20,6 +20,37 @@ def log_command_usage(command: str, guild_id: str):
         cur.close()
         conn.close()
 
+# Maximale Anzahl Zeilen pro INSERT beim gebündelten Schreiben
+COMMAND_FLUSH_CHUNK_SIZE = 500
+
+def log_command_usage_bulk(rows: List[Tuple[str, str, int]]):
+    """
+    Schreibt gepufferte Command-Nutzung gebündelt.
+    rows: Liste aus (guild_id, command, anzahl), pro Chunk ein mehrzeiliger UPSERT.
+    """
+    if not rows:
+        return
+
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        for start in range(0, len(rows), COMMAND_FLUSH_CHUNK_SIZE):
+            chunk = rows[start:start + COMMAND_FLUSH_CHUNK_SIZE]
+            placeholders = ", ".join(["(%s, %s, %s)"] * len(chunk))
+            params = []
+            for guild_id, command, amount in chunk:
+                params.extend((guild_id, command, amount))
+
+            cur.execute(f"""
+                INSERT INTO commands (guild_id, command, uses)
+                VALUES {placeholders}
+                ON DUPLICATE KEY UPDATE uses = uses + VALUES(uses)
+            """, params)
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
 # ------------------------------------------------------------
 # Top Commands abrufen
 # ------------------------------------------------------------
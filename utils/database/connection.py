@@ -1,6 +1,11 @@
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
 from dotenv import load_dotenv
+from collections import deque
+from typing import Any, Deque, Optional, Tuple
+import threading
+import time
 import os
 
 load_dotenv()
@@ -11,18 +16,225 @@ DB_PASS = os.getenv("DB_PASS", "")
 DB_NAME = os.getenv("DB_NAME", "activity_db")
 EXISTING_GUILD_ID = os.getenv("EXISTING_GUILD_ID")
 
+# Pool-Einstellungen (Sekundenangaben)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300))
+DB_POOL_HEALTHCHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTHCHECK_INTERVAL", 30))
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", 10))
+
+# ------------------------------------------------------------
+# Connection-Pool
+# ------------------------------------------------------------
+class PooledConnection:
+    """
+    Hülle um eine MySQL-Verbindung aus dem Pool.
+    Verhält sich wie die echte Verbindung, close() gibt sie aber an den Pool zurück.
+    """
+    __slots__ = ("_conn", "_pool", "_released")
+
+    def __init__(self, conn, pool: "ConnectionPool"):
+        self._conn = conn
+        self._pool = pool
+        self._released = False
+
+    def __getattr__(self, name: str) -> Any:
+        if name in PooledConnection.__slots__:
+            raise AttributeError(name)
+        return getattr(self._conn, name)
+
+    def close(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._conn)
+
+    def __del__(self) -> None:
+        # Sicherheitsnetz: nicht zurückgegebene Verbindungen blockieren sonst dauerhaft einen Pool-Platz
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Thread-sicherer Pool mit Maximalgröße, Idle-Timeout und Health-Check.
+    Freie Verbindungen werden LIFO vergeben, damit selten genutzte Verbindungen
+    altern und über den Idle-Timeout abgebaut werden.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DB_POOL_SIZE,
+        idle_timeout: float = DB_POOL_IDLE_TIMEOUT,
+        healthcheck_interval: float = DB_POOL_HEALTHCHECK_INTERVAL,
+        acquire_timeout: float = DB_POOL_ACQUIRE_TIMEOUT,
+    ):
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.healthcheck_interval = healthcheck_interval
+        self.acquire_timeout = acquire_timeout
+
+        # (Verbindung, Zeitpunkt der letzten Rückgabe) – rechts liegen die zuletzt genutzten
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._size = 0  # offene Verbindungen insgesamt (frei + ausgeliehen)
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _connect(self):
+        return mysql.connector.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASS,
+            database=DB_NAME,
+            auth_plugin="mysql_native_password"
+        )
+
+    def _discard(self, conn) -> None:
+        """Schließt eine Verbindung endgültig und gibt ihren Platz im Pool frei."""
+        try:
+            conn.close()
+        except Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _pop_expired(self, now: float) -> list:
+        """Entfernt Verbindungen, die länger als idle_timeout unbenutzt waren (Lock muss gehalten werden)."""
+        expired = []
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+        return expired
+
+    def _is_healthy(self, conn) -> bool:
+        try:
+            conn.ping(reconnect=True, attempts=1, delay=0)
+            return True
+        except Error:
+            return False
+
+    def acquire(self) -> PooledConnection:
+        """Leiht eine Verbindung aus; wartet höchstens acquire_timeout Sekunden auf eine freie."""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            conn = None
+            last_used = 0.0
+            expired = []
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError("Connection-Pool wurde bereits geschlossen.")
+                    now = time.monotonic()
+                    newly_expired = self._pop_expired(now)
+                    self._size -= len(newly_expired)
+                    expired.extend(newly_expired)
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise PoolError(f"Keine freie Datenbankverbindung nach {self.acquire_timeout}s (Pool-Größe {self.max_size}).")
+                    self._cond.wait(remaining)
+
+            for old in expired:
+                try:
+                    old.close()
+                except Error:
+                    pass
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                return PooledConnection(conn, self)
+
+            # Länger ungenutzte Verbindungen vor der Vergabe prüfen (z.B. nach wait_timeout des Servers)
+            if time.monotonic() - last_used > self.healthcheck_interval and not self._is_healthy(conn):
+                self._discard(conn)
+                continue
+            return PooledConnection(conn, self)
+
+    def release(self, conn) -> None:
+        """Nimmt eine Verbindung zurück; offene Transaktionen werden verworfen."""
+        try:
+            healthy = conn.is_connected()
+            if healthy and conn.in_transaction:
+                # Verhindert, dass der nächste Nutzer einen alten Snapshot (REPEATABLE READ) sieht
+                conn.rollback()
+        except Error:
+            healthy = False
+
+        with self._cond:
+            if healthy and not self._closed:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    def close(self) -> None:
+        """Schließt alle freien Verbindungen; ausgeliehene werden bei Rückgabe geschlossen."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            try:
+                conn.close()
+            except Error:
+                pass
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"size": self._size, "idle": len(self._idle), "max_size": self.max_size}
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Gibt den prozessweiten Pool zurück und legt ihn beim ersten Zugriff an."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def close_pool() -> None:
+    """Schließt den Pool beim Herunterfahren."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
 # ------------------------------------------------------------
 # Verbindung zur Datenbank
 # ------------------------------------------------------------
-def get_connection():
-    """Gibt eine MySQL/MariaDB-Verbindung zurück"""
-    return mysql.connector.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASS,
-        database=DB_NAME,
-        auth_plugin="mysql_native_password"
-    )
+def get_connection() -> PooledConnection:
+    """
+    Leiht eine MySQL/MariaDB-Verbindung aus dem Pool.
+    conn.close() gibt sie an den Pool zurück, statt sie zu schließen.
+    """
+    return get_pool().acquire()
 
 # ------------------------------------------------------------
 # Setup & Migration der Tabellen
@@ -72,6 +284,53 @@ def setup_database():
         )
     """)
 
+    # Antispam-Schwellen pro Guild (Standardwerte siehe utils/spam_rules.SpamRules)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS antispam_settings (
+            guild_id VARCHAR(20) PRIMARY KEY,
+            enabled BOOLEAN NOT NULL DEFAULT TRUE,
+            window_seconds INT NOT NULL DEFAULT 2,
+            max_messages INT NOT NULL DEFAULT 5,
+            max_duplicates INT NOT NULL DEFAULT 2,
+            max_channels INT NOT NULL DEFAULT 2,
+            max_mentions INT NOT NULL DEFAULT 8,
+            max_links INT NOT NULL DEFAULT 4,
+            timeout_minutes INT NOT NULL DEFAULT 1440
+        )
+    """)
+
+    # Aufgelöste Song.link-Anfragen (utils/songlink.py), inklusive fehlgeschlagener mit kurzer Laufzeit
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS songlink_cache (
+            url_hash CHAR(64) PRIMARY KEY,
+            source_url VARCHAR(512) NOT NULL,
+            payload TEXT NOT NULL,
+            expires_at DATETIME NOT NULL,
+            INDEX idx_songlink_expires (expires_at)
+        )
+    """)
+
+    # ------------------------------------------------------------
+    # Migration: Mitglieder, die den Server verlassen haben, aus Bestenlisten ausschließen
+    # ------------------------------------------------------------
+    cursor.execute("""
+        SELECT COLUMN_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'user'
+    """)
+    user_columns = {row[0] for row in cursor.fetchall()}
+    if user_columns and "departed" not in user_columns:
+        cursor.execute("ALTER TABLE user ADD COLUMN departed BOOLEAN NOT NULL DEFAULT FALSE")
+
+    # ------------------------------------------------------------
+    # Migration: Antispam-Schwellen sind erlaubte Höchstwerte (Regel greift erst darüber)
+    # ------------------------------------------------------------
+    cursor.execute("""
+        ALTER TABLE antispam_settings
+            ALTER COLUMN max_messages SET DEFAULT 5,
+            ALTER COLUMN max_duplicates SET DEFAULT 2,
+            ALTER COLUMN max_channels SET DEFAULT 2
+    """)
+
     conn.commit()
     cursor.close()
     conn.close()
@@ -1,5 +1,6 @@
 # utils/database/counter.py
 from .connection import get_connection
+from typing import Dict, List, Tuple
 
 def add_new_counter(guild_id: str, word: str) -> bool:
     """
@@ -27,27 +28,48 @@ def add_new_counter(guild_id: str, word: str) -> bool:
         cursor.close()
         conn.close()
 
-def increment_all_matches(guild_id: str, message_content: str):
+def get_counter_words(guild_id: str) -> List[str]:
+    """Gibt alle für die Guild registrierten Wörter zurück (für den Wort-Automaten)."""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT word FROM word_counters WHERE guild_id = %s", (guild_id,))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
+
+# Maximale Anzahl Wörter pro UPDATE
+WORD_FLUSH_CHUNK_SIZE = 500
+
+def flush_word_counts(rows: List[Tuple[str, str, int]]) -> None:
     """
-    Prüft den Inhalt einer Nachricht auf alle für die Guild registrierten Wörter.
-    Erhöht den Zähler für jedes gefundene Wort.
+    Schreibt gepufferte Treffer gebündelt in word_counters.
+    rows: Liste aus (guild_id, wort, anzahl). Pro Guild und Chunk ein UPDATE mit CASE;
+    inzwischen gelöschte Wörter werden dabei nicht wieder angelegt.
     """
+    per_guild: Dict[str, List[Tuple[str, int]]] = {}
+    for guild_id, word, amount in rows:
+        per_guild.setdefault(guild_id, []).append((word, amount))
+    if not per_guild:
+        return
+
     conn = get_connection()
     try:
         cursor = conn.cursor()
-        # Alle registrierten Wörter für diesen Server abrufen
-        cursor.execute("SELECT word FROM word_counters WHERE guild_id = %s", (guild_id,))
-        registered_words = [row[0] for row in cursor.fetchall()]
-        
-        content_lower = message_content.lower()
-        
-        for word in registered_words:
-            # Wir prüfen, ob das Wort im Text vorkommt (Case-Insensitive)
-            if word.lower() in content_lower:
-                cursor.execute(
-                    "UPDATE word_counters SET count = count + 1 WHERE guild_id = %s AND word = %s",
-                    (guild_id, word)
-                )
+        for guild_id, entries in per_guild.items():
+            for start in range(0, len(entries), WORD_FLUSH_CHUNK_SIZE):
+                chunk = entries[start:start + WORD_FLUSH_CHUNK_SIZE]
+                cases = " ".join(["WHEN %s THEN %s"] * len(chunk))
+                placeholders = ", ".join(["%s"] * len(chunk))
+                params = [value for entry in chunk for value in entry]
+                params.append(guild_id)
+                params.extend(word for word, _ in chunk)
+                cursor.execute(f"""
+                    UPDATE word_counters
+                    SET count = count + CASE word {cases} ELSE 0 END
+                    WHERE guild_id = %s AND word IN ({placeholders})
+                """, params)
         conn.commit()
     finally:
         cursor.close()
@@ -1,6 +1,6 @@
 # utils/database/custom_commands.py
 from utils.database import connection as db
-from typing import Optional, Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
 # ------------------------------------------------------------
 # Custom Command hinzufügen oder aktualisieren
@@ -19,28 +19,6 @@ def add_command(guild_id: str, command_name: str, response: str):
         cursor.close()
         conn.close()
 
-# ------------------------------------------------------------
-# Einzelnen Custom Command abrufen
-# ------------------------------------------------------------
-def get_command(guild_id: str, command_name: str) -> Optional[Dict[str, Any]]:
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    result = None
-    try:
-        cursor.execute("""
-            SELECT command_name, response
-            FROM custom_commands
-            WHERE guild_id = %s AND command_name = %s
-        """, (guild_id, command_name))
-        row = cursor.fetchone()
-        if row:
-            # Key-Namen an Template & Bot anpassen
-            result = {"name": row[0], "response": row[1]}
-    finally:
-        cursor.close()
-        conn.close()
-    return result
-
 # ------------------------------------------------------------
 # Custom Command entfernen
 # ------------------------------------------------------------
@@ -79,3 +57,19 @@ def get_all_commands(guild_id: str) -> List[Dict[str, Any]]:
         cursor.close()
         conn.close()
     return results
+
+# ------------------------------------------------------------
+# Alle Commands aller Server abrufen (Start des Bots)
+# ------------------------------------------------------------
+def get_all_guild_commands() -> List[Tuple[str, str, str]]:
+    """Gibt alle Custom Commands als (guild_id, command_name, response) zurück."""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    results = []
+    try:
+        cursor.execute("SELECT guild_id, command_name, response FROM custom_commands")
+        results = [(str(row[0]), row[1], row[2]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
+    return results
@@ -0,0 +1,52 @@
+# utils/database/executor.py
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .connection import DB_POOL_SIZE
+
+T = TypeVar("T")
+
+# Standardmäßig genau so viele Worker wie Pool-Verbindungen, damit kein Thread auf eine Verbindung wartet
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", DB_POOL_SIZE))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# ------------------------------------------------------------
+# Thread-Pool für blockierende Datenbankaufrufe
+# ------------------------------------------------------------
+def get_executor() -> ThreadPoolExecutor:
+    """Gibt den begrenzten Thread-Pool für Datenbankzugriffe zurück."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, DB_EXECUTOR_WORKERS),
+                    thread_name_prefix="db"
+                )
+    return _executor
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Führt eine synchrone Datenbankfunktion im DB-Thread-Pool aus,
+    damit der Event-Loop nie auf MySQL-I/O blockiert.
+
+    Beispiel: prefix = await run_db(db_guilds.get_prefix, guild_id)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executor() -> None:
+    """Wartet auf laufende Datenbankaufrufe und beendet den Thread-Pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
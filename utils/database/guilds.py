@@ -1,21 +1,146 @@
 import datetime
+import os
+from dataclasses import dataclass
 from utils.database import connection as db
-from typing import Optional, List, Tuple
+from utils.database.executor import run_db
+from utils.cache import TTLCache
+from typing import Dict, Iterable, Optional, List, Tuple
+
+DEFAULT_PREFIX = "!"
+
+# Gilden-Einstellungen ändern sich selten; Setter invalidieren den Cache sofort
+GUILD_SETTINGS_CACHE_TTL = float(os.getenv("GUILD_SETTINGS_CACHE_TTL", 600))
+GUILD_SETTINGS_CACHE_SIZE = int(os.getenv("GUILD_SETTINGS_CACHE_SIZE", 10000))
 
 # ------------------------------------------------------------
-# Präfix setzen/abrufen
+# Gilden-Einstellungen (gecacht)
 # ------------------------------------------------------------
-def get_prefix(guild_id: str) -> Optional[str]:
+@dataclass(slots=True)
+class GuildSettings:
+    """
+    Eine Zeile aus guild_settings inkl. der Post-Channels aus guild_post_channels.
+    Kanal- und Rollen-IDs als Strings, None wenn nicht gesetzt.
+    """
+    guild_id: str
+    prefix: str = DEFAULT_PREFIX
+    sanctions_channel_id: Optional[str] = None
+    birthday_channel_id: Optional[str] = None
+    bump_reminder_channel_id: Optional[str] = None
+    bumper_role_id: Optional[str] = None
+    dynamic_voice_channel_id: Optional[str] = None
+    welcome_channel_id: Optional[str] = None
+    checkpost_channel_id: Optional[str] = None
+    post_channel_id: Optional[str] = None
+
+    def command_prefixes(self) -> List[str]:
+        """Präfixe für Befehle: der Präfix der Gilde und zusätzlich immer der Standard."""
+        return [self.prefix, DEFAULT_PREFIX] if self.prefix else [DEFAULT_PREFIX]
+
+_settings_cache = TTLCache(GUILD_SETTINGS_CACHE_SIZE, GUILD_SETTINGS_CACHE_TTL)
+
+# Maximale Anzahl Gilden pro Abfrage beim Bulk-Laden
+GUILD_SETTINGS_CHUNK_SIZE = 500
+
+# guild_settings und guild_post_channels in einer Abfrage (FULL OUTER JOIN-Nachbau),
+# damit auch Gilden mit nur einer der beiden Zeilen vollständig geladen werden
+_SETTINGS_QUERY = """
+    SELECT gs.guild_id, gs.prefix, gs.sanction_channel_id, gs.birthday_channel_id,
+           gs.bump_reminder_channel_id, gs.bumper_role_id, gs.dynamic_voice_channel_id,
+           gs.welcome_channel_id, gp.checkpost_channel_id, gp.post_channel_id
+    FROM guild_settings gs
+    LEFT JOIN guild_post_channels gp ON gp.guild_id = gs.guild_id
+    WHERE gs.guild_id IN ({ids})
+    UNION ALL
+    SELECT gp.guild_id, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+           gp.checkpost_channel_id, gp.post_channel_id
+    FROM guild_post_channels gp
+    LEFT JOIN guild_settings gs ON gs.guild_id = gp.guild_id
+    WHERE gs.guild_id IS NULL AND gp.guild_id IN ({ids})
+"""
+
+def _id_or_none(value) -> Optional[str]:
+    return str(value) if value else None
+
+def _row_to_settings(row) -> GuildSettings:
+    return GuildSettings(
+        guild_id=str(row[0]),
+        prefix=row[1] or DEFAULT_PREFIX,
+        sanctions_channel_id=_id_or_none(row[2]),
+        birthday_channel_id=_id_or_none(row[3]),
+        bump_reminder_channel_id=_id_or_none(row[4]),
+        bumper_role_id=_id_or_none(row[5]),
+        dynamic_voice_channel_id=_id_or_none(row[6]),
+        welcome_channel_id=_id_or_none(row[7]),
+        checkpost_channel_id=_id_or_none(row[8]),
+        post_channel_id=_id_or_none(row[9]),
+    )
+
+def _load_settings(guild_ids: List[str]) -> Dict[str, GuildSettings]:
+    """Lädt die Einstellungen mehrerer Gilden, eine Abfrage pro Chunk."""
+    settings: Dict[str, GuildSettings] = {}
+    if not guild_ids:
+        return settings
+
     conn = db.get_connection()
     cursor = conn.cursor()
-    result = None
     try:
-        cursor.execute("SELECT prefix FROM guild_settings WHERE guild_id = %s", (guild_id,))
-        result = cursor.fetchone()
+        for start in range(0, len(guild_ids), GUILD_SETTINGS_CHUNK_SIZE):
+            chunk = guild_ids[start:start + GUILD_SETTINGS_CHUNK_SIZE]
+            ids = ", ".join(["%s"] * len(chunk))
+            cursor.execute(_SETTINGS_QUERY.format(ids=ids), tuple(chunk) * 2)
+            for row in cursor.fetchall():
+                settings[str(row[0])] = _row_to_settings(row)
     finally:
         cursor.close()
         conn.close()
-    return result[0] if result and result[0] else '!'
+    return settings
+
+def load_guild_settings(guild_id: str) -> GuildSettings:
+    """Lädt alle Einstellungen einer Gilde mit einer Abfrage direkt aus der Datenbank (ohne Cache)."""
+    guild_id = str(guild_id)
+    return _load_settings([guild_id]).get(guild_id) or GuildSettings(guild_id=guild_id)
+
+def get_guild_settings(guild_id: str) -> GuildSettings:
+    """Gibt die Einstellungen aus dem Cache zurück und lädt sie bei Bedarf (blockierend)."""
+    guild_id = str(guild_id)
+    return _settings_cache.get_or_load(guild_id, lambda: load_guild_settings(guild_id))
+
+async def fetch_guild_settings(guild_id: str) -> GuildSettings:
+    """
+    Async-Variante für Hot Paths: Ein Cache-Treffer ist ein reiner Dictionary-Zugriff,
+    nur bei einem Fehlschlag wird im DB-Thread-Pool geladen.
+    """
+    settings = _settings_cache.get(str(guild_id))
+    if settings is not None:
+        return settings
+    return await run_db(get_guild_settings, guild_id)
+
+def get_settings_for_guilds(guild_ids: Iterable[str]) -> Dict[str, GuildSettings]:
+    """
+    Gibt die Einstellungen mehrerer Gilden zurück (z.B. für cog_load beim Start).
+    Fehlende Einträge werden gebündelt geladen und landen im Cache.
+    """
+    def loader(missing: List[str]) -> Dict[str, GuildSettings]:
+        loaded = _load_settings(missing)
+        # Gilden ohne Einträge bekommen Standardwerte, damit sie nicht erneut abgefragt werden
+        for guild_id in missing:
+            loaded.setdefault(guild_id, GuildSettings(guild_id=guild_id))
+        return loaded
+
+    return _settings_cache.get_or_load_many([str(g) for g in guild_ids], loader)
+
+def invalidate_guild_settings(guild_id: Optional[str] = None) -> None:
+    """Verwirft die gecachten Einstellungen einer Gilde (oder aller Gilden bei None)."""
+    if guild_id is None:
+        _settings_cache.clear()
+    else:
+        _settings_cache.invalidate(str(guild_id))
+
+# ------------------------------------------------------------
+# Präfix setzen/abrufen
+# ------------------------------------------------------------
+def get_prefix(guild_id: str) -> Optional[str]:
+    return get_guild_settings(guild_id).prefix
 
 def set_prefix(guild_id: str, prefix: str) -> None:
     if not prefix:
@@ -32,21 +157,13 @@ def set_prefix(guild_id: str, prefix: str) -> None:
     finally:
         cursor.close()
         conn.close()
+    invalidate_guild_settings(guild_id)
 
 # ------------------------------------------------------------
 # Sanctions/Mod-Log Channel
 # ------------------------------------------------------------
 def get_sanctions_channel(guild_id: str) -> Optional[str]:
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    result = None
-    try:
-        cursor.execute("SELECT sanction_channel_id FROM guild_settings WHERE guild_id = %s", (guild_id,))
-        result = cursor.fetchone()
-    finally:
-        cursor.close()
-        conn.close()
-    return result[0] if result else None
+    return get_guild_settings(guild_id).sanctions_channel_id
 
 def set_sanctions_channel(guild_id: str, channel_id: str | None) -> None:
     if channel_id is None:
@@ -63,21 +180,13 @@ def set_sanctions_channel(guild_id: str, channel_id: str | None) -> None:
     finally:
         cursor.close()
         conn.close()
+    invalidate_guild_settings(guild_id)
 
 # ------------------------------------------------------------
 # Birthday Channel
 # ------------------------------------------------------------
 def get_birthday_channel(guild_id: str) -> Optional[str]:
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    result = None
-    try:
-        cursor.execute("SELECT birthday_channel_id FROM guild_settings WHERE guild_id = %s", (guild_id,))
-        result = cursor.fetchone()
-    finally:
-        cursor.close()
-        conn.close()
-    return result[0] if result else None
+    return get_guild_settings(guild_id).birthday_channel_id
 
 def set_birthday_channel(guild_id: str, channel_id: str | None) -> None:
     if channel_id is None:
@@ -94,21 +203,13 @@ def set_birthday_channel(guild_id: str, channel_id: str | None) -> None:
     finally:
         cursor.close()
         conn.close()
+    invalidate_guild_settings(guild_id)
 
 # ------------------------------------------------------------
 # Bump Reminder Channel
 # ------------------------------------------------------------
 def get_bump_reminder_channel(guild_id: str) -> Optional[str]:
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    result = None
-    try:
-        cursor.execute("SELECT bump_reminder_channel_id FROM guild_settings WHERE guild_id = %s", (guild_id,))
-        result = cursor.fetchone()
-    finally:
-        cursor.close()
-        conn.close()
-    return result[0] if result else None
+    return get_guild_settings(guild_id).bump_reminder_channel_id
 
 def set_bump_reminder_channel(guild_id: str, channel_id: str | None) -> None:
     if channel_id is None:
@@ -125,6 +226,7 @@ def set_bump_reminder_channel(guild_id: str, channel_id: str | None) -> None:
     finally:
         cursor.close()
         conn.close()
+    invalidate_guild_settings(guild_id)
 
 def get_all_bump_settings() -> list[tuple[str, str, str]]:
     conn = db.get_connection()
@@ -146,16 +248,7 @@ def get_all_bump_settings() -> list[tuple[str, str, str]]:
 # Bumper Rolle
 # ------------------------------------------------------------
 def get_bumper_role(guild_id: str) -> Optional[str]:
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    result = None
-    try:
-        cursor.execute("SELECT bumper_role_id FROM guild_settings WHERE guild_id = %s", (guild_id,))
-        result = cursor.fetchone()
-    finally:
-        cursor.close()
-        conn.close()
-    return result[0] if result else None
+    return get_guild_settings(guild_id).bumper_role_id
 
 def set_bumper_role(guild_id: str, role_id: str | None) -> None:
     if role_id is None:
@@ -172,21 +265,13 @@ def set_bumper_role(guild_id: str, role_id: str | None) -> None:
     finally:
         cursor.close()
         conn.close()
+    invalidate_guild_settings(guild_id)
 
 # ------------------------------------------------------------
 # Dynamic Voice Channel
 # ------------------------------------------------------------
 def get_dynamic_voice_channel(guild_id: str) -> Optional[str]:
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    result = None
-    try:
-        cursor.execute("SELECT dynamic_voice_channel_id FROM guild_settings WHERE guild_id = %s", (guild_id,))
-        result = cursor.fetchone()
-    finally:
-        cursor.close()
-        conn.close()
-    return result[0] if result else None
+    return get_guild_settings(guild_id).dynamic_voice_channel_id
 
 def set_dynamic_voice_channel(guild_id: str, channel_id: str | None) -> None:
     if channel_id is None:
@@ -203,21 +288,13 @@ def set_dynamic_voice_channel(guild_id: str, channel_id: str | None) -> None:
     finally:
         cursor.close()
         conn.close()
+    invalidate_guild_settings(guild_id)
 
 # ------------------------------------------------------------
 # Post Channels
 # ------------------------------------------------------------
 def get_checkpost_channel(guild_id: str) -> Optional[str]:
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    result = None
-    try:
-        cursor.execute("SELECT checkpost_channel_id FROM guild_post_channels WHERE guild_id = %s", (guild_id,))
-        result = cursor.fetchone()
-    finally:
-        cursor.close()
-        conn.close()
-    return result[0] if result else None
+    return get_guild_settings(guild_id).checkpost_channel_id
 
 def set_checkpost_channel(guild_id: str, channel_id: str | None) -> None:
     if channel_id is None:
@@ -234,18 +311,10 @@ def set_checkpost_channel(guild_id: str, channel_id: str | None) -> None:
     finally:
         cursor.close()
         conn.close()
+    invalidate_guild_settings(guild_id)
 
 def get_post_channel(guild_id: str) -> Optional[str]:
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    result = None
-    try:
-        cursor.execute("SELECT post_channel_id FROM guild_post_channels WHERE guild_id = %s", (guild_id,))
-        result = cursor.fetchone()
-    finally:
-        cursor.close()
-        conn.close()
-    return result[0] if result else None
+    return get_guild_settings(guild_id).post_channel_id
 
 def set_post_channel(guild_id: str, channel_id: str | None) -> None:
     if channel_id is None:
@@ -262,3 +331,4 @@ def set_post_channel(guild_id: str, channel_id: str | None) -> None:
     finally:
         cursor.close()
         conn.close()
+    invalidate_guild_settings(guild_id)
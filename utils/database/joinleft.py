@@ -1,5 +1,6 @@
 import mysql.connector
 from utils.database.connection import get_connection
+from utils.database.guilds import get_guild_settings, invalidate_guild_settings
 
 
 def set_welcome_channel(guild_id: str, channel_id: str | None):
@@ -8,28 +9,22 @@ def set_welcome_channel(guild_id: str, channel_id: str | None):
     """
     conn = get_connection()
     cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO guild_settings (guild_id, welcome_channel_id)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE welcome_channel_id = VALUES(welcome_channel_id)
+        """, (guild_id, channel_id))
 
-    cursor.execute("""
-        INSERT INTO guild_settings (guild_id, welcome_channel_id)
-        VALUES (%s, %s)
-        ON DUPLICATE KEY UPDATE welcome_channel_id = VALUES(welcome_channel_id)
-    """, (guild_id, channel_id))
-
-    conn.commit()
-    cursor.close()
-    conn.close()
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    invalidate_guild_settings(guild_id)
 
 
 def get_welcome_channel(guild_id: str) -> str | None:
     """
     Gibt die gespeicherte Welcome-Channel-ID aus guild_settings zurück, falls vorhanden.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT welcome_channel_id FROM guild_settings WHERE guild_id = %s", (guild_id,))
-    result = cursor.fetchone()
-
-    cursor.close()
-    conn.close()
-    return result[0] if result and result[0] else None
+    return get_guild_settings(guild_id).welcome_channel_id
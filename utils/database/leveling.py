@@ -1,5 +1,7 @@
 # utils/database/leveling.py
 import math
+from .connection import get_connection
+from typing import Optional, List, Tuple
 
 # ------------------------------------------------------------
 # Levelsystem Funktionen
@@ -20,3 +22,93 @@ def berechne_level_und_rest(counter: int):
     next_level_threshold = (level + 1) ** 2
     rest = max(0, next_level_threshold - counter)
     return level, rest
+
+# ------------------------------------------------------------
+# Datenbankzugriffe für das Levelsystem (user-Tabelle)
+# ------------------------------------------------------------
+
+# Maximale Anzahl Zeilen pro INSERT, damit einzelne Statements klein bleiben
+XP_FLUSH_CHUNK_SIZE = 500
+
+def flush_message_xp(rows: List[Tuple[str, str, int, str]]) -> None:
+    """
+    Schreibt gepufferte Nachrichten-XP gebündelt in die user-Tabelle.
+    rows: Liste aus (guild_id, user_id, anzahl, name).
+    Pro Chunk wird ein mehrzeiliges INSERT ... ON DUPLICATE KEY UPDATE ausgeführt,
+    das Level wird dabei aus dem neuen Zählerstand berechnet (floor(sqrt(counter))).
+    """
+    if not rows:
+        return
+
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        for start in range(0, len(rows), XP_FLUSH_CHUNK_SIZE):
+            chunk = rows[start:start + XP_FLUSH_CHUNK_SIZE]
+            placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(chunk))
+            params = []
+            for guild_id, user_id, amount, name in chunk:
+                params.extend((guild_id, user_id, name, amount, int(math.sqrt(amount))))
+
+            cur.execute(f"""
+                INSERT INTO user (guild_id, id, name, counter, level)
+                VALUES {placeholders}
+                ON DUPLICATE KEY UPDATE
+                    counter = counter + VALUES(counter),
+                    level = FLOOR(SQRT(counter)),
+                    name = VALUES(name)
+            """, params)
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def get_user_stats(user_id: str, guild_id: str) -> Optional[Tuple[int, int]]:
+    """Gibt (counter, level) eines Users in der Gilde zurück oder None."""
+    conn = get_connection()
+    cur = conn.cursor()
+    result = None
+    try:
+        cur.execute("SELECT counter, level FROM user WHERE id = %s AND guild_id = %s", (user_id, guild_id))
+        result = cur.fetchone()
+    finally:
+        cur.close()
+        conn.close()
+    return (int(result[0]), int(result[1])) if result else None
+
+
+def get_all_counters() -> List[Tuple[str, str, int]]:
+    """
+    Gibt alle Zählerstände als (guild_id, id, counter) zurück, zum Aufbau der
+    Ranglisten beim Start. Als ausgetreten markierte User (departed) fehlen.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    results = []
+    try:
+        cur.execute("SELECT guild_id, id, counter FROM user WHERE departed = FALSE")
+        results = cur.fetchall()
+    finally:
+        cur.close()
+        conn.close()
+    return [(str(guild_id), str(uid), int(counter)) for guild_id, uid, counter in results]
+
+
+def set_users_departed(guild_id: str, user_ids: List[str], departed: bool = True) -> None:
+    """Markiert User einer Gilde als ausgetreten (oder wieder beigetreten)."""
+    if not user_ids:
+        return
+
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        cur.execute(
+            f"UPDATE user SET departed = %s WHERE guild_id = %s AND id IN ({placeholders})",
+            (departed, guild_id, *user_ids)
+        )
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
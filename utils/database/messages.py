@@ -28,6 +28,41 @@ def log_channel_activity(channel_id: str, guild_id: str, user_id: str) -> None:
         cur.close()
         conn.close()
 
+# Maximale Anzahl Zeilen pro INSERT beim gebündelten Schreiben
+ACTIVITY_FLUSH_CHUNK_SIZE = 500
+
+def log_channel_activity_bulk(rows: List[Tuple[str, str, str, int]]) -> None:
+    """
+    Schreibt gepufferte Kanalaktivität gebündelt.
+    rows: Liste aus (guild_id, channel_id, user_id, anzahl), pro Chunk ein mehrzeiliger UPSERT.
+    """
+    if not rows:
+        return
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    try:
+        for start in range(0, len(rows), ACTIVITY_FLUSH_CHUNK_SIZE):
+            chunk = rows[start:start + ACTIVITY_FLUSH_CHUNK_SIZE]
+            placeholders = ", ".join(["(%s, %s, %s, %s)"] * len(chunk))
+            params = []
+            for guild_id, channel_id, user_id, amount in chunk:
+                params.extend((guild_id, user_id, channel_id, amount))
+
+            cur.execute(f"""
+                INSERT INTO messages (guild_id, user_id, channel_id, action_count)
+                VALUES {placeholders}
+                ON DUPLICATE KEY UPDATE 
+                    action_count = action_count + VALUES(action_count),
+                    last_action = CURRENT_TIMESTAMP
+            """, params)
+
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
 # ------------------------------------------------------------
 # Nachrichten loggen
 # ------------------------------------------------------------
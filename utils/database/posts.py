@@ -1,5 +1,6 @@
 # utils/database/posts.py
 from .connection import get_connection
+from .guilds import get_guild_settings, invalidate_guild_settings
 
 # -----------------------------
 # Post-Funktionen
@@ -9,24 +10,28 @@ def add_post(guild_id: str, author_id: str, name: str, content: str, link: str)
     """Fügt einen neuen Post ein und gibt die post_id zurück."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO posts (guild_id, author_id, name, content, link)
-        VALUES (%s, %s, %s, %s, %s)
-    """, (guild_id, author_id, name, content, link))
-    conn.commit()
-    post_id = cursor.lastrowid
-    cursor.close()
-    conn.close()
+    try:
+        cursor.execute("""
+            INSERT INTO posts (guild_id, author_id, name, content, link)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (guild_id, author_id, name, content, link))
+        conn.commit()
+        post_id = cursor.lastrowid
+    finally:
+        cursor.close()
+        conn.close()
     return post_id
 
 def get_post(post_id: int) -> dict | None:
     """Gibt einen Post anhand der ID zurück."""
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM posts WHERE post_id = %s", (post_id,))
-    post = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    try:
+        cursor.execute("SELECT * FROM posts WHERE post_id = %s", (post_id,))
+        post = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
     return post
 
 def set_post_status(post_id: int, status: str) -> None:
@@ -35,19 +40,23 @@ def set_post_status(post_id: int, status: str) -> None:
         raise ValueError("Status muss 'pending', 'approved' oder 'denied' sein.")
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("UPDATE posts SET status = %s WHERE post_id = %s", (status, post_id))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    try:
+        cursor.execute("UPDATE posts SET status = %s WHERE post_id = %s", (status, post_id))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
 
 def get_pending_posts(guild_id: str) -> list[dict]:
     """Gibt alle pending-Posts für eine Guild zurück."""
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM posts WHERE guild_id = %s AND status = 'pending'", (guild_id,))
-    posts = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    try:
+        cursor.execute("SELECT * FROM posts WHERE guild_id = %s AND status = 'pending'", (guild_id,))
+        posts = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
     return posts
 
 # -----------------------------
@@ -58,44 +67,38 @@ def set_check_channel(guild_id: str, channel_id: str | None) -> None:
     """Setzt den Channel für Checkposts."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO guild_post_channels (guild_id, checkpost_channel_id)
-        VALUES (%s, %s)
-        ON DUPLICATE KEY UPDATE checkpost_channel_id = VALUES(checkpost_channel_id)
-    """, (guild_id, channel_id))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    try:
+        cursor.execute("""
+            INSERT INTO guild_post_channels (guild_id, checkpost_channel_id)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE checkpost_channel_id = VALUES(checkpost_channel_id)
+        """, (guild_id, channel_id))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    invalidate_guild_settings(guild_id)
 
 def get_check_channel(guild_id: str) -> str | None:
     """Gibt die Checkpost-Channel-ID zurück."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT checkpost_channel_id FROM guild_post_channels WHERE guild_id = %s", (guild_id,))
-    result = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    return result[0] if result and result[0] else None
+    return get_guild_settings(guild_id).checkpost_channel_id
 
 def set_post_channel(guild_id: str, channel_id: str | None) -> None:
     """Setzt den Channel für genehmigte Posts."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO guild_post_channels (guild_id, post_channel_id)
-        VALUES (%s, %s)
-        ON DUPLICATE KEY UPDATE post_channel_id = VALUES(post_channel_id)
-    """, (guild_id, channel_id))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    try:
+        cursor.execute("""
+            INSERT INTO guild_post_channels (guild_id, post_channel_id)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE post_channel_id = VALUES(post_channel_id)
+        """, (guild_id, channel_id))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    invalidate_guild_settings(guild_id)
 
 def get_post_channel(guild_id: str) -> str | None:
     """Gibt die Post-Channel-ID zurück."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT post_channel_id FROM guild_post_channels WHERE guild_id = %s", (guild_id,))
-    result = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    return result[0] if result and result[0] else None
+    return get_guild_settings(guild_id).post_channel_id
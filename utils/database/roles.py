@@ -1,5 +1,6 @@
 # utils/database/roles.py
 from .connection import get_connection
+from .guilds import invalidate_guild_settings
 from typing import Optional, Any, List, Tuple
 
 # ------------------------------------------------------------
@@ -22,6 +23,7 @@ def set_bumper_role(guild_id: str, role_id: Optional[str]) -> None:
     finally:
         cur.close()
         conn.close()
+    invalidate_guild_settings(guild_id)
 
 # ------------------------------------------------------------
 # Bumper Rolle abrufen
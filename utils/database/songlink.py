@@ -0,0 +1,61 @@
+# utils/database/songlink.py
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from .connection import get_connection
+
+# ------------------------------------------------------------
+# Persistenter Song.link-Cache (überlebt Neustarts)
+# ------------------------------------------------------------
+def _url_key(url: str) -> str:
+    # Kanonische URLs können lang sein; als Primärschlüssel dient ihr SHA-256
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+def get_song_link(url: str) -> Optional[Tuple[Dict[str, Any], int]]:
+    """
+    Gibt (gespeicherte Daten, Restlaufzeit in Sekunden) für eine kanonische URL zurück,
+    oder None, wenn nichts (mehr Gültiges) gespeichert ist.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT payload, TIMESTAMPDIFF(SECOND, UTC_TIMESTAMP(), expires_at)
+            FROM songlink_cache
+            WHERE url_hash = %s AND expires_at > UTC_TIMESTAMP()
+        """, (_url_key(url),))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    if not row:
+        return None
+    return json.loads(row[0]), int(row[1])
+
+def save_song_link(url: str, payload: Dict[str, Any], ttl_seconds: int) -> None:
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO songlink_cache (url_hash, source_url, payload, expires_at)
+            VALUES (%s, %s, %s, DATE_ADD(UTC_TIMESTAMP(), INTERVAL %s SECOND))
+            ON DUPLICATE KEY UPDATE payload = VALUES(payload), expires_at = VALUES(expires_at)
+        """, (_url_key(url), url[:512], json.dumps(payload), int(ttl_seconds)))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+def delete_expired_song_links() -> int:
+    """Entfernt abgelaufene Einträge und gibt ihre Anzahl zurück."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM songlink_cache WHERE expires_at <= UTC_TIMESTAMP()")
+        deleted = cursor.rowcount
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    return deleted
@@ -1,6 +1,6 @@
 # utils/database/users.py
 from .connection import get_connection
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Dict
 
 # ------------------------------------------------------------
 # User/Leveling Funktionen (KORRIGIERT)
@@ -115,4 +115,49 @@ def get_max_members(guild_id: str) -> Union[str, int]:
         conn.close()
         
     # Rückgabe als Integer oder String "0" (wie ursprünglich gewünscht)
-    return str(result[0]) if result else "0"
\ No newline at end of file
+    return str(result[0]) if result else "0"
+
+# ------------------------------------------------------------
+# Gespeicherte Daten eines Users (für /selfinfo)
+# ------------------------------------------------------------
+
+def get_selfinfo_data(user_id: str, guild_id: str) -> Dict[str, Optional[dict]]:
+    """
+    Sammelt Level, Geburtstag, Verwarnungen und Quiz-Ergebnis eines Users
+    über eine einzige Verbindung. Die Werte sind Dictionaries (Spaltenname -> Wert) oder None.
+    """
+    conn = get_connection()
+    cur = conn.cursor(dictionary=True)
+    data: Dict[str, Optional[dict]] = {}
+    try:
+        cur.execute("""
+            SELECT level, counter
+            FROM user
+            WHERE id = %s AND guild_id = %s
+        """, (user_id, guild_id))
+        data["level"] = cur.fetchone()
+
+        cur.execute("""
+            SELECT birthday
+            FROM birthdays
+            WHERE user_id = %s AND guild_id = %s
+        """, (user_id, guild_id))
+        data["birthday"] = cur.fetchone()
+
+        cur.execute("""
+            SELECT COUNT(*) AS count
+            FROM warns
+            WHERE user_id = %s AND guild_id = %s
+        """, (user_id, guild_id))
+        data["warns"] = cur.fetchone()
+
+        cur.execute("""
+            SELECT score, date_played
+            FROM quiz_results
+            WHERE user_id = %s AND guild_id = %s
+        """, (user_id, guild_id))
+        data["quiz"] = cur.fetchone()
+    finally:
+        cur.close()
+        conn.close()
+    return data
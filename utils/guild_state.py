@@ -0,0 +1,191 @@
+# utils/guild_state.py
+"""
+Gilden-Zustand des Bots (Name, Icon, Channels, Rollen) für das Dashboard.
+
+Bot-Seite (GuildStateFeed): jede Änderung an einer Gilde erhöht eine Versionsnummer.
+Die interne API liefert unter /api/state per Long-Poll die seit einer Version
+geänderten Gilden (oder alle, wenn der Aufrufer noch keinen Stand hat).
+
+Dashboard-Seite (GuildStateSnapshot): ein Hintergrund-Task hält eine lokale Kopie
+über diesen Long-Poll aktuell. Seitenaufrufe lesen nur die Kopie und warten nie auf
+den Bot; ist der Bot weg (z.B. Neustart), bleibt der letzte Stand sichtbar, bis
+wieder frische Daten kommen.
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Dict, KeysView, List, Optional
+
+import discord
+import httpx
+
+from utils.http_clients import get_client
+
+# Maximale Wartezeit einer Long-Poll-Anfrage und Abstand der vollständigen Abgleiche
+GUILD_STATE_POLL_TIMEOUT = float(os.getenv("GUILD_STATE_POLL_TIMEOUT", 25))
+GUILD_STATE_FULL_REFRESH = float(os.getenv("GUILD_STATE_FULL_REFRESH", 300))
+GUILD_STATE_MAX_BACKOFF = float(os.getenv("GUILD_STATE_MAX_BACKOFF", 30))
+
+def guild_details(guild: discord.Guild) -> Dict[str, Any]:
+    """Die Gilden-Daten, die das Dashboard anzeigt (Format wie /api/guild/{id})."""
+    return {
+        "id": str(guild.id),
+        "name": guild.name,
+        "icon": str(guild.icon.url) if guild.icon else None,
+        "owner_id": str(guild.owner_id),
+        # Filtern für Text- und Voice-Channels ist hier optional, aber beibehalten
+        "text_channels": [{"id": str(c.id), "name": c.name} for c in guild.text_channels],
+        "voice_channels": [{"id": str(c.id), "name": c.name} for c in guild.voice_channels],
+        # Rollen-Filterung beibehalten
+        "roles": [{"id": str(r.id), "name": r.name} for r in guild.roles if not r.managed and r.name != "@everyone"],
+    }
+
+# ------------------------------------------------------------
+# Bot-Seite: Änderungen zählen und Long-Poll bedienen
+# ------------------------------------------------------------
+class GuildStateFeed:
+    def __init__(self):
+        # Neue ID pro Prozess: nach einem Bot-Neustart holt das Dashboard alles neu
+        self.instance = uuid.uuid4().hex
+        self.version = 0
+        # guild_id -> Version der letzten Änderung (auch für verlassene Gilden)
+        self._versions: Dict[str, int] = {}
+        # Wer einen älteren Stand hat, bekommt alles (nach touch() ohne Gilde)
+        self._full_since = 0
+        self._changed = asyncio.Event()
+
+    def touch(self, guild_id: Optional[int] = None) -> None:
+        """Markiert eine Gilde (oder ohne Angabe alle) als geändert und weckt wartende Long-Polls."""
+        self.version += 1
+        if guild_id is not None:
+            self._versions[str(guild_id)] = self.version
+        else:
+            self._versions.clear()
+            self._full_since = self.version
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self, since: int, timeout: float) -> None:
+        """Wartet höchstens timeout Sekunden, bis es Änderungen nach Version since gibt."""
+        changed = self._changed
+        if self.version > since:
+            return
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def changes(self, bot: discord.Client, since: int, instance: str) -> Dict[str, Any]:
+        """Antwort für /api/state: alle Gilden (full) oder nur die seit since geänderten."""
+        ready = bot.is_ready()
+        full = instance != self.instance or since <= 0 or since < self._full_since
+        guilds: Dict[str, Dict[str, Any]] = {}
+        removed: List[str] = []
+
+        if ready and full:
+            guilds = {str(g.id): guild_details(g) for g in bot.guilds}
+        elif ready:
+            for guild_id, version in self._versions.items():
+                if version <= since:
+                    continue
+                guild = bot.get_guild(int(guild_id))
+                if guild is None:
+                    removed.append(guild_id)
+                else:
+                    guilds[guild_id] = guild_details(guild)
+
+        return {
+            "instance": self.instance,
+            "version": self.version,
+            "ready": ready,
+            "full": full,
+            "guilds": guilds,
+            "removed": removed,
+        }
+
+# ------------------------------------------------------------
+# Dashboard-Seite: lokale Kopie im Hintergrund aktuell halten
+# ------------------------------------------------------------
+class GuildStateSnapshot:
+    def __init__(self, client_name: str = "bot_api"):
+        self.client_name = client_name
+        self.guilds: Dict[str, Dict[str, Any]] = {}
+        self.instance = ""
+        self.version = 0
+        # True, sobald einmal ein vollständiger Stand vom bereiten Bot kam
+        self.loaded = False
+        self.bot_ready = False
+        self.updated_at: Optional[float] = None
+        # Zählt jede Änderung an guilds, damit abgeleitete Werte wissen, wann sie neu zu berechnen sind
+        self.revision = 0
+        self._last_full = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def guild_ids(self) -> KeysView[str]:
+        """Die Gilden-IDs als mengenartige Sicht (ohne Kopie)."""
+        return self.guilds.keys()
+
+    def get_guild(self, guild_id: str) -> Optional[Dict[str, Any]]:
+        return self.guilds.get(str(guild_id))
+
+    def apply(self, data: Dict[str, Any]) -> None:
+        self.bot_ready = data["ready"]
+        if not self.bot_ready:
+            # Bot startet gerade: alten Stand weiter anzeigen
+            return
+        if data["full"]:
+            self.guilds = dict(data["guilds"])
+            self._last_full = time.monotonic()
+            self.loaded = True
+            self.revision += 1
+        elif data["guilds"] or data["removed"]:
+            self.guilds.update(data["guilds"])
+            for guild_id in data["removed"]:
+                self.guilds.pop(guild_id, None)
+            self.revision += 1
+        self.instance = data["instance"]
+        self.version = data["version"]
+        self.updated_at = time.time()
+
+    async def poll_once(self) -> None:
+        # Regelmäßig vollständig abgleichen, falls einmal eine Änderung verloren ging
+        since = self.version if self.loaded and time.monotonic() - self._last_full < GUILD_STATE_FULL_REFRESH else 0
+        response = await get_client(self.client_name).get(
+            "/api/state",
+            params={"since": since, "instance": self.instance, "timeout": GUILD_STATE_POLL_TIMEOUT},
+            timeout=GUILD_STATE_POLL_TIMEOUT + 10,
+        )
+        response.raise_for_status()
+        self.apply(response.json())
+
+    async def run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                await self.poll_once()
+            except httpx.HTTPError as e:
+                print(f"[WARN] Bot-Zustand nicht abrufbar, neuer Versuch in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, GUILD_STATE_MAX_BACKOFF)
+                continue
+            except Exception as e:
+                print(f"[ERROR] Bot-Zustand konnte nicht verarbeitet werden: {e}")
+                await asyncio.sleep(GUILD_STATE_MAX_BACKOFF)
+                continue
+            backoff = 1.0
+            if not self.bot_ready:
+                await asyncio.sleep(3)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,99 @@
+# utils/http_clients.py
+"""
+Gemeinsame HTTP-Clients für alle ausgehenden Anfragen (Wetter, Songlink, Bot-API).
+
+Statt pro Anfrage einen neuen Client samt TCP/TLS-Handshake aufzubauen, gibt es pro
+Dienst einen langlebigen httpx.AsyncClient mit eigenem Verbindungspool (Keep-Alive,
+Obergrenze pro Ziel-Host). HTTP/2 wird genutzt, wenn das Paket "h2" installiert ist
+(pip install "httpx[http2]"), sonst HTTP/1.1.
+
+Module melden ihren Client beim Import mit register_client() an. Bot und Dashboard
+öffnen die Clients beim Start (open_http_clients) und schließen sie beim Beenden
+(close_http_clients); get_client() öffnet einen Client notfalls beim ersten Zugriff.
+"""
+import os
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import Any, Dict, Optional
+
+import httpx
+
+# Standardwerte pro Client (pro Ziel-Host, da jeder Client genau einen Dienst anspricht)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 10))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 5))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 10))
+
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+# ------------------------------------------------------------
+# Registrierung
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class ClientConfig:
+    base_url: str = ""
+    timeout: float = HTTP_TIMEOUT
+    max_connections: int = HTTP_MAX_CONNECTIONS
+    max_keepalive: int = HTTP_MAX_KEEPALIVE
+    http2: bool = True
+
+    def build(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            http2=self.http2 and HTTP2_AVAILABLE,
+        )
+
+
+_configs: Dict[str, ClientConfig] = {}
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+def register_client(name: str, base_url: str = "", *, timeout: float = HTTP_TIMEOUT,
+                    max_connections: int = HTTP_MAX_CONNECTIONS, max_keepalive: int = HTTP_MAX_KEEPALIVE,
+                    http2: bool = True) -> None:
+    """Meldet einen Client an; ein bereits geöffneter Client bleibt bis zum Schließen bestehen."""
+    _configs[name] = ClientConfig(base_url, timeout, max_connections, max_keepalive, http2)
+
+# ------------------------------------------------------------
+# Zugriff
+# ------------------------------------------------------------
+def get_client(name: str) -> httpx.AsyncClient:
+    """Gibt den gemeinsamen Client zurück. Nicht schließen, nicht in "async with" verwenden."""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        config = _configs.get(name)
+        if config is None:
+            raise KeyError(f"HTTP-Client '{name}' ist nicht registriert.")
+        client = _clients[name] = config.build()
+    return client
+
+def open_http_clients() -> None:
+    """Öffnet alle registrierten Clients (beim Start von Bot bzw. Dashboard)."""
+    for name in _configs:
+        get_client(name)
+
+async def close_http_clients() -> None:
+    """Schließt alle offenen Clients samt ihrer Verbindungen (beim Beenden)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+def get_http_stats() -> Dict[str, Any]:
+    """Konfiguration und Zustand der Clients für /api/metrics."""
+    stats: Dict[str, Any] = {}
+    for name, config in _configs.items():
+        client: Optional[httpx.AsyncClient] = _clients.get(name)
+        stats[name] = {
+            "base_url": config.base_url,
+            "open": client is not None and not client.is_closed,
+            "http2": config.http2 and HTTP2_AVAILABLE,
+            "max_connections": config.max_connections,
+            "max_keepalive": config.max_keepalive,
+        }
+    return stats
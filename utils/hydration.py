@@ -0,0 +1,82 @@
+# utils/hydration.py
+"""
+Startdaten für die Cogs.
+
+main.py ruft hydrate() in on_ready einmal vor dem Laden der Cogs auf: die Einstellungen
+aller Gilden kommen mit einer gebündelten Abfrage (und landen im Gilden-Cache), die
+Einladungen aller Gilden werden parallel geholt (höchstens STARTUP_INVITE_CONCURRENCY
+gleichzeitig). Die Cogs lesen die Ergebnisse in cog_load über get_startup_data(),
+statt pro Gilde selbst Datenbank bzw. Discord-API zu fragen. Nach dem Laden verwirft
+main.py die Daten wieder; ein später (neu) geladener Cog bekommt frische Daten.
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import discord
+from discord.ext import commands
+
+from utils.database import run_db
+from utils.database import guilds as db_guilds
+from utils.database.guilds import GuildSettings
+
+STARTUP_INVITE_CONCURRENCY = max(1, int(os.getenv("STARTUP_INVITE_CONCURRENCY", "5")))
+
+# ------------------------------------------------------------
+# Ergebnis der Startphase
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class StartupData:
+    # guild_id (str) -> Einstellungen
+    settings: Dict[str, GuildSettings] = field(default_factory=dict)
+    # guild.id (int) -> Einladungen; leer, wenn dem Bot die Berechtigung fehlt
+    invites: Dict[int, List[discord.Invite]] = field(default_factory=dict)
+    duration_ms: float = 0.0
+
+# ------------------------------------------------------------
+# Einladungen parallel laden
+# ------------------------------------------------------------
+async def fetch_invites(guilds: Iterable[discord.Guild], concurrency: int = STARTUP_INVITE_CONCURRENCY) -> Dict[int, List[discord.Invite]]:
+    """Holt die Einladungen mehrerer Gilden, höchstens concurrency Anfragen gleichzeitig."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(guild: discord.Guild) -> List[discord.Invite]:
+        async with semaphore:
+            try:
+                return await guild.invites()
+            except discord.Forbidden:
+                return []
+            except discord.HTTPException as e:
+                print(f"[WARN] Einladungen für '{guild.name}' ({guild.id}) konnten nicht geladen werden: {e}")
+                return []
+
+    guilds = list(guilds)
+    results = await asyncio.gather(*(fetch(guild) for guild in guilds))
+    return {guild.id: invites for guild, invites in zip(guilds, results)}
+
+# ------------------------------------------------------------
+# Startphase
+# ------------------------------------------------------------
+async def hydrate(bot: commands.Bot, *, invites: bool = True) -> StartupData:
+    """Lädt Einstellungen und (optional) Einladungen aller Gilden des Bots."""
+    started_at = time.perf_counter()
+    guilds = list(bot.guilds)
+
+    settings, guild_invites = await asyncio.gather(
+        run_db(db_guilds.get_settings_for_guilds, [str(g.id) for g in guilds]),
+        fetch_invites(guilds) if invites else asyncio.sleep(0, {}),
+    )
+
+    return StartupData(settings, guild_invites, (time.perf_counter() - started_at) * 1000)
+
+async def get_startup_data(bot: commands.Bot, *, invites: bool = False) -> StartupData:
+    """
+    Startdaten für cog_load. Außerhalb der Startphase (z.B. beim Neuladen eines Cogs) wird
+    frisch geladen; Einladungen nur, wenn der Cog sie braucht.
+    """
+    data: Optional[StartupData] = getattr(bot, "startup_data", None)
+    if data is None:
+        data = await hydrate(bot, invites=invites)
+    return data
@@ -0,0 +1,165 @@
+# utils/pipeline.py
+"""
+Zentrale Verarbeitung eingehender Nachrichten.
+
+Statt dass jeder Cog einen eigenen on_message-Listener registriert, melden Cogs in
+cog_load eine Stufe an. main.py ruft für jede Nachricht einmal process() auf;
+die Stufen laufen nacheinander in der Reihenfolge ihrer order und teilen sich
+einen MessageContext (Gilden-Einstellungen, Präfix, Befehl ja/nein), der nur
+einmal pro Nachricht ermittelt wird, ohne bot.get_context(). Eine Stufe kann mit ctx.stop() alle
+folgenden Stufen überspringen (z.B. Antispam vor dem XP-System).
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import discord
+from discord.ext import commands
+
+from utils.database import guilds as db_guilds
+from utils.database.guilds import GuildSettings
+
+# ------------------------------------------------------------
+# Kontext pro Nachricht
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class MessageContext:
+    message: discord.Message
+    guild_id: Optional[str] = None
+    settings: Optional[GuildSettings] = None
+    prefix: Optional[str] = None
+    # True, wenn die Nachricht einen registrierten Bot-Befehl aufruft
+    is_command: bool = False
+    stopped: bool = False
+
+    def stop(self) -> None:
+        """Überspringt alle folgenden Stufen für diese Nachricht."""
+        self.stopped = True
+
+
+# Reihenfolge der Stufen (kleiner = früher). Antispam steht vorn, damit verworfene
+# Nachrichten weder XP noch Statistik erzeugen.
+STAGE_ANTISPAM = 10
+STAGE_BUMPS = 20
+STAGE_CUSTOM_COMMANDS = 30
+STAGE_QUOTE = 40
+STAGE_ACTIVITY = 50
+STAGE_COUNTER = 60
+STAGE_LEVELING = 70
+
+# ------------------------------------------------------------
+# Befehlserkennung
+# ------------------------------------------------------------
+def is_command_invocation(bot: commands.Bot, content: str, prefixes: List[str]) -> bool:
+    """
+    Günstiger Ersatz für (await bot.get_context(message)).valid: wie discord.py wird der
+    erste passende Präfix genommen und das Wort direkt dahinter unter den registrierten
+    Befehlen gesucht. Normale Chat-Nachrichten kosten so nur ein paar startswith().
+    """
+    for prefix in prefixes:
+        if content.startswith(prefix):
+            rest = content[len(prefix):]
+            if not rest or rest[0].isspace():
+                return False
+            return rest.split(maxsplit=1)[0] in bot.all_commands
+    return False
+
+
+StageHandler = Callable[[MessageContext], Awaitable[Any]]
+
+@dataclass(slots=True)
+class Stage:
+    name: str
+    handler: StageHandler
+    order: int
+    # Auch Nachrichten von Bots (z.B. Disboard) bzw. aus Direktnachrichten verarbeiten
+    bots: bool = False
+    dms: bool = False
+    count: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+# ------------------------------------------------------------
+# Pipeline
+# ------------------------------------------------------------
+class MessagePipeline:
+    def __init__(self):
+        self._stages: List[Stage] = []
+        self._messages = 0
+        self._stopped = 0
+
+    def register(self, name: str, handler: StageHandler, order: int, *, bots: bool = False, dms: bool = False) -> None:
+        """Meldet eine Stufe an; eine gleichnamige Stufe wird ersetzt (z.B. beim Neuladen eines Cogs)."""
+        self.unregister(name)
+        self._stages.append(Stage(name, handler, order, bots, dms))
+        self._stages.sort(key=lambda stage: stage.order)
+
+    def unregister(self, name: str) -> None:
+        self._stages = [stage for stage in self._stages if stage.name != name]
+
+    async def _build_context(self, bot: commands.Bot, message: discord.Message) -> MessageContext:
+        ctx = MessageContext(message)
+        prefixes = [db_guilds.DEFAULT_PREFIX]
+        if message.guild:
+            ctx.guild_id = str(message.guild.id)
+            try:
+                ctx.settings = await db_guilds.fetch_guild_settings(ctx.guild_id)
+                prefixes = ctx.settings.command_prefixes()
+            except Exception as e:
+                print(f"[ERROR] Gilden-Einstellungen für {ctx.guild_id} konnten nicht geladen werden: {e}")
+        ctx.prefix = prefixes[0]
+        if not message.author.bot:
+            ctx.is_command = is_command_invocation(bot, message.content, prefixes)
+        return ctx
+
+    async def process(self, bot: commands.Bot, message: discord.Message) -> MessageContext:
+        """Führt alle passenden Stufen aus und gibt den Kontext zurück (z.B. für die Befehlsverarbeitung)."""
+        ctx = await self._build_context(bot, message)
+
+        is_bot = message.author.bot
+        is_dm = message.guild is None
+        stages = [s for s in self._stages if (s.bots or not is_bot) and (s.dms or not is_dm)]
+        if not stages:
+            return ctx
+
+        self._messages += 1
+
+        for stage in stages:
+            started_at = time.perf_counter()
+            try:
+                await stage.handler(ctx)
+            except Exception as e:
+                # Eine fehlerhafte Stufe darf die übrigen nicht blockieren
+                stage.errors += 1
+                print(f"[ERROR] Nachrichten-Stufe '{stage.name}' fehlgeschlagen: {e}")
+            finally:
+                elapsed_ms = (time.perf_counter() - started_at) * 1000
+                stage.count += 1
+                stage.total_ms += elapsed_ms
+                stage.max_ms = max(stage.max_ms, elapsed_ms)
+            if ctx.stopped:
+                self._stopped += 1
+                break
+        return ctx
+
+    def stats(self) -> Dict[str, Any]:
+        """Laufzeit pro Stufe in ms, in Ausführungsreihenfolge."""
+        return {
+            "messages": self._messages,
+            "stopped": self._stopped,
+            "stages": [
+                {
+                    "name": stage.name,
+                    "order": stage.order,
+                    "count": stage.count,
+                    "errors": stage.errors,
+                    "avg_ms": round(stage.total_ms / stage.count, 3) if stage.count else 0.0,
+                    "max_ms": round(stage.max_ms, 3),
+                }
+                for stage in self._stages
+            ],
+        }
+
+
+message_pipeline = MessagePipeline()
@@ -0,0 +1,67 @@
+# utils/ranking.py
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ------------------------------------------------------------
+# Rangliste pro Gilde
+# ------------------------------------------------------------
+class GuildRanking:
+    """
+    Rangliste einer Gilde im Speicher, absteigend nach Zählerstand sortiert.
+
+    Intern ein sortiertes Array aus (-counter, user_id): Rang, Top-N und
+    "Nachbarn" sind Binärsuchen bzw. Slices, eine Aktualisierung verschiebt
+    nur den einen Eintrag. Der Rang zählt wie bisher die User mit echt
+    höherem Zähler + 1, gleiche Zähler teilen sich also einen Rang.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, int]] = ()):
+        self._counters: Dict[str, int] = dict(entries)
+        self._order: List[Tuple[int, str]] = sorted((-counter, uid) for uid, counter in self._counters.items())
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._counters
+
+    def get(self, uid: str) -> Optional[int]:
+        return self._counters.get(uid)
+
+    def update(self, uid: str, counter: int) -> None:
+        """Setzt den Zählerstand eines Users und sortiert ihn neu ein."""
+        old = self._counters.get(uid)
+        if old == counter:
+            return
+        if old is not None:
+            del self._order[bisect_left(self._order, (-old, uid))]
+        self._counters[uid] = counter
+        insort(self._order, (-counter, uid))
+
+    def remove(self, uid: str) -> None:
+        old = self._counters.pop(uid, None)
+        if old is not None:
+            del self._order[bisect_left(self._order, (-old, uid))]
+
+    def rank(self, uid: str) -> Optional[int]:
+        """Rang des Users (1 = höchster Zähler) oder None, wenn er nicht gelistet ist."""
+        counter = self._counters.get(uid)
+        if counter is None:
+            return None
+        # (-counter,) sortiert vor allen Einträgen mit genau diesem Zähler
+        return bisect_left(self._order, (-counter,)) + 1
+
+    def top(self, limit: int) -> List[Tuple[str, int]]:
+        """Die limit besten User als (user_id, counter)."""
+        return [(uid, -neg_counter) for neg_counter, uid in self._order[:limit]]
+
+    def around(self, uid: str, radius: int) -> List[Tuple[int, str, int]]:
+        """Bis zu radius User über und unter uid als (rang, user_id, counter)."""
+        counter = self._counters.get(uid)
+        if counter is None:
+            return []
+        index = bisect_left(self._order, (-counter, uid))
+        result = []
+        for neg_counter, other in self._order[max(0, index - radius):index + radius + 1]:
+            result.append((bisect_left(self._order, (neg_counter,)) + 1, other, -neg_counter))
+        return result
@@ -0,0 +1,130 @@
+# utils/render_pool.py
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils import cards
+
+# Anzahl Render-Prozesse, maximale Warteschlange und maximale Wartezeit auf einen freien Slot
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", 2))
+RENDER_MAX_QUEUE = int(os.getenv("RENDER_MAX_QUEUE", 16))
+RENDER_QUEUE_TIMEOUT = float(os.getenv("RENDER_QUEUE_TIMEOUT", 15))
+
+
+class RenderQueueFull(Exception):
+    """Die Render-Warteschlange ist voll oder ein Job hat zu lange auf einen Worker gewartet."""
+
+
+# ------------------------------------------------------------
+# Render-Pool (Prozesse)
+# ------------------------------------------------------------
+class RenderPool:
+    """
+    Führt Bild-Jobs aus utils/cards.py in separaten Prozessen aus, damit PIL den
+    Event-Loop nie blockiert. Gleichzeitig laufen höchstens so viele Jobs wie Worker;
+    weitere warten in einer begrenzten Warteschlange, darüber hinaus wird abgelehnt.
+    """
+
+    def __init__(self, workers: int, max_queue: int, queue_timeout: float):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        # spawn: Worker erben keinen Zustand (Event-Loop, Sockets) vom Bot-Prozess
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=cards.init_worker,
+        )
+        self._slots = asyncio.Semaphore(self.workers)
+        self._waiting = 0
+        self._rejected = 0
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    async def render(self, func: Callable[..., bytes], *args: Any) -> bytes:
+        """Rendert func(*args) in einem Worker-Prozess und gibt die PNG-Bytes zurück."""
+        if self._waiting >= self.max_queue and self._slots.locked():
+            self._rejected += 1
+            raise RenderQueueFull("Render-Warteschlange ist voll.")
+
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise RenderQueueFull("Zeitüberschreitung beim Warten auf einen Render-Worker.")
+        finally:
+            self._waiting -= 1
+
+        started_at = time.perf_counter()
+        failed = False
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._slots.release()
+            self._record(func.__name__, started_at - queued_at, time.perf_counter() - started_at, failed)
+
+    def _record(self, job: str, wait: float, duration: float, failed: bool) -> None:
+        stats = self._stats.setdefault(job, {
+            "count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "total_wait_ms": 0.0, "max_wait_ms": 0.0
+        })
+        stats["count"] += 1
+        stats["errors"] += int(failed)
+        stats["total_ms"] += duration * 1000
+        stats["max_ms"] = max(stats["max_ms"], duration * 1000)
+        stats["total_wait_ms"] += wait * 1000
+        stats["max_wait_ms"] = max(stats["max_wait_ms"], wait * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """Latenz-Kennzahlen pro Job-Typ (Renderzeit und Wartezeit in ms)."""
+        jobs = {}
+        for job, s in self._stats.items():
+            count = s["count"] or 1
+            jobs[job] = {
+                "count": int(s["count"]),
+                "errors": int(s["errors"]),
+                "avg_ms": round(s["total_ms"] / count, 2),
+                "max_ms": round(s["max_ms"], 2),
+                "avg_wait_ms": round(s["total_wait_ms"] / count, 2),
+                "max_wait_ms": round(s["max_wait_ms"], 2),
+            }
+        return {
+            "workers": self.workers,
+            "waiting": self._waiting,
+            "max_queue": self.max_queue,
+            "rejected": self._rejected,
+            "jobs": jobs,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[RenderPool] = None
+
+def get_render_pool() -> RenderPool:
+    """Gibt den gemeinsamen Render-Pool zurück und startet ihn beim ersten Aufruf."""
+    global _pool
+    if _pool is None:
+        _pool = RenderPool(RENDER_WORKERS, RENDER_MAX_QUEUE, RENDER_QUEUE_TIMEOUT)
+    return _pool
+
+async def render(func: Callable[..., bytes], *args: Any) -> bytes:
+    return await get_render_pool().render(func, *args)
+
+def get_render_stats() -> Dict[str, Any]:
+    """Kennzahlen für /api/metrics, ohne den Pool dafür extra zu starten."""
+    return _pool.stats() if _pool is not None else {}
+
+def shutdown_render_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
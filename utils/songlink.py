@@ -0,0 +1,194 @@
+# utils/songlink.py
+"""
+Auflösung von Musik-Links über api.song.link mit zweistufigem Cache.
+
+Schlüssel ist die kanonische Quell-URL (Tracking-Parameter, "www."/"m.", Sprachpfade
+und Fragmente entfernt), sodass derselbe Song aus verschiedenen Shares nur einmal
+aufgelöst wird. Gespeichert wird nur das, was der Cog anzeigt (Links, Titel,
+Künstler, Vorschaubild):
+
+- Speicher: LRU mit Ablaufzeit (SONGLINK_MEMORY_SIZE Einträge)
+- MySQL (Tabelle songlink_cache): überlebt Neustarts
+
+Erfolgreiche Auflösungen gelten SONGLINK_CACHE_TTL, von der API abgelehnte Links
+oder Links ohne Treffer nur SONGLINK_FAILURE_TTL. Netzwerkfehler werden nicht
+gespeichert. Gleichzeitige Anfragen für dieselbe URL teilen sich einen Aufruf.
+"""
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from utils.cache import SingleFlight, TTLCache
+from utils.database import run_db
+from utils.database import songlink as db_songlink
+from utils.http_clients import get_client, register_client
+
+SONGLINK_CACHE_TTL = int(os.getenv("SONGLINK_CACHE_TTL", 30 * 24 * 3600))
+SONGLINK_FAILURE_TTL = int(os.getenv("SONGLINK_FAILURE_TTL", 15 * 60))
+SONGLINK_MEMORY_SIZE = int(os.getenv("SONGLINK_MEMORY_SIZE", 2000))
+
+register_client("songlink", "https://api.song.link", timeout=10.0)
+SONGLINK_PATH = "/v1-alpha.1/links"
+
+# ------------------------------------------------------------
+# Kanonische URL
+# ------------------------------------------------------------
+# Query-Parameter, die nur Herkunft/Tracking oder die Position im Song beschreiben
+_IGNORED_PARAMS = {"si", "feature", "pp", "t", "start", "context", "nd", "ref", "app", "ls", "uo"}
+_HOST_PREFIXES = ("www.", "m.")
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalisiert eine geteilte Musik-URL für den Cache, z.B.
+    "<https://open.spotify.com/intl-de/track/ID?si=x>" -> "https://open.spotify.com/track/ID".
+    Text ohne Schema oder Host (keine URL) bleibt unverändert.
+    """
+    url = url.strip().strip("<>")
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if parts.port is not None:
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/")
+
+    # Kurz-Links auf die ausgeschriebene Form abbilden
+    if host == "youtu.be" and path:
+        return f"https://youtube.com/watch?v={path.lstrip('/')}"
+    # Spotify-Sprachpfade: /intl-de/track/ID -> /track/ID
+    if host == "open.spotify.com" and path.startswith("/intl-"):
+        path = "/" + path.split("/", 2)[2] if path.count("/") >= 2 else path
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in _IGNORED_PARAMS and not key.startswith("utm_")
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+# ------------------------------------------------------------
+# Ergebnis
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class SongLookup:
+    # Plattform-Schlüssel der API (spotify, youtube, appleMusic, ...) -> URL
+    links: Dict[str, str] = field(default_factory=dict)
+    title: str = "Unbekannter Titel"
+    artist: str = "Unbekannter Künstler"
+    thumbnail_url: str = ""
+    # Fehlermeldung der API, wenn der Link nicht aufgelöst werden konnte
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SongLookup":
+        return cls(**data)
+
+def extract_song_lookup(data: Dict[str, Any]) -> SongLookup:
+    """Zieht Links und Metadaten aus einer Antwort von /links (mit Fallback über alle Entitäten)."""
+    links = {
+        platform: info["url"]
+        for platform, info in data.get("linksByPlatform", {}).items()
+        if info.get("url")
+    }
+
+    entities_by_id: Dict[str, Dict[str, Any]] = data.get("entitiesByUniqueId", {})
+    entity_unique_id = data.get("entityUniqueId")
+
+    title = ""
+    artist = ""
+    thumbnail_url = ""
+
+    if entity_unique_id and entity_unique_id in entities_by_id:
+        central_entity = entities_by_id[entity_unique_id]
+        title = central_entity.get("title", "")
+        artist = central_entity.get("artistName", "")
+        thumbnail_url = central_entity.get("thumbnailUrl", "")
+
+    for entity_data in entities_by_id.values():
+        if not title:
+            title = entity_data.get("title", title)
+        if not artist:
+            artist = entity_data.get("artistName", artist)
+        if not thumbnail_url:
+            thumbnail_url = entity_data.get("thumbnailUrl", thumbnail_url)
+        if title and artist:
+            break
+
+    return SongLookup(links, title or "Unbekannter Titel", artist or "Unbekannter Künstler", thumbnail_url)
+
+# ------------------------------------------------------------
+# Resolver
+# ------------------------------------------------------------
+class SongLinkResolver:
+    def __init__(self):
+        self._memory = TTLCache(SONGLINK_MEMORY_SIZE, SONGLINK_CACHE_TTL)
+        self._flight = SingleFlight()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.upstream_calls = 0
+
+    async def resolve(self, url: str) -> SongLookup:
+        """
+        Löst eine Musik-URL auf. Netzwerk- und Serverfehler der API werden als
+        httpx.HTTPError weitergereicht (und nicht gecacht).
+        """
+        key = canonicalize_url(url)
+        lookup = self._memory.get(key)
+        if lookup is not None:
+            self.memory_hits += 1
+            return lookup
+        return await self._flight.do(key, lambda: self._resolve(key))
+
+    async def _resolve(self, key: str) -> SongLookup:
+        # Die MySQL-Stufe ist nur ein Cache: Fehler dort dürfen die Auflösung nicht verhindern
+        try:
+            stored = await run_db(db_songlink.get_song_link, key)
+        except Exception as e:
+            print(f"[ERROR] Song.link-Cache konnte nicht gelesen werden: {e}")
+            stored = None
+        if stored is not None:
+            payload, remaining = stored
+            lookup = SongLookup.from_dict(payload)
+            self._memory.set(key, lookup, remaining)
+            self.db_hits += 1
+            return lookup
+
+        lookup = await self._fetch(key)
+        ttl = SONGLINK_CACHE_TTL if lookup.links else SONGLINK_FAILURE_TTL
+        try:
+            await run_db(db_songlink.save_song_link, key, lookup.to_dict(), ttl)
+        except Exception as e:
+            print(f"[ERROR] Song.link-Cache konnte nicht gespeichert werden: {e}")
+        self._memory.set(key, lookup, ttl)
+        return lookup
+
+    async def _fetch(self, url: str) -> SongLookup:
+        self.upstream_calls += 1
+        response = await get_client("songlink").get(SONGLINK_PATH, params={"url": url})
+        # Überlastung/Serverfehler sind vorübergehend und werden nicht gecacht
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+        if response.status_code != 200:
+            # Abgelehnte Links (z.B. unbekannte Plattform) kurz negativ cachen
+            try:
+                message = response.json().get("message")
+            except ValueError:
+                message = None
+            return SongLookup(error=message or f"Unbekannter API-Fehler ({response.status_code})")
+        return extract_song_lookup(response.json())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_size": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self._flight.coalesced,
+        }
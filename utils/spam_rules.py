@@ -0,0 +1,199 @@
+# utils/spam_rules.py
+"""
+Regel-Engine für das Antispam-System.
+
+Pro (Gilde, User) wird ein gleitendes Zeitfenster mit laufenden Zählern gehalten;
+jede Nachricht aktualisiert die Zähler in O(1) (amortisiert) und wird gegen die
+Schwellen der Gilde geprüft. Jede Schwelle ist der noch erlaubte Höchstwert, eine
+Regel greift erst darüber:
+
+- rate:          zu viele Nachrichten im Fenster
+- duplicate:     zu viele (fast) gleiche Nachrichten im Fenster
+- cross_channel: dieselbe Nachricht in zu vielen verschiedenen Channels
+- mentions:      zu viele Erwähnungen in mindestens zwei Nachrichten im Fenster
+- links:         zu viele Links in mindestens zwei Nachrichten im Fenster
+
+Das Modul importiert bewusst kein discord, damit benchmarks/antispam_replay.py
+aufgezeichnete Nachrichtenströme ohne Bot durchspielen kann.
+"""
+import re
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+from utils.cache import TTLCache
+
+# ------------------------------------------------------------
+# Regeln pro Gilde
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class SpamRules:
+    """Schwellen einer Gilde (erlaubte Höchstwerte); 0 schaltet die jeweilige Regel ab."""
+    guild_id: str
+    enabled: bool = True
+    window_seconds: int = 2
+    max_messages: int = 5
+    max_duplicates: int = 2
+    max_channels: int = 2
+    max_mentions: int = 8
+    max_links: int = 4
+    timeout_minutes: int = 1440
+
+# Über /setup antispam änderbare Felder (alles außer guild_id)
+SPAM_RULE_FIELDS = [f.name for f in fields(SpamRules) if f.name != "guild_id"]
+
+# Höchstwert für Schwellen, die Nachrichten im Fenster zählen; das Fenster hält
+# eine Nachricht mehr, damit auch diese Schwelle noch überschritten werden kann
+SPAM_MAX_MESSAGE_THRESHOLD = 50
+SPAM_MESSAGE_THRESHOLD_FIELDS = ("max_messages", "max_duplicates", "max_channels")
+# Größtes einstellbares Zeitfenster (window_seconds)
+SPAM_MAX_WINDOW_SECONDS = 300
+
+# ------------------------------------------------------------
+# Nachrichten-Merkmale
+# ------------------------------------------------------------
+_LINK_RE = re.compile(r"https?://", re.IGNORECASE)
+_NON_WORD_RE = re.compile(r"[\W\d_]+")
+_REPEAT_RE = re.compile(r"(.)\1+")
+
+def content_fingerprint(content: str) -> int:
+    """
+    Hash für "fast gleiche" Nachrichten: Groß-/Kleinschreibung, Leerzeichen, Satzzeichen,
+    Ziffern und wiederholte Buchstaben werden ignoriert ("Hallo!!", "haaallo 2" -> gleich).
+    Bleibt nichts übrig (z.B. nur Emojis), zählt der unveränderte Inhalt.
+    """
+    normalized = _REPEAT_RE.sub(r"\1", _NON_WORD_RE.sub("", content.lower()))
+    return hash(normalized or content)
+
+class MessageEvent(NamedTuple):
+    timestamp: float
+    channel_id: int
+    message_id: int
+    fingerprint: int
+    mentions: int
+    links: int
+
+def make_event(timestamp: float, channel_id: int, message_id: int, content: str, mentions: int) -> MessageEvent:
+    return MessageEvent(timestamp, channel_id, message_id, content_fingerprint(content), mentions, len(_LINK_RE.findall(content)))
+
+class SpamVerdict(NamedTuple):
+    rule: str
+    reason: str
+    # Nachrichten des Users im Fenster, die entfernt werden sollen
+    events: List[MessageEvent]
+
+# ------------------------------------------------------------
+# Gleitendes Fenster mit laufenden Zählern
+# ------------------------------------------------------------
+class SpamWindow:
+    __slots__ = ("events", "mentions", "links", "mention_messages", "link_messages", "fingerprints", "channels")
+
+    def __init__(self):
+        self.events: Deque[MessageEvent] = deque()
+        self.mentions = 0
+        self.links = 0
+        # Nachrichten mit mindestens einer Erwähnung bzw. einem Link
+        self.mention_messages = 0
+        self.link_messages = 0
+        # fingerprint -> Anzahl im Fenster bzw. fingerprint -> {channel_id: Anzahl}
+        self.fingerprints: Dict[int, int] = {}
+        self.channels: Dict[int, Dict[int, int]] = {}
+
+    def add(self, event: MessageEvent, window_seconds: float, maxlen: int) -> None:
+        self.expire(event.timestamp - window_seconds)
+        while len(self.events) >= maxlen:
+            self._pop()
+        self.events.append(event)
+        self.mentions += event.mentions
+        self.links += event.links
+        self.mention_messages += event.mentions > 0
+        self.link_messages += event.links > 0
+        self.fingerprints[event.fingerprint] = self.fingerprints.get(event.fingerprint, 0) + 1
+        per_channel = self.channels.setdefault(event.fingerprint, {})
+        per_channel[event.channel_id] = per_channel.get(event.channel_id, 0) + 1
+
+    def expire(self, cutoff: float) -> None:
+        while self.events and self.events[0].timestamp < cutoff:
+            self._pop()
+
+    def _pop(self) -> None:
+        event = self.events.popleft()
+        self.mentions -= event.mentions
+        self.links -= event.links
+        self.mention_messages -= event.mentions > 0
+        self.link_messages -= event.links > 0
+
+        remaining = self.fingerprints[event.fingerprint] - 1
+        if remaining:
+            self.fingerprints[event.fingerprint] = remaining
+        else:
+            del self.fingerprints[event.fingerprint]
+
+        per_channel = self.channels[event.fingerprint]
+        remaining = per_channel[event.channel_id] - 1
+        if remaining:
+            per_channel[event.channel_id] = remaining
+        else:
+            del per_channel[event.channel_id]
+            if not per_channel:
+                del self.channels[event.fingerprint]
+
+# ------------------------------------------------------------
+# Engine
+# ------------------------------------------------------------
+class SpamEngine:
+    """
+    Hält die Fenster aller aktiven User (TTL für inaktive, Obergrenze insgesamt)
+    und prüft jede Nachricht gegen die Regeln ihrer Gilde.
+    """
+
+    def __init__(self, max_tracked: int, idle_ttl: float, history_length: int = SPAM_MAX_MESSAGE_THRESHOLD + 1):
+        # Ein Fenster darf nicht verfallen, solange seine Nachrichten noch zählen
+        self._windows = TTLCache(max_tracked, max(idle_ttl, SPAM_MAX_WINDOW_SECONDS))
+        # Obergrenze pro Fenster, damit auch hohe Raten den Speicher nicht sprengen
+        self.history_length = max(1, history_length)
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def reset(self, guild_id: str, user_id: int) -> None:
+        self._windows.invalidate((guild_id, user_id))
+
+    def check(self, guild_id: str, user_id: int, event: MessageEvent, rules: SpamRules) -> Optional[SpamVerdict]:
+        if not rules.enabled:
+            return None
+
+        key = (guild_id, user_id)
+        window: Optional[SpamWindow] = self._windows.get(key)
+        if window is None:
+            window = SpamWindow()
+        window.add(event, rules.window_seconds, self.history_length)
+        # Erneut setzen verlängert die Lebensdauer des Fensters
+        self._windows.set(key, window)
+
+        seconds = rules.window_seconds
+        duplicates = window.fingerprints[event.fingerprint]
+        channels = len(window.channels[event.fingerprint])
+
+        # cross_channel vor duplicate: die genauere Begründung gewinnt
+        if rules.max_channels and channels > rules.max_channels:
+            return self._verdict(window, "cross_channel", f"dieselbe Nachricht in {channels} Channels in {seconds}s",
+                                 lambda e: e.fingerprint == event.fingerprint)
+        if rules.max_duplicates and duplicates > rules.max_duplicates:
+            return self._verdict(window, "duplicate", f"{duplicates} gleiche Nachrichten in {seconds}s",
+                                 lambda e: e.fingerprint == event.fingerprint)
+        if rules.max_messages and len(window.events) > rules.max_messages:
+            return self._verdict(window, "rate", f"{len(window.events)} Nachrichten in {seconds}s")
+        # Eine einzelne Nachricht mit vielen Erwähnungen/Links ist noch kein Spam-Schwall
+        if rules.max_mentions and window.mentions > rules.max_mentions and window.mention_messages > 1:
+            return self._verdict(window, "mentions", f"{window.mentions} Erwähnungen in {seconds}s",
+                                 lambda e: e.mentions > 0)
+        if rules.max_links and window.links > rules.max_links and window.link_messages > 1:
+            return self._verdict(window, "links", f"{window.links} Links in {seconds}s",
+                                 lambda e: e.links > 0)
+        return None
+
+    @staticmethod
+    def _verdict(window: SpamWindow, rule: str, reason: str, keep=None) -> SpamVerdict:
+        events = [e for e in window.events if keep is None or keep(e)]
+        return SpamVerdict(rule, reason, events)
@@ -0,0 +1,64 @@
+# utils/wordmatch.py
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+# ------------------------------------------------------------
+# Aho-Corasick-Automat für den Wort-Counter
+# ------------------------------------------------------------
+class WordMatcher:
+    """
+    Findet alle registrierten Wörter in einem Text in einem Durchlauf (Aho-Corasick),
+    unabhängig davon, wie viele Wörter eine Gilde zählt.
+
+    Wie bisher wird ohne Groß-/Kleinschreibung auf Teilstrings geprüft
+    ("moin" zählt auch in "moinsen"). find() gibt die Wörter in ihrer
+    gespeicherten Schreibweise zurück, jedes höchstens einmal pro Text.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+
+        for word in words:
+            pattern = word.lower()
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[node][char] = child
+                node = child
+            self._out[node] += (word,)
+
+        # Fehlerkanten per Breitensuche; Ausgaben der Fehlerknoten erben
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1
+
+    def find(self, text: str) -> Set[str]:
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        node = 0
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        return found